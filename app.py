@@ -1,15 +1,37 @@
 import streamlit as st
 import pandas as pd
-import requests
 import os
-import json
-import re
-import unicodedata
+import threading
 import time
-import zipfile
-import shutil
+import uuid
 from datetime import datetime
-from typing import Optional, Dict, Tuple
+from typing import Dict, Optional, Tuple
+
+import pms_nhl
+import pms_profile as prof
+from pms_common import read_json as _read_json, write_json as _write_json, norm_player_key as _norm_player_key
+from pms_country import update_players_db
+from pms_stats import sync_nhl_stats
+from pms_common import file_signature
+from pms_roster import ROSTER_COLS, slot_buckets
+from pms_tx import TX_COLS, make_trade_id as _make_trade_id, tx_append, tx_read as _tx_read
+from pms_backup import restore_csv_file as _restore_csv_file, restore_zip as _restore_zip, zip_backup
+from pms_contracts import apply_contracts, build_contracts_join, contracts_map, enrich_roster_from_contracts, season_end_year
+from pms_store import PLAYERS, ROSTERS, TRANSACTIONS, Store
+from pms_cap import CAP_LIMITS, SEASONS_AHEAD, CapLedger, build_cap_ledger
+from pms_search import PlayerIndex
+from pms_lineup import DEFAULT_QUOTAS, lineup_summary, optimize_lineups
+from pms_assets import cache_stats, fetch_flags, find_logos, flag_file, team_logo, thumbnail, THUMB_SIZES
+from pms_progress import ProgressReporter, format_event, fraction
+from pms_shared import registry_stats, set_index_store, shared_players_db
+from pms_httpcache import HttpCache
+from pms_views import LeagueViews, roster_files
+from pms_validate import DataValidator, summary as validation_summary
+from pms_batch import run_batch
+from pms_warmup import IndexStore, Warmup
+from pms_sync import CHUNK_SIZE as SYNC_CHUNK_SIZE, STORAGES as SYNC_STORAGES, WORKERS as SYNC_WORKERS, collect_files, load_manifest, storage_from_url, sync as sync_backups
+from pms_dedup import MATCH as DEDUP_MATCH, dedup_players_csv, find_duplicates, pair_table
+from pms_snapshot import KIND_PLAYERS, KIND_ROSTER, diff_frames, diff_summary, list_snapshots, load_snapshot, read_current, take_snapshot
 
 st.set_page_config(page_title="Pool Hockey", layout="wide")
 
@@ -29,8 +51,20 @@ BACKUP_HISTORY_PATH_DEFAULT = os.path.join(DATA_DIR, "backup_history.csv")
 NHL_COUNTRY_CACHE_DEFAULT = os.path.join(DATA_DIR, "nhl_country_cache.json")
 NHL_COUNTRY_CHECKPOINT_DEFAULT = os.path.join(DATA_DIR, "nhl_country_checkpoint.json")
 CLUB_COUNTRY_CACHE_DEFAULT = os.path.join(DATA_DIR, "club_country_cache.json")
+PUCKPEDIA_CONTRACTS_PATH_DEFAULT = os.path.join(DATA_DIR, "puckpedia.contracts.csv")
+CONTRACTS_JOIN_CACHE_DEFAULT = os.path.join(DATA_DIR, "contracts_join_cache.csv")
+STORE_DB_PATH_DEFAULT = os.path.join(DATA_DIR, "pms.sqlite")
+SNAPSHOT_DIR_DEFAULT = os.path.join(DATA_DIR, "snapshots")
+ASSET_CACHE_DIR_DEFAULT = os.path.join(DATA_DIR, "asset_cache")
+HTTP_CACHE_DIR_DEFAULT = os.path.join(DATA_DIR, "http_cache")
+INDEX_DIR_DEFAULT = os.path.join(DATA_DIR, "index_cache")
+LOGO_DIRS = [DATA_DIR, os.path.join("assets", "previews")]
+
+ACTIVE_SEASON_DEFAULT = "2025-2026"
 
 BACKUP_DIR_DEFAULT = os.path.join(DATA_DIR, "backups")
+SYNC_MANIFEST_DEFAULT = os.path.join(DATA_DIR, "backup_sync_manifest.json")
+SYNC_OFFSITE_DIR_DEFAULT = os.path.join(DATA_DIR, "offsite")
 os.makedirs(BACKUP_DIR_DEFAULT, exist_ok=True)
 
 def _season_lbl_default() -> str:
@@ -58,24 +92,6 @@ div.stButton > button { padding: 0.35rem 0.6rem; border-radius: 10px; }
 '''
 st.markdown(THEME_CSS, unsafe_allow_html=True)
 
-def _read_json(path: str) -> dict:
-    try:
-        if path and os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                d = json.load(f)
-                return d if isinstance(d, dict) else {}
-    except Exception:
-        pass
-    return {}
-
-def _write_json(path: str, data: dict) -> None:
-    if not path:
-        return
-    tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data or {}, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, path)
-
 def checkpoint_status(path: str) -> Tuple[bool, str]:
     if path and os.path.exists(path):
         try:
@@ -94,17 +110,6 @@ def _anti_double_run_guard(tag: str, min_seconds: float = 0.8) -> bool:
     st.session_state[k] = t
     return True
 
-def _strip_accents(s: str) -> str:
-    return "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
-
-def _norm_player_key(name: str) -> str:
-    s = _strip_accents(str(name or "")).lower().strip()
-    s = re.sub(r"[^a-z0-9\s\-']", " ", s)
-    s = s.replace("’", "'")
-    s = re.sub(r"\s+", " ", s).strip()
-    s = s.replace("matthew ", "matt ")
-    return s
-
 def _country_to_flag_emoji(cc: str) -> str:
     cc = (cc or "").strip().upper()
     if len(cc) != 2 or not cc.isalpha():
@@ -119,287 +124,212 @@ def _fmt_money(x) -> str:
     return f"{int(round(v)):,}".replace(",", " ")
 
 @st.cache_data(show_spinner=False)
-def load_players_db_map(path: str) -> Dict[str, dict]:
-    if not path or not os.path.exists(path):
-        return {}
-    try:
-        df = pd.read_csv(path)
-    except Exception:
-        return {}
-
-    col_name = None
-    for c in ["Joueur", "Player", "Name", "Nom"]:
-        if c in df.columns:
-            col_name = c
-            break
-    if not col_name:
-        return {}
-
-    col_country = "Country" if "Country" in df.columns else None
-    col_pos = "Pos" if "Pos" in df.columns else ("Position" if "Position" in df.columns else None)
-    col_salary = "Salaire" if "Salaire" in df.columns else ("Salary" if "Salary" in df.columns else ("Cap Hit" if "Cap Hit" in df.columns else None))
-
-    out: Dict[str, dict] = {}
-    for _, r in df.iterrows():
-        k = _norm_player_key(r.get(col_name))
-        if not k:
-            continue
-        if k not in out:
-            out[k] = {
-                "country": str(r.get(col_country) or "").strip().upper() if col_country else "",
-                "pos": str(r.get(col_pos) or "").strip() if col_pos else "",
-                "salary": r.get(col_salary) if col_salary else "",
-            }
-    return out
-
-def _http_get_json(url: str, params=None, timeout: int = 12):
-    r = requests.get(url, params=params or {}, timeout=timeout)
-    r.raise_for_status()
-    return r.json()
-
-def _nhl_search_playerid(player_name: str) -> Optional[int]:
-    if not player_name:
-        return None
-    q = str(player_name).strip()
-    if not q:
-        return None
-    try:
-        data = _http_get_json("https://search.d3.nhle.com/api/v1/search/player", params={"q": q, "limit": 10}, timeout=12)
-    except Exception:
-        return None
-
-    items = data.get("items") or []
-    name_norm = q.lower().strip()
-    last = name_norm.split()[-1] if name_norm.split() else name_norm
-
-    for it in items:
-        try:
-            pid_i = int(it.get("playerId") or it.get("id"))
-        except Exception:
-            continue
-        nm = str(it.get("name") or it.get("playerName") or it.get("fullName") or "").lower().strip()
-        if not nm:
-            continue
-        if nm == name_norm or (last and last in nm):
-            return pid_i
-    return None
-
-def _nhl_landing_country(player_id: int) -> str:
-    try:
-        data = _http_get_json(f"https://api-web.nhle.com/v1/player/{int(player_id)}/landing", timeout=12)
-    except Exception:
-        return ""
-    for k in ["birthCountryCode", "nationality", "countryCode"]:
-        v = data.get(k)
-        if isinstance(v, str) and v.strip():
-            cc = v.strip().upper()
-            if len(cc) == 2:
-                return cc
-            if len(cc) == 3 and cc.isalpha():
-                return cc[:2]
-    return ""
-
-FALLBACK_LEAGUE_TO_COUNTRY = {"NCAA":"US","USHL":"US","OHL":"CA","WHL":"CA","QMJHL":"CA","CHL":"CA","SHL":"SE","ALLSVENSKAN":"SE","LIIGA":"FI","MESTIS":"FI","KHL":"RU","NL":"CH","NLA":"CH","DEL":"DE","DEL2":"DE","LIGUE MAGNUS":"FR"}
-SEED_CLUB_TOKENS = {"FROLUNDA":"SE","FÄRJESTAD":"SE","DJURGARDEN":"SE","KARPAT":"FI","HIFK":"FI","DAVOS":"CH","LUGANO":"CH"}
-
-def _club_slug(s: str) -> str:
-    s = _strip_accents((s or "").upper())
-    s = re.sub(r"[\-/_\,\.\(\)]+", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    for w in [" HC"," IF"," IK"," SK"," HOCKEY"," CLUB"," TEAM"," U20"," J20"," U18"," J18"]:
-        s = s.replace(w, "")
-    return s.strip()
-
-def _infer_from_league(row: dict) -> str:
-    for col in ["League","League Name","Competition","Junior League","Jr League"]:
-        v = row.get(col)
-        if isinstance(v, str) and v.strip():
-            up = v.upper()
-            if "ICEHL" in up or "EBEL" in up:
-                return ""
-            for k, cc in FALLBACK_LEAGUE_TO_COUNTRY.items():
-                if k in up:
-                    return cc
-    return ""
-
-def _infer_from_club(row: dict, club_cache: dict) -> str:
-    for col in ["Club","Team","Current Team","Junior Team","Jr Team"]:
-        v = row.get(col)
-        if isinstance(v, str) and v.strip():
-            slug = _club_slug(v)
-            if slug in club_cache:
-                return str(club_cache.get(slug) or "").strip().upper()
-            for tok, cc in SEED_CLUB_TOKENS.items():
-                if tok in slug:
-                    return cc
-    return ""
-
-def _learn_club(row: dict, cc: str, club_cache: dict) -> None:
-    for col in ["Club","Team","Current Team","Junior Team","Jr Team"]:
-        v = row.get(col)
-        if isinstance(v, str) and v.strip():
-            slug = _club_slug(v)
-            if slug and slug not in club_cache:
-                club_cache[slug] = cc
-
-def update_players_db(path: str, *, max_calls: int = 300, save_every: int = 500, resume_only: bool = True, reset_progress: bool = False, failed_only: bool = False, progress_cb=None):
-    if not os.path.exists(path):
-        return {"ok": False, "error": f"File not found: {path}"}
-
-    df = pd.read_csv(path)
-    if "Country" not in df.columns:
-        df["Country"] = ""
-    if "playerId" not in df.columns:
-        df["playerId"] = ""
+def load_team_logos(dirs_sig: tuple) -> Dict[str, str]:
+    # dirs_sig: mtime des dossiers de logos (un ajout/retrait de fichier invalide la liste)
+    return find_logos(LOGO_DIRS)
 
-    cache = _read_json(NHL_COUNTRY_CACHE_DEFAULT)
-    club_cache = _read_json(CLUB_COUNTRY_CACHE_DEFAULT)
-    ckpt = _read_json(NHL_COUNTRY_CHECKPOINT_DEFAULT)
+def _team_logo_thumb(owner: str, size: int = 64) -> str:
+    logos = load_team_logos(tuple(file_signature(d) for d in LOGO_DIRS))
+    src = team_logo(owner, logos)
+    return thumbnail(src, ASSET_CACHE_DIR_DEFAULT, size) if src else ""
 
-    if reset_progress:
-        ckpt = {}
-        _write_json(NHL_COUNTRY_CHECKPOINT_DEFAULT, {})
+def load_players_db_map(path: str) -> Dict[str, dict]:
+    # partagé par toutes les sessions (pas de copie picklée par session comme st.cache_data)
+    return shared_players_db(path).players_map()
 
-    start = int(ckpt.get("cursor", 0)) if resume_only else 0
-
-    cand = []
-    for i, r in df.iterrows():
-        if str(r.get("Country") or "").strip():
-            continue
-        if failed_only:
-            pid = str(r.get("playerId") or "").strip()
-            nm = str(r.get("Player") or r.get("Joueur") or "").strip()
-            name_key = f"NAME::{nm.lower().strip()}"
-            is_failed = False
-            if pid and isinstance(cache.get(pid), dict) and cache.get(pid, {}).get("ok") is False:
-                is_failed = True
-            if (not pid) and isinstance(cache.get(name_key), dict) and cache.get(name_key, {}).get("ok") is False:
-                is_failed = True
-            if not is_failed:
-                continue
-        cand.append(i)
-
-    total = len(cand)
-    end = min(start + int(max_calls), total)
-
-    updated = processed = errors = cached = 0
-
-    for pos in range(start, end):
-        i = cand[pos]
-        row = df.loc[i]
-        rowd = row.to_dict()
-
-        nm = str(row.get("Player") or row.get("Joueur") or "").strip()
-        pid = None
-        pid_raw = str(row.get("playerId") or "").strip()
-        if pid_raw:
-            try:
-                pid = int(pid_raw)
-            except Exception:
-                pid = None
-
-        name_key = f"NAME::{nm.lower().strip()}" if nm else ""
-
-        if pid is None and name_key:
-            cached_name = cache.get(name_key)
-            if isinstance(cached_name, dict) and cached_name.get("ok") is True and cached_name.get("country"):
-                cc = str(cached_name.get("country")).strip().upper()
-                df.at[i, "Country"] = cc
-                cached += 1
-                processed += 1
-                _write_json(NHL_COUNTRY_CHECKPOINT_DEFAULT, {"cursor": pos + 1})
-                continue
-
-        if pid is None and nm:
-            pid = _nhl_search_playerid(nm)
-
-        if pid:
-            pid_key = str(pid)
-            cached_pid = cache.get(pid_key)
-            if isinstance(cached_pid, dict) and cached_pid.get("ok") is True and cached_pid.get("country"):
-                cc = str(cached_pid.get("country")).strip().upper()
-                df.at[i, "Country"] = cc
-                df.at[i, "playerId"] = pid
-                cached += 1
-            else:
-                cc = _nhl_landing_country(pid)
-                if cc:
-                    df.at[i, "Country"] = cc
-                    df.at[i, "playerId"] = pid
-                    cache[pid_key] = {"ok": True, "country": cc}
-                    if name_key:
-                        cache[name_key] = {"ok": True, "country": cc, "source": "pid"}
-                    _learn_club(rowd, cc, club_cache)
-                    updated += 1
-                else:
-                    cc2 = _infer_from_league(rowd) or _infer_from_club(rowd, club_cache)
-                    if cc2:
-                        df.at[i, "Country"] = cc2
-                        df.at[i, "playerId"] = pid
-                        cache[pid_key] = {"ok": True, "country": cc2, "source": "fallback"}
-                        if name_key:
-                            cache[name_key] = {"ok": True, "country": cc2, "source": "fallback"}
-                        _learn_club(rowd, cc2, club_cache)
-                        updated += 1
-                    else:
-                        cache[pid_key] = {"ok": False, "reason": "no_country"}
-                        if name_key:
-                            cache[name_key] = {"ok": False, "reason": "no_country"}
-                        errors += 1
-        else:
-            cc2 = _infer_from_league(rowd) or _infer_from_club(rowd, club_cache)
-            if cc2:
-                df.at[i, "Country"] = cc2
-                _learn_club(rowd, cc2, club_cache)
-                if name_key:
-                    cache[name_key] = {"ok": True, "country": cc2, "source": "fallback"}
-                updated += 1
+@st.cache_data(show_spinner=False)
+def load_contracts_map(players_path: str, contracts_path: str, sig: tuple) -> Dict[str, dict]:
+    # sig = signatures des deux fichiers: invalide le cache Streamlit dès qu'un fichier change
+    res = build_contracts_join(players_path, contracts_path, CONTRACTS_JOIN_CACHE_DEFAULT)
+    return contracts_map(res["joined"])
+
+@st.cache_resource(show_spinner=False)
+def get_http_cache(path: str) -> HttpCache:
+    # cache de réponses LNH partagé par le process (PMS_HTTP_CACHE_MB pour le budget disque)
+    return HttpCache(path, max_mb=float(os.environ.get("PMS_HTTP_CACHE_MB", "200") or 200))
+
+if os.environ.get("PMS_HTTP_CACHE", "1").strip().lower() not in ("0", "false", "no", "off"):
+    pms_nhl.set_response_cache(get_http_cache(HTTP_CACHE_DIR_DEFAULT))
+
+@st.cache_resource(show_spinner=False)
+def get_index_store(path: str) -> IndexStore:
+    # index dérivés persistés (players map, recherche, validation, vues): relus après un redémarrage
+    return IndexStore(path)
+
+def _indexes() -> Optional[IndexStore]:
+    if os.environ.get("PMS_INDEXES", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    return get_index_store(INDEX_DIR_DEFAULT)
+
+set_index_store(_indexes())
+
+@st.cache_resource(show_spinner=False)
+def get_validator(data_dir: str) -> DataValidator:
+    # résultats par version de fichier, partagés: relu seulement quand un CSV change
+    return DataValidator(data_dir, store=_indexes())
+
+@st.cache_resource(show_spinner=False)
+def get_store(path: str) -> Store:
+    # une instance par process: connexions par thread, lecteurs concurrents (WAL)
+    return Store(path)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _cap_ledger_state(roster_path: str, players_path: str, season_lbl: str, seasons: int, players_sig: str) -> dict:
+    # un registre par (saison, version de la players DB); le roster est suivi par signature
+    return {"lock": threading.Lock(), "roster_sig": None, "ledger": None}
+
+def load_cap_ledger(roster_path: str, players_path: str, season_lbl: str, seasons: int = SEASONS_AHEAD + 1) -> CapLedger:
+    """
+    Registre de cap partagé: construit une fois, puis mis à jour par delta quand le fichier roster
+    change (update_roster). Les échanges ne sont que proposés ici: ils n'y touchent pas.
+    """
+    state = _cap_ledger_state(roster_path, players_path, season_lbl, int(seasons), file_signature(players_path))
+    sig = file_signature(roster_path)
+    with state["lock"]:
+        if state["ledger"] is None or state["roster_sig"] != sig:
+            roster = pd.read_csv(roster_path) if os.path.exists(roster_path) else pd.DataFrame()
+            if state["ledger"] is None:
+                state["ledger"] = build_cap_ledger(roster, load_players_db_frame(players_path), season_lbl, seasons=int(seasons))
             else:
-                if name_key:
-                    cache[name_key] = {"ok": False, "reason": "no_pid"}
-                errors += 1
-
-        processed += 1
-
-        if callable(progress_cb):
-            try:
-                progress_cb({"cursor": pos + 1, "total": total, "updated": updated, "processed": processed, "cached": cached, "errors": errors})
-            except Exception:
-                pass
-
-        if save_every and processed % int(save_every) == 0:
-            df.to_csv(path, index=False)
-            _write_json(NHL_COUNTRY_CACHE_DEFAULT, cache)
-            _write_json(CLUB_COUNTRY_CACHE_DEFAULT, club_cache)
-            _write_json(NHL_COUNTRY_CHECKPOINT_DEFAULT, {"cursor": pos + 1})
-
-    df.to_csv(path, index=False)
-    _write_json(NHL_COUNTRY_CACHE_DEFAULT, cache)
-    _write_json(CLUB_COUNTRY_CACHE_DEFAULT, club_cache)
-    _write_json(NHL_COUNTRY_CHECKPOINT_DEFAULT, {"cursor": end})
-
-    return {"ok": True, "updated": updated, "processed": processed, "cached": cached, "errors": errors, "total": total, "cursor": end}
-
-ROSTER_COLS = {"owner":"Propriétaire","player":"Joueur","pos":"Pos","team":"Equipe","salary":"Salaire","level":"Level","status":"Statut","slot":"Slot","ir_date":"IR Date"}
-
-def _slot_bucket(slot_val: str, statut_val: str = "") -> str:
-    s = str(slot_val or "").strip().lower()
-    t = str(statut_val or "").strip().lower()
-    if "actif" in s:
-        return "ACTIFS"
-    if "banc" in s:
-        return "BANC"
-    if s == "ir" or "inj" in s or "bless" in s:
-        return "IR"
-    if "mineur" in s or "minor" in s or "ahl" in s or "farm" in s:
-        return "MINEUR"
-    if "ir" in t or "inj" in t or "bless" in t:
-        return "IR"
-    if "mineur" in t or "ahl" in t:
-        return "MINEUR"
-    if "banc" in t:
-        return "BANC"
-    return "ACTIFS"
+                state["ledger"].update_roster(roster)
+            state["roster_sig"] = sig
+    return state["ledger"]
+
+def load_players_db_frame(path: str) -> pd.DataFrame:
+    # players DB typée, partagée en lecture seule (ne pas modifier le DataFrame retourné)
+    return shared_players_db(path).frame()
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_player_index(path: str, sig: str) -> PlayerIndex:
+    # un index par version de la players DB, partagé (lecture seule) par toutes les sessions
+    store = _indexes()
+    if store is None or not sig:
+        return PlayerIndex(load_players_db_frame(path))
+    return store.get_or_build("player_index", sig, lambda: PlayerIndex(load_players_db_frame(path)))[0]
+
+@st.cache_resource(show_spinner=False)
+def _league_views_state(data_dir: str, players_path: str) -> dict:
+    state = {"lock": threading.Lock(), "players_sig": None, "roster_sigs": {}, "views": None}
+    store = _indexes()
+    saved = store.load("league_views") if store is not None else None
+    if isinstance(saved, dict) and saved.get("key") == (os.path.abspath(data_dir), os.path.abspath(players_path)):
+        # vues du dernier process: les signatures ci-dessous rejouent seulement ce qui a changé depuis
+        state.update(players_sig=saved["players_sig"], roster_sigs=saved["roster_sigs"], views=saved["views"])
+    return state
+
+def load_league_views(data_dir: str = DATA_DIR, players_path: str = PLAYERS_DB_PATH_DEFAULT) -> LeagueViews:
+    """Vues de ligue partagées: seules les saisons (ou la players DB) dont la signature a changé sont rejouées."""
+    state = _league_views_state(data_dir, players_path)
+    with state["lock"]:
+        before = (state["players_sig"], dict(state["roster_sigs"]))
+        psig = file_signature(players_path)
+        if state["views"] is None:
+            state["views"] = LeagueViews(load_players_db_frame(players_path))
+        elif state["players_sig"] != psig:
+            state["views"].set_players_db(load_players_db_frame(players_path))
+        state["players_sig"] = psig
+        views, sigs = state["views"], state["roster_sigs"]
+        files = roster_files(data_dir)
+        for s in [s for s in sigs if s not in files]:
+            views.drop_season(s)
+            sigs.pop(s)
+        for s, p in files.items():
+            sig = file_signature(p)
+            if sigs.get(s) != sig:
+                views.set_roster(s, pd.read_csv(p))
+                sigs[s] = sig
+        store = _indexes()
+        if store is not None and before != (psig, sigs):
+            store.save("league_views", {"key": (os.path.abspath(data_dir), os.path.abspath(players_path)),
+                                        "players_sig": psig, "roster_sigs": dict(sigs), "views": views})
+    return views
+
+def _warm_json_caches() -> str:
+    sizes = {os.path.basename(p): len(_read_json(p)) for p in (NHL_COUNTRY_CACHE_DEFAULT, CLUB_COUNTRY_CACHE_DEFAULT, NHL_COUNTRY_CHECKPOINT_DEFAULT)}
+    return ", ".join(f"{k}: {v}" for k, v in sizes.items())
+
+def _warm_players_db() -> str:
+    snap = shared_players_db(PLAYERS_DB_PATH_DEFAULT)
+    snap.frame()
+    return f"{snap.stats()['rows']} lignes ({snap.source})"
+
+def _warm_contracts() -> str:
+    res = build_contracts_join(PLAYERS_DB_PATH_DEFAULT, PUCKPEDIA_CONTRACTS_PATH_DEFAULT, CONTRACTS_JOIN_CACHE_DEFAULT)
+    return f"{len(res['joined'])} contrats ({'cache' if res['cached'] else 'join'})"
+
+def _warm_cap_ledger() -> str:
+    path = _roster_path(ACTIVE_SEASON_DEFAULT)
+    if not os.path.exists(path):
+        return "pas de roster"
+    return f"{len(load_cap_ledger(path, PLAYERS_DB_PATH_DEFAULT, ACTIVE_SEASON_DEFAULT).players)} joueurs"
+
+@st.cache_resource(show_spinner=False)
+def get_warmup() -> Warmup:
+    # une fois par process, dans l'ordre du premier affichage (Alignement, Home, Admin)
+    return Warmup([
+        ("players_db", _warm_players_db),
+        ("players_map", lambda: f"{len(load_players_db_map(PLAYERS_DB_PATH_DEFAULT))} clés"),
+        ("validation", lambda: f"{len(get_validator(DATA_DIR).report())} constats"),
+        ("contracts", _warm_contracts),
+        ("cap_ledger", _warm_cap_ledger),
+        ("player_index", lambda: f"{len(load_player_index(PLAYERS_DB_PATH_DEFAULT, file_signature(PLAYERS_DB_PATH_DEFAULT)))} joueurs"),
+        ("league_views", lambda: f"{len(load_league_views().seasons())} saisons"),
+        ("json_caches", _warm_json_caches),
+    ])
+
+if os.environ.get("PMS_WARMUP", "1").strip().lower() not in ("0", "false", "no", "off"):
+    get_warmup().start()
+
+def _add_player_to_list(list_key: str, pick_key: str) -> None:
+    name = st.session_state.get(pick_key)
+    if not name:
+        return
+    cur = [x.strip() for x in str(st.session_state.get(list_key) or "").split(",") if x.strip()]
+    if name not in cur:
+        cur.append(name)
+    st.session_state[list_key] = ", ".join(cur)
+
+def player_picker(list_key: str, label: str) -> None:
+    """Typeahead: recherche par préfixe dans la players DB, ajoute le nom canonique à la liste."""
+    idx = load_player_index(PLAYERS_DB_PATH_DEFAULT, file_signature(PLAYERS_DB_PATH_DEFAULT))
+    q = st.text_input(label, key=f"{list_key}__q", placeholder="ex: mcdav, Zub")
+    if not q:
+        return
+    with prof.span("player_index.search"):
+        opts = idx.suggest(q, 10)
+    if not opts:
+        st.caption("Aucun joueur trouvé.")
+        return
+    labels = dict((n, lbl) for lbl, n in opts)
+    pick_key = f"{list_key}__pick"
+    s1, s2 = st.columns([4, 1])
+    with s1:
+        st.selectbox("Résultats", [n for _, n in opts], format_func=lambda n: labels.get(n, n), key=pick_key, label_visibility="collapsed")
+    with s2:
+        st.button("➕", key=f"{list_key}__add", on_click=_add_player_to_list, args=(list_key, pick_key))
+
+def _snapshot(label: str, players_path: str = PLAYERS_DB_PATH_DEFAULT, roster_path: str = "") -> None:
+    # versions avant/après une opération qui réécrit la players DB ou le roster (dédupliquées par hash)
+    with prof.span("snapshot"):
+        take_snapshot(players_path, SNAPSHOT_DIR_DEFAULT, KIND_PLAYERS, label=label)
+        if roster_path:
+            take_snapshot(roster_path, SNAPSHOT_DIR_DEFAULT, KIND_ROSTER, label=label)
+
+def _progress_reporter(key: str, min_interval: float = 0.25) -> ProgressReporter:
+    # barre + ligne de statut redessinées au plus ~4 fois/s; dernier état gardé en session
+    bar, box = st.progress(0.0), st.empty()
+
+    def _sink(ev: dict) -> None:
+        bar.progress(fraction(ev))
+        box.caption(format_event(ev))
+        st.session_state[key] = ev
+
+    return ProgressReporter(_sink, min_interval=min_interval)
+
+def _use_store() -> bool:
+    # backend SQLite optionnel: PMS_STORE=sqlite au démarrage, ou la case dans Gestion Admin
+    default = os.environ.get("PMS_STORE", "").strip().lower() == "sqlite"
+    return bool(st.session_state.get("use_sqlite", default))
 
 def roster_click_list(df: pd.DataFrame, title: str, *, players_map: Dict[str, dict]):
     st.markdown(f"### {title}")
@@ -407,7 +337,7 @@ def roster_click_list(df: pd.DataFrame, title: str, *, players_map: Dict[str, di
         st.caption("Aucun joueur.")
         return None
 
-    h1, h2, h3 = st.columns([7, 2, 2])
+    h0, h1, h2, h3 = st.columns([1, 7, 2, 2])
     with h1:
         st.markdown('<div class="muted nowrap">Joueur</div>', unsafe_allow_html=True)
     with h2:
@@ -422,14 +352,24 @@ def roster_click_list(df: pd.DataFrame, title: str, *, players_map: Dict[str, di
         cc = ""
         if k and k in players_map:
             cc = str(players_map[k].get("country") or "").strip().upper()
-        flag = _country_to_flag_emoji(cc)
+        # drapeau local (cache assets) sinon emoji: jamais de requête flagcdn au rendu
+        flag_png = flag_file(cc, ASSET_CACHE_DIR_DEFAULT)
+        flag = "" if flag_png else _country_to_flag_emoji(cc)
 
         pos = str(row.get(ROSTER_COLS["pos"]) or "").strip()
+        lvl = str(row.get(ROSTER_COLS["level"]) or "").strip().upper()
+        if lvl in ("STD", "ELC"):
+            pos = f"{pos} · {lvl}" if pos else lvl
         sal = row.get(ROSTER_COLS["salary"])
 
-        c1, c2, c3 = st.columns([7, 2, 2])
+        c0, c1, c2, c3 = st.columns([1, 7, 2, 2])
+        with c0:
+            if flag_png:
+                st.image(flag_png, width=20)
+            elif flag:
+                st.markdown(flag)
         with c1:
-            if st.button(f"{flag}  {name}" if flag else name, key=f"{title}__p__{idx}"):
+            if st.button(name, key=f"{title}__p__{idx}"):
                 chosen = idx
         with c2:
             st.markdown(f'<div class="nowrap small">{pos}</div>', unsafe_allow_html=True)
@@ -438,80 +378,63 @@ def roster_click_list(df: pd.DataFrame, title: str, *, players_map: Dict[str, di
 
     return chosen
 
-TX_COLS = ["trade_id","timestamp","season","owner_a","owner_b","a_players","b_players","a_picks","b_picks","a_cash","b_cash","status","notes"]
-
-def _tx_read(path: str) -> pd.DataFrame:
-    if os.path.exists(path):
-        try:
-            df = pd.read_csv(path)
-            for c in TX_COLS:
-                if c not in df.columns:
-                    df[c] = ""
-            return df[TX_COLS].copy()
-        except Exception:
-            pass
-    return pd.DataFrame(columns=TX_COLS)
-
-def _tx_write(path: str, df: pd.DataFrame) -> None:
+def _sync_target_default() -> str:
+    # cible de synchro hors-site: PMS_SYNC_TARGET, puis secrets["backup_sync_target"], sinon dossier local
+    env = os.environ.get("PMS_SYNC_TARGET", "").strip()
+    if env:
+        return env
     try:
-        df.to_csv(path, index=False)
+        sec = str(st.secrets.get("backup_sync_target", "") or "").strip()
     except Exception:
-        pass
-
-def _make_trade_id() -> str:
-    return "TR-" + datetime.now().strftime("%Y%m%d") + "-" + hex(int(time.time() * 1000))[-6:].upper()
-
-def _zip_backup(dest_dir: str, files: list[str]) -> str:
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    out_path = os.path.join(dest_dir, f"backup_{ts}.zip")
-    with zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
-        for fp in files:
-            if fp and os.path.exists(fp):
-                arc = os.path.relpath(fp, DATA_DIR) if fp.startswith(DATA_DIR + os.sep) else os.path.basename(fp)
-                z.write(fp, arcname=arc)
-    return out_path
-
-def _restore_zip(zip_path: str, dest_dir: str) -> dict:
-    if not os.path.exists(zip_path):
-        return {"ok": False, "error": "zip not found"}
-    try:
-        with zipfile.ZipFile(zip_path, "r") as z:
-            z.extractall(dest_dir)
-        return {"ok": True}
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
-
-def _restore_csv_file(src_csv: str, dst_csv: str) -> dict:
-    if not src_csv or not os.path.exists(src_csv):
-        return {"ok": False, "error": "source csv not found"}
-    try:
-        os.makedirs(os.path.dirname(dst_csv) or ".", exist_ok=True)
-        shutil.copy2(src_csv, dst_csv)
-        return {"ok": True}
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
-
-def _drive_available() -> bool:
-    try:
-        _ = st.secrets.get("gdrive_oauth", None)
-    except Exception:
-        return False
-    try:
-        import googleapiclient  # noqa: F401
-        return True
-    except Exception:
-        return False
+        sec = ""
+    return sec or f"local:{SYNC_OFFSITE_DIR_DEFAULT}"
 
 st.title("Pool Hockey — Full 4 (Admin restore CSV + Drive path)")
 
-season = st.text_input("Saison active", value="2025-2026")
+season = st.text_input("Saison active", value=ACTIVE_SEASON_DEFAULT)
 roster_file = _roster_path(season)
 
 TABS = ["🏠 Home", "🧾 Alignement", "⚖️ Transactions", "🛠️ Gestion Admin"]
 active_tab = st.radio("Navigation", TABS, horizontal=True)
 
+_prof_sid = st.session_state.setdefault("_prof_sid", uuid.uuid4().hex)
+prof.begin_run(_prof_sid, active_tab)
+
 if active_tab == "🏠 Home":
-    st.info("Home clean. (Players DB est seulement dans Gestion Admin.)")
+    with prof.span("league_views"):
+        lv = load_league_views()
+    lv_seasons = lv.seasons()
+    if not lv_seasons:
+        st.info("Aucun roster equipes_joueurs_{saison}.csv dans DATA_DIR.")
+    else:
+        lv_season = st.selectbox("Saison", lv_seasons[::-1], index=lv_seasons[::-1].index(season) if season in lv_seasons else 0)
+        own = lv.view("owners", lv_season)
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Équipes", len(own))
+        m2.metric("Joueurs", int(own["players"].sum()))
+        m3.metric("Points", f"{own['points'].sum():,.0f}".replace(",", " "))
+        m4.metric("ELC", int(own["elc"].sum()))
+
+        h1, h2 = st.columns(2)
+        with h1:
+            st.markdown("#### 🏒 Points par équipe")
+            st.bar_chart(own.set_index("owner")["points"])
+            st.dataframe(
+                own[["owner", "players", "points", "elc", "cap_hit"]]
+                .sort_values("points", ascending=False)
+                .rename(columns={"owner": "Équipe", "players": "Joueurs", "points": "Points", "elc": "ELC", "cap_hit": "Cap"}),
+                use_container_width=True, hide_index=True,
+            )
+        with h2:
+            st.markdown("#### 🌍 Nationalités")
+            nat = lv.view("nationality", lv_season).sort_values("players", ascending=False)
+            st.bar_chart(nat.set_index("country")["players"])
+        st.markdown("#### 💰 Cap par position")
+        st.dataframe(lv.cap_by_position(lv_season), use_container_width=True)
+        if len(lv_seasons) > 1:
+            st.markdown("#### 📚 Historique (points par équipe et saison)")
+            hist = lv.view("owners").pivot_table(index="owner", columns="season", values="points", fill_value=0)
+            st.dataframe(hist, use_container_width=True)
     st.caption(f"DATA_DIR = {DATA_DIR}")
     st.caption(f"Roster attendu: {roster_file}")
 
@@ -522,7 +445,21 @@ elif active_tab == "🧾 Alignement":
         st.error(f"Missing roster file: {roster_file}")
         st.stop()
 
-    df_r = pd.read_csv(roster_file)
+    with prof.span("validate"):
+        v_rep = get_validator(DATA_DIR).report()
+    v_rep = v_rep[v_rep["file"].eq(os.path.basename(roster_file))]
+    if len(v_rep):
+        n_err = int(v_rep["severity"].eq("error").sum())
+        st.warning(f"{n_err} erreur(s), {len(v_rep) - n_err} avertissement(s) dans {os.path.basename(roster_file)} — détail: Gestion Admin › Validation.")
+
+    store = get_store(STORE_DB_PATH_DEFAULT) if _use_store() else None
+    if store is not None:
+        with prof.span("store.sync roster"):
+            store.import_roster_csv(roster_file, season)
+        df_r = store.roster(season).head(0)
+    else:
+        with prof.span("roster.read_csv"):
+            df_r = pd.read_csv(roster_file)
 
     missing = [ROSTER_COLS["owner"], ROSTER_COLS["player"], ROSTER_COLS["pos"], ROSTER_COLS["salary"], ROSTER_COLS["slot"]]
     missing = [c for c in missing if c not in df_r.columns]
@@ -531,14 +468,35 @@ elif active_tab == "🧾 Alignement":
         st.caption("Colonnes détectées: " + ", ".join([str(c) for c in df_r.columns]))
         st.stop()
 
-    players_map = load_players_db_map(PLAYERS_DB_PATH_DEFAULT)
+    if store is not None:
+        # requêtes indexées (saison, propriétaire) au lieu de relire tout le CSV
+        owners = store.owners(season)
+        owner = st.selectbox("Équipe", owners) if owners else ""
+        with prof.span("store.roster"):
+            df_r = store.roster(season, owner)
+    else:
+        owners = sorted([x for x in df_r[ROSTER_COLS["owner"]].dropna().astype(str).unique() if str(x).strip()])
+        owner = st.selectbox("Équipe", owners) if owners else ""
+
+    with prof.span("load_players_db_map"):
+        players_map = load_players_db_map(PLAYERS_DB_PATH_DEFAULT)
+    with prof.span("load_contracts_map"):
+        cmap = load_contracts_map(
+            PLAYERS_DB_PATH_DEFAULT,
+            PUCKPEDIA_CONTRACTS_PATH_DEFAULT,
+            (file_signature(PLAYERS_DB_PATH_DEFAULT), file_signature(PUCKPEDIA_CONTRACTS_PATH_DEFAULT)),
+        )
+        df_r = enrich_roster_from_contracts(df_r, cmap, name_col=ROSTER_COLS["player"])
+
+    logo = _team_logo_thumb(owner) if owner else ""
+    if logo:
+        st.image(logo, width=64)
 
-    owners = sorted([x for x in df_r[ROSTER_COLS["owner"]].dropna().astype(str).unique() if str(x).strip()])
-    owner = st.selectbox("Équipe", owners) if owners else ""
     view = df_r[df_r[ROSTER_COLS["owner"]].astype(str).eq(owner)].copy() if owner else df_r.copy()
 
     statut_col = ROSTER_COLS["status"] if ROSTER_COLS["status"] in view.columns else ""
-    view["_bucket"] = view.apply(lambda r: _slot_bucket(r.get(ROSTER_COLS["slot"]), r.get(statut_col, "")), axis=1)
+    with prof.span("roster.slot_bucket"):
+        view["_bucket"] = slot_buckets(view[ROSTER_COLS["slot"]], view[statut_col] if statut_col else None)
 
     actifs = view[view["_bucket"].eq("ACTIFS")].copy()
     banc = view[view["_bucket"].eq("BANC")].copy()
@@ -547,34 +505,108 @@ elif active_tab == "🧾 Alignement":
 
     left, center, right = st.columns([1.1, 1.1, 1.1])
     with left:
-        roster_click_list(actifs, "⭐ Actifs", players_map=players_map)
+        with prof.span("roster_click_list Actifs"):
+            roster_click_list(actifs, "⭐ Actifs", players_map=players_map)
     with center:
-        roster_click_list(banc, "🪑 Banc", players_map=players_map)
+        with prof.span("roster_click_list Banc"):
+            roster_click_list(banc, "🪑 Banc", players_map=players_map)
         st.divider()
-        roster_click_list(ir, "🩹 IR", players_map=players_map)
+        with prof.span("roster_click_list IR"):
+            roster_click_list(ir, "🩹 IR", players_map=players_map)
     with right:
-        roster_click_list(mineur, "🧊 Mineur", players_map=players_map)
+        with prof.span("roster_click_list Mineur"):
+            roster_click_list(mineur, "🧊 Mineur", players_map=players_map)
+
+    with st.expander("🧠 Alignement optimal (quotas + cap)"):
+        lq1, lq2, lq3, lq4 = st.columns(4)
+        with lq1:
+            q_f = st.number_input("F actifs", min_value=0, max_value=30, value=DEFAULT_QUOTAS["F"], step=1, key="lu_f")
+        with lq2:
+            q_d = st.number_input("D actifs", min_value=0, max_value=20, value=DEFAULT_QUOTAS["D"], step=1, key="lu_d")
+        with lq3:
+            q_g = st.number_input("G actifs", min_value=0, max_value=5, value=DEFAULT_QUOTAS["G"], step=1, key="lu_g")
+        with lq4:
+            lu_cap = st.number_input("Cap des actifs (0 = aucun)", min_value=0, value=0, step=500_000, key="lu_cap")
+        lu_quotas = {"F": int(q_f), "D": int(q_d), "G": int(q_g)}
+        lu_db = load_players_db_frame(PLAYERS_DB_PATH_DEFAULT)
+        st.caption("Points = nhl_pts (sinon NHL P); gardiens: 2 × nhl_w. Les joueurs IR ne sont pas alignés.")
+        lb1, lb2 = st.columns(2)
+        with lb1:
+            lu_one = st.button("🧠 Optimiser cette équipe", disabled=not owner)
+        with lb2:
+            lu_all = st.button("🧠 Optimiser toutes les équipes")
+        if lu_one and owner:
+            with prof.span("lineup.optimize"):
+                opt = optimize_lineups(view, lu_db, owners=[owner], quotas=lu_quotas, cap=int(lu_cap) or None)
+            st.dataframe(lineup_summary(opt, cap=int(lu_cap) or None), use_container_width=True)
+            st.dataframe(opt.sort_values(["suggested", "points"], ascending=[False, False]), use_container_width=True)
+        if lu_all:
+            with prof.span("lineup.optimize_all"):
+                opt = optimize_lineups(pd.read_csv(roster_file), lu_db, quotas=lu_quotas, cap=int(lu_cap) or None)
+            st.dataframe(lineup_summary(opt, cap=int(lu_cap) or None), use_container_width=True)
+
+    with st.expander("📈 Projection cap (saisons à venir)"):
+        n_seasons = st.number_input("Saisons", min_value=1, max_value=8, value=SEASONS_AHEAD + 1, step=1, key="proj_seasons")
+        with prof.span("cap.projection"):
+            ledger = load_cap_ledger(roster_file, PLAYERS_DB_PATH_DEFAULT, season, int(n_seasons))
+            summary = ledger.owner_summary()
+        st.caption("ELC / UFA / RFA = statut à l'échéance du contrat (dans la fenêtre).")
+        if owner:
+            st.dataframe(ledger.projection(owner), use_container_width=True)
+            st.dataframe(summary[summary["owner"].eq(ledger.owner_of(owner))], use_container_width=True)
+        st.caption("Ligue")
+        st.dataframe(summary.pivot(index="owner", columns="season", values="committed"), use_container_width=True)
 
 elif active_tab == "⚖️ Transactions":
     st.subheader("⚖️ Transactions")
     tx_path = _transactions_path(season)
-    df_tx = _tx_read(tx_path)
+    store = get_store(STORE_DB_PATH_DEFAULT) if _use_store() else None
+    with prof.span("tx.read"):
+        if store is not None:
+            store.import_transactions_csv(tx_path, season)
+            df_tx = store.transactions(season)
+        else:
+            df_tx = _tx_read(tx_path)
 
     st.markdown("#### ➕ Proposer une transaction")
     c1, c2 = st.columns(2)
     with c1:
         owner_a = st.text_input("Équipe A (propose)", key="tx_owner_a")
+        player_picker("tx_a_players", "🔎 Chercher un joueur (A)")
         a_players = st.text_area("Joueurs A (séparés par virgule)", key="tx_a_players")
         a_picks = st.text_input("Picks A (ex: 2026-1,2027-2)", key="tx_a_picks")
         a_cash = st.text_input("Cash A", key="tx_a_cash")
     with c2:
         owner_b = st.text_input("Équipe B", key="tx_owner_b")
+        player_picker("tx_b_players", "🔎 Chercher un joueur (B)")
         b_players = st.text_area("Joueurs B (séparés par virgule)", key="tx_b_players")
         b_picks = st.text_input("Picks B", key="tx_b_picks")
         b_cash = st.text_input("Cash B", key="tx_b_cash")
 
     notes = st.text_area("Notes", key="tx_notes")
 
+    with st.expander("🧮 Impact sur le cap (avant / après)"):
+        cap_end = season_end_year(season)
+        cap_now = st.number_input("Plafond saison courante", min_value=0, value=int(CAP_LIMITS.get(cap_end, 95_500_000)), step=500_000)
+        if st.button("🧮 Évaluer l'impact cap"):
+            with prof.span("cap.ledger"):
+                ledger = load_cap_ledger(roster_file, PLAYERS_DB_PATH_DEFAULT, season)
+            with prof.span("cap.evaluate"):
+                ev = ledger.evaluate(owner_a, owner_b, a_players, b_players, cap={**CAP_LIMITS, cap_end: int(cap_now)})
+            for o, names in ev["unresolved"].items():
+                if names:
+                    st.warning(f"{o}: joueurs introuvables — " + ", ".join(names))
+            for o, names in ev["not_owned"].items():
+                if names:
+                    st.warning(f"{o}: joueurs absents de son roster (exclus du calcul) — " + ", ".join(names))
+            if ev["over_cap"]:
+                st.error("⚠️ Au moins une équipe dépasse le plafond après l'échange.")
+            elif ev["ok"]:
+                st.success("Échange conforme au plafond.")
+            else:
+                st.info("Calcul partiel: corrige les joueurs signalés avant de conclure.")
+            st.dataframe(ev["table"], use_container_width=True)
+
     if st.button("✅ Enregistrer la proposition", type="primary"):
         if not _anti_double_run_guard("save_tx", 0.8):
             st.info("Patiente une seconde (anti double-click).")
@@ -595,8 +627,10 @@ elif active_tab == "⚖️ Transactions":
                 "status": "PROPOSED",
                 "notes": notes,
             }
-            df_tx = pd.concat([df_tx, pd.DataFrame([new])], ignore_index=True)
-            _tx_write(tx_path, df_tx)
+            tx_append(tx_path, new)
+            if store is not None:
+                store.add_transaction(season, new, csv_path=tx_path)
+            df_tx = pd.concat([df_tx, pd.DataFrame([new], columns=TX_COLS)], ignore_index=True)
             st.success(f"Transaction enregistrée: {tid}")
 
     st.divider()
@@ -604,19 +638,48 @@ elif active_tab == "⚖️ Transactions":
     if df_tx.empty:
         st.caption("Aucune transaction.")
     else:
-        st.dataframe(df_tx.sort_values("timestamp", ascending=False), use_container_width=True)
+        with prof.span("tx.render"):
+            st.dataframe(df_tx.sort_values("timestamp", ascending=False), use_container_width=True)
 
 elif active_tab == "🛠️ Gestion Admin":
     st.subheader("🛠️ Gestion Admin")
 
+    with st.expander("🔥 Préchargement (démarrage)", expanded=not get_warmup().summary()["done"]):
+        wu = get_warmup()
+        w_sum = wu.summary()
+        w1, w2, w3 = st.columns(3)
+        w1.metric("Prêts", f"{w_sum['ready']}/{w_sum['total']}")
+        w2.metric("Erreurs", w_sum["errors"])
+        w3.metric("Durée (ms)", w_sum["ms"] if w_sum["ms"] is not None else "—")
+        if not w_sum["done"]:
+            st.caption("Préchargement en cours… (PMS_WARMUP=0 pour le désactiver)")
+        st.dataframe(pd.DataFrame(wu.status()), use_container_width=True, hide_index=True)
+        store = _indexes()
+        if store is not None:
+            u = store.usage()
+            st.caption(f"Index persistés ({INDEX_DIR_DEFAULT}): {u['indexes']} fichiers, {u['mb']} MB — "
+                       f"relus {u['loaded']}, construits {u['built']}, écrits {u['saved']}.")
+        k1, k2 = st.columns(2)
+        with k1:
+            if st.button("🔁 Relancer le préchargement"):
+                st.info("Relancé." if wu.start(force=True) else "Déjà en cours.")
+        with k2:
+            if store is not None and st.button("🧹 Vider les index persistés"):
+                st.success(f"{store.clear()} index supprimés (reconstruits au prochain démarrage).")
+
     has_ckpt, ckpt_ts = checkpoint_status(NHL_COUNTRY_CHECKPOINT_DEFAULT)
     if has_ckpt:
         st.warning(f"✅ Checkpoint file detected — {ckpt_ts}")
     else:
         st.caption("Aucun checkpoint détecté.")
 
-    st.markdown("### 🗃️ Players DB — Country fill (NHL → League → Club)")
+    st.markdown("### 🗃️ Players DB — Country fill (local → NHL)")
     players_path = st.text_input("Players DB path", value=PLAYERS_DB_PATH_DEFAULT)
+    for snap in registry_stats():
+        st.caption(
+            f"Players DB partagée (Arrow): {snap['rows']} lignes, {snap['arrow_mb']} MB, "
+            f"chargée depuis {snap['source']} en {snap['load_ms']} ms — {os.path.basename(snap['path'])} @ {snap['sig']}"
+        )
 
     colA, colB, colC, colD = st.columns(4)
     with colA:
@@ -653,26 +716,130 @@ elif active_tab == "🛠️ Gestion Admin":
         if not _anti_double_run_guard("country_fill", 0.8):
             st.info("Patiente une seconde (anti double-click).")
         else:
-            status_box = st.empty()
-
-            def _cb(stat):
-                status_box.info(stat)
-
-            res = update_players_db(
-                players_path,
-                max_calls=int(max_calls),
-                save_every=int(save_every),
-                resume_only=bool(resume_only),
-                reset_progress=False,
-                failed_only=bool(failed_only),
-                progress_cb=_cb,
-            )
+            progress = _progress_reporter("country_fill_progress")
+            _snapshot("avant country fill", players_path)
+            with prof.span("update_players_db"):
+                res = update_players_db(
+                    players_path,
+                    max_calls=int(max_calls),
+                    save_every=int(save_every),
+                    resume_only=bool(resume_only),
+                    reset_progress=False,
+                    failed_only=bool(failed_only),
+                    progress_cb=progress,
+                    cache_path=NHL_COUNTRY_CACHE_DEFAULT,
+                    club_cache_path=CLUB_COUNTRY_CACHE_DEFAULT,
+                    checkpoint_path=NHL_COUNTRY_CHECKPOINT_DEFAULT,
+                    contracts_path=PUCKPEDIA_CONTRACTS_PATH_DEFAULT,
+                )
+            progress.close()
+            _snapshot("après country fill", players_path)
             st.success("Run completed.")
             st.json(res)
 
+    st.markdown("### 📑 Puckpedia contracts → Players DB (Level / Expiry Year)")
+    cj1, cj2 = st.columns(2)
+    with cj1:
+        join_btn = st.button("🔗 Join contracts")
+    with cj2:
+        apply_contracts_btn = st.button("✍️ Apply Level/Expiry to Players DB")
+
+    if join_btn or apply_contracts_btn:
+        with prof.span("build_contracts_join"):
+            res = build_contracts_join(players_path, PUCKPEDIA_CONTRACTS_PATH_DEFAULT, CONTRACTS_JOIN_CACHE_DEFAULT)
+        joined, ambiguous = res["joined"], res["ambiguous"]
+        st.caption(
+            f"Contrats: {res['contracts']} — matchés: {len(joined)} — ambigus: {len(ambiguous)}"
+            + (" (cache)" if res["cached"] else "")
+        )
+        if len(joined):
+            st.json(joined["match"].value_counts().to_dict())
+        if len(ambiguous):
+            st.dataframe(ambiguous, use_container_width=True)
+        if apply_contracts_btn and os.path.exists(players_path):
+            if not _anti_double_run_guard("apply_contracts", 0.8):
+                st.info("Patiente une seconde (anti double-click).")
+            else:
+                db = pd.read_csv(players_path, low_memory=False)
+                db2 = apply_contracts(db, joined)
+                _snapshot("avant contrats", players_path)
+                db2.to_csv(players_path, index=False)
+                _snapshot("après contrats", players_path)
+                st.success("Level / Expiry Year appliqués à la Players DB.")
+
+    st.markdown("### 📊 Players DB — NHL stats sync (nhl_*)")
+    colS1, colS2 = st.columns(2)
+    with colS1:
+        stats_max_age = st.number_input("Refresh if older than (hours)", min_value=1, max_value=720, value=24, step=1)
+    with colS2:
+        stats_force = st.checkbox("Force full refresh", value=False)
+
+    if st.button("📊 Sync NHL stats"):
+        if not _anti_double_run_guard("stats_sync", 0.8):
+            st.info("Patiente une seconde (anti double-click).")
+        else:
+            progress = _progress_reporter("stats_sync_progress")
+            with st.spinner("NHL stats (bulk)…"):
+                with prof.span("sync_nhl_stats"):
+                    _snapshot("avant stats sync", players_path)
+                    res = sync_nhl_stats(players_path, season, max_age_hours=float(stats_max_age), force=bool(stats_force),
+                                         progress_cb=progress)
+                    progress.close()
+                    _snapshot("après stats sync", players_path)
+            if res.get("ok"):
+                st.success(f"Stats sync: {res.get('matched', 0)} joueurs mis à jour ({res.get('stale', 0)} à rafraîchir).")
+            else:
+                st.error(res.get("error") or "Stats sync failed")
+            st.json(res)
+
+    st.divider()
+    st.markdown("### 🌐 Cache HTTP (API LNH)")
+    hc = pms_nhl.response_cache()
+    if hc is None:
+        st.caption("Désactivé (PMS_HTTP_CACHE=0).")
+    else:
+        u = hc.usage()
+        st.caption(
+            f"{hc.root} — {u['entries']} réponses, {u['mb']} / {u['max_mb']} MB · "
+            f"hits {u['hits']} · revalidées {u['revalidated']} · misses {u['misses']} · évincées {u['evicted']}"
+        )
+        if st.button("🧹 Vider le cache HTTP"):
+            st.success(f"{hc.clear()} réponses supprimées.")
+
+    st.divider()
+    st.markdown("### 🗄️ SQLite store (optionnel)")
+    st.caption("Miroir indexé des CSV (WAL). Les CSV restent la source: import si modifiés, export à la demande.")
+    use_sqlite = st.checkbox("Utiliser SQLite pour Alignement / Transactions", value=_use_store(), key="use_sqlite_cb")
+    st.session_state["use_sqlite"] = use_sqlite
+    q1, q2 = st.columns(2)
+    with q1:
+        store_sync_btn = st.button("⬇️ Import CSV → SQLite (modifiés seulement)")
+    with q2:
+        store_export_btn = st.button("⬆️ Export SQLite → CSV")
+    if store_sync_btn:
+        with prof.span("store.sync"):
+            res = get_store(STORE_DB_PATH_DEFAULT).sync(
+                players_path=players_path, roster_path=roster_file, tx_path=_transactions_path(season), season=season
+            )
+        st.json(res)
+    if store_export_btn:
+        if not _anti_double_run_guard("store_export", 0.8):
+            st.info("Patiente une seconde (anti double-click).")
+        else:
+            store = get_store(STORE_DB_PATH_DEFAULT)
+            res = {
+                PLAYERS: store.export_csv(PLAYERS, players_path),
+                ROSTERS: store.export_csv(ROSTERS, roster_file, season=season),
+                TRANSACTIONS: store.export_csv(TRANSACTIONS, _transactions_path(season), season=season),
+            }
+            st.success("Export terminé.")
+            st.json(res)
+    if os.path.exists(STORE_DB_PATH_DEFAULT):
+        st.json(get_store(STORE_DB_PATH_DEFAULT).stats())
+
     st.divider()
     st.markdown("### 🧷 Backups & Restore")
-    st.caption("Drive target (chemin humain): My Drive / PMS Pool Data / PoolHockeyData  — (nécessite OAuth + folder_id pour API).")
+    st.caption("Copie hors-site: voir « ☁️ Synchro hors-site » plus bas (envoi incrémental des backups).")
 
     backup_dir = st.text_input("Backup folder (local)", value=BACKUP_DIR_DEFAULT)
 
@@ -690,7 +857,7 @@ elif active_tab == "🛠️ Gestion Admin":
             st.info("Patiente une seconde.")
         else:
             os.makedirs(backup_dir, exist_ok=True)
-            zp = _zip_backup(backup_dir, list(critical_targets.values()))
+            zp = zip_backup(backup_dir, list(critical_targets.values()), DATA_DIR)
             st.success(f"Backup created: {zp}")
 
     st.markdown("#### ♻️ Restore from ZIP (local)")
@@ -705,7 +872,9 @@ elif active_tab == "🛠️ Gestion Admin":
         if not pick_zip:
             st.warning("Choisis un zip.")
         else:
+            _snapshot("avant restore ZIP", roster_path=roster_file)
             res = _restore_zip(os.path.join(backup_dir, pick_zip), DATA_DIR)
+            _snapshot("après restore ZIP", roster_path=roster_file)
             if res.get("ok"):
                 st.success("Restore ZIP completed. Relance l’app si nécessaire.")
             else:
@@ -736,19 +905,194 @@ elif active_tab == "🛠️ Gestion Admin":
             if not dst_path:
                 st.error("Target invalide.")
             else:
+                _snapshot("avant restore CSV", roster_path=roster_file)
                 res = _restore_csv_file(src_path, dst_path)
+                _snapshot("après restore CSV", roster_path=roster_file)
                 if res.get("ok"):
                     st.success(f"Restore OK → {dst_path}")
                     st.caption("Relance l’app si tu veux recharger les caches/CSV.")
                 else:
                     st.error(res.get("error") or "Restore failed")
 
-    st.markdown("#### ☁️ Drive (optionnel)")
-    if _drive_available():
-        st.success("Drive détecté (secrets + libs).")
-        st.caption("Prochaine étape: lister le dossier Drive et restaurer/backup directement via folder_id.")
+    st.markdown("#### ☁️ Synchro hors-site")
+    st.caption("Envoie backups/ + fichiers critiques vers la cible; seuls les fichiers dont le sha256 a changé partent, "
+               "par morceaux en parallèle, et une synchro interrompue reprend où elle s'était arrêtée.")
+    sync_target = st.text_input("Cible (schéma:chemin)", value=_sync_target_default(), key="sync_target",
+                                help="Schémas: " + ", ".join(sorted(SYNC_STORAGES)))
+    y1, y2 = st.columns(2)
+    with y1:
+        sync_workers = st.number_input("Envois parallèles", min_value=1, max_value=16, value=SYNC_WORKERS, step=1, key="sync_workers")
+    with y2:
+        sync_chunk_mb = st.number_input("Morceau (MB)", min_value=1, max_value=64, value=SYNC_CHUNK_SIZE // (1024 * 1024), step=1, key="sync_chunk")
+    sync_files = collect_files(backup_dir, critical_targets)
+    sync_man = load_manifest(SYNC_MANIFEST_DEFAULT, sync_target)
+    st.caption(f"{len(sync_files)} fichiers locaux · {len(sync_man['files'])} connus de la cible (manifest: {SYNC_MANIFEST_DEFAULT}).")
+    if st.button("☁️ Synchroniser"):
+        try:
+            storage = storage_from_url(sync_target)
+        except Exception as e:
+            st.error(str(e))
+        else:
+            progress = _progress_reporter("sync_progress")
+            with prof.span("backup_sync"):
+                sres = sync_backups(sync_files, storage, SYNC_MANIFEST_DEFAULT, chunk_size=int(sync_chunk_mb) * 1024 * 1024,
+                                    workers=int(sync_workers), progress_cb=progress)
+            progress.close()
+            msg = f"{sres['uploaded']} envoyés, {sres['skipped']} inchangés · {sres['bytes'] / 1e6:.1f} MB"
+            if sres["chunks_resumed"]:
+                msg += f" · {sres['chunks_resumed']} morceaux repris"
+            (st.warning if sres["errors"] else st.success)(msg)
+            for err in sres["errors"][:20]:
+                st.caption(f"⚠️ {err}")
+
+    st.divider()
+    st.markdown("### ✅ Validation des données")
+    st.caption("Schémas + règles entre fichiers sur tout DATA_DIR; recalculé seulement pour les fichiers modifiés.")
+    with prof.span("validate"):
+        v_rep = get_validator(DATA_DIR).report()
+    v1, v2, v3 = st.columns(3)
+    v1.metric("Erreurs", int(v_rep["severity"].eq("error").sum()))
+    v2.metric("Avertissements", int(v_rep["severity"].eq("warning").sum()))
+    v3.metric("Fichiers", v_rep["file"].nunique())
+    if len(v_rep):
+        st.dataframe(validation_summary(v_rep), use_container_width=True, hide_index=True)
+        with st.expander("Rapport complet"):
+            v_file = st.selectbox("Fichier", ["(tous)"] + sorted(v_rep["file"].unique()), key="v_file")
+            st.dataframe(v_rep if v_file == "(tous)" else v_rep[v_rep["file"].eq(v_file)], use_container_width=True, hide_index=True)
+            st.download_button("⬇️ Rapport CSV", data=v_rep.to_csv(index=False).encode("utf-8"), file_name="validation.csv", mime="text/csv")
+    else:
+        st.success("Aucun problème détecté.")
+
+    st.divider()
+    st.markdown("### 🧬 Doublons (players DB)")
+    st.caption("Blocage nom / date de naissance / équipe / identifiants, score par paire, fusion colonne par colonne "
+               "(contrat: PuckPedia; nhl_*/sr_*: synchro la plus récente; reste: ligne la plus complète).")
+    d_thr = st.slider("Seuil de fusion", 0.4, 1.5, float(DEDUP_MATCH), 0.05, key="dedup_thr")
+    d1, d2 = st.columns(2)
+    with d1:
+        if st.button("🔎 Chercher les doublons") and os.path.exists(players_path):
+            with prof.span("dedup_scan"):
+                ddb = pd.read_csv(players_path, dtype=str, low_memory=False)
+                st.session_state["dedup_pairs"] = (file_signature(players_path), pair_table(ddb, find_duplicates(ddb)))
+    with d2:
+        if st.button("🧬 Fusionner les doublons") and os.path.exists(players_path):
+            _snapshot("avant dédoublonnage", players_path)
+            with prof.span("dedup_merge"):
+                dres = dedup_players_csv(players_path, threshold=d_thr)
+            _snapshot("après dédoublonnage", players_path)
+            st.session_state.pop("dedup_pairs", None)
+            st.success(f"{dres['clusters']} grappes fusionnées: {dres['rows']} → {dres['rows_after']} lignes.")
+            if dres["clusters"]:
+                st.dataframe(dres["report"], use_container_width=True, hide_index=True)
+    d_sig, d_pairs = st.session_state.get("dedup_pairs", ("", None))
+    if d_pairs is not None and d_sig == file_signature(players_path):
+        dm = d_pairs["score"].ge(d_thr)
+        st.caption(f"{int(dm.sum())} paires à fusionner, {int((~dm).sum())} à revoir (score sous le seuil).")
+        st.dataframe(d_pairs, use_container_width=True, hide_index=True)
+
+    st.divider()
+    st.markdown("### ⚙️ Recalcul de toutes les saisons")
+    st.caption(f"Enrichissement, validation et résumés cap/roster pour chaque equipes_joueurs_*/transactions_* de DATA_DIR, "
+               f"une saison par process. Sorties: {os.path.join(DATA_DIR, 'batch')}/<saison>/ (saisons inchangées sautées).")
+    b1, b2 = st.columns(2)
+    with b1:
+        b_workers = st.number_input("Process", min_value=1, max_value=64, value=os.cpu_count() or 1, step=1, key="batch_workers")
+    with b2:
+        b_force = st.checkbox("Tout recalculer", value=False, key="batch_force")
+    if st.button("▶️ Lancer le recalcul"):
+        progress = _progress_reporter("batch_progress")
+        with prof.span("batch"):
+            b_res = run_batch(DATA_DIR, players_path=players_path, contracts_cache=CONTRACTS_JOIN_CACHE_DEFAULT,
+                              workers=int(b_workers), force=b_force, progress_cb=progress)
+        progress.close()
+        st.session_state["batch_result"] = b_res
+    b_res = st.session_state.get("batch_result")
+    if b_res is not None:
+        if b_res.empty:
+            st.info("Aucune saison trouvée dans DATA_DIR.")
+        else:
+            if b_res["status"].eq("error").any():
+                st.error(f"{int(b_res['status'].eq('error').sum())} saison(s) en erreur.")
+            st.dataframe(b_res, use_container_width=True, hide_index=True)
+
+    st.divider()
+    st.markdown("### 🖼️ Assets (drapeaux & logos)")
+    st.caption(f"Cache local: {ASSET_CACHE_DIR_DEFAULT} — les vues roster n'utilisent que ce cache (aucun appel flagcdn au rendu).")
+    a1, a2 = st.columns(2)
+    with a1:
+        if st.button("🏳️ Télécharger les drapeaux manquants"):
+            pdb = load_players_db_frame(players_path)
+            codes = pdb["FlagISO2"].dropna().astype(str).unique() if "FlagISO2" in pdb.columns else []
+            with st.spinner("Téléchargement des drapeaux…"):
+                fs = fetch_flags(codes, ASSET_CACHE_DIR_DEFAULT)
+            st.success(f"Drapeaux: {fs['fetched']} téléchargés, {fs['cached']} déjà en cache.")
+            if fs["failed"]:
+                st.warning("Échecs: " + ", ".join(fs["failed"]))
+    with a2:
+        if st.button("🖼️ Générer les miniatures de logos"):
+            logos = find_logos(LOGO_DIRS)
+            made = {thumbnail(p, ASSET_CACHE_DIR_DEFAULT, n) for p in logos.values() for n in THUMB_SIZES}
+            made.discard("")
+            st.success(f"{len(logos)} logos → {len(made)} miniatures.")
+    cs = cache_stats(ASSET_CACHE_DIR_DEFAULT)
+    st.caption(f"Drapeaux: {cs['flags']['files']} ({cs['flags']['kb']} KB) · Miniatures: {cs['thumbs']['files']} ({cs['thumbs']['kb']} KB)")
+
+    st.divider()
+    st.markdown("### 🕓 Versions (snapshots) & diff")
+    st.caption("Versions prises automatiquement avant/après country fill, contrats, stats sync et restore.")
+    snap_kind = st.radio("Fichier", [KIND_PLAYERS, KIND_ROSTER], horizontal=True, key="snap_kind",
+                         format_func=lambda k: "Players DB" if k == KIND_PLAYERS else "Roster")
+    snap_src = players_path if snap_kind == KIND_PLAYERS else roster_file
+    if st.button("📸 Snapshot maintenant"):
+        e = take_snapshot(snap_src, SNAPSHOT_DIR_DEFAULT, snap_kind, label="manuel")
+        st.success(f"Snapshot {e['hash']}" if e else "Fichier introuvable.")
+    snaps = [x for x in list_snapshots(SNAPSHOT_DIR_DEFAULT, snap_kind) if x.get("source") == snap_src]
+    if not snaps:
+        st.caption("Aucun snapshot pour ce fichier.")
+    else:
+        snap_labels = {x["hash"]: f"{x['ts']} · {x.get('label') or '-'} · {x['hash'][:8]} · {x['rows']} lignes" for x in snaps}
+        v1, v2 = st.columns(2)
+        with v1:
+            snap_a = st.selectbox("Version A (avant)", list(snap_labels), format_func=snap_labels.get, key="snap_a")
+        with v2:
+            snap_b = st.selectbox("Version B (après)", [""] + list(snap_labels), key="snap_b",
+                                  format_func=lambda h: snap_labels.get(h, "(fichier courant)"))
+        if st.button("🔍 Diff A → B"):
+            with prof.span("snapshot.diff"):
+                old = load_snapshot(SNAPSHOT_DIR_DEFAULT, snap_kind, snap_a)
+                new = load_snapshot(SNAPSHOT_DIR_DEFAULT, snap_kind, snap_b) if snap_b else read_current(snap_src)
+                d = diff_frames(old, new, snap_kind)
+            st.json(diff_summary(d))
+            if len(d["cells"]):
+                st.caption("Cellules modifiées")
+                st.dataframe(d["cells"].head(5000), use_container_width=True)
+            if len(d["added"]):
+                st.caption("Lignes ajoutées")
+                st.dataframe(d["added"].head(1000), use_container_width=True)
+            if len(d["removed"]):
+                st.caption("Lignes retirées")
+                st.dataframe(d["removed"].head(1000), use_container_width=True)
+
+    st.divider()
+    st.markdown("### ⏱️ Profiling (timings par rerun)")
+    prof_on = st.checkbox("Activer le profilage (toutes les sessions)", value=prof.enabled(), key="prof_on")
+    if prof_on != prof.enabled():
+        prof.set_enabled(prof_on)
+    if prof.enabled():
+        prof_n = st.number_input("Derniers reruns", min_value=1, max_value=50, value=20, step=1)
+        st.caption("Étapes les plus lentes")
+        st.dataframe(prof.stage_summary(int(prof_n)), use_container_width=True)
+        st.caption("HTTP (latence / erreurs / retries / cache par endpoint)")
+        st.dataframe(prof.http_summary(), use_container_width=True)
+        p1, p2 = st.columns(2)
+        with p1:
+            st.download_button("⬇️ Export JSON", data=prof.export_json(int(prof_n)), file_name="pms_profile.json", mime="application/json")
+        with p2:
+            if st.button("🧹 Reset profiling"):
+                prof.reset()
+                st.success("Profiling reset.")
     else:
-        st.info("Drive API non configurée ici (normal). Si tu veux Drive direct: ajoute folder_id + OAuth valid scope.")
+        st.caption("Profilage désactivé (PMS_PROFILE=1 pour l'activer au démarrage).")
 
     st.divider()
     st.caption("Debug paths:")
@@ -761,4 +1105,8 @@ elif active_tab == "🛠️ Gestion Admin":
         CLUB_COUNTRY_CACHE_DEFAULT,
         NHL_COUNTRY_CHECKPOINT_DEFAULT,
         BACKUP_DIR_DEFAULT,
+        STORE_DB_PATH_DEFAULT,
+        SNAPSHOT_DIR_DEFAULT,
     ]))
+
+prof.end_run(_prof_sid)
@@ -3,6 +3,8 @@ import os, json
 import pandas as pd
 import streamlit as st
 
+from pms_progress import ProgressReporter, format_event, fraction
+
 def nhl_cache_path_default(data_dir: str) -> str:
     os.makedirs(data_dir, exist_ok=True)
     return os.path.join(data_dir, "nhl_country_cache.json")
@@ -124,12 +126,13 @@ def render_players_db_admin(*, pdb_path: str, data_dir: str, season_lbl=None, up
     prog = st.progress(0.0)
     status = st.empty()
 
-    def _cb(done: int, total: int, phase: str):
-        total = max(int(total or 0), 1)
-        done = int(done or 0)
-        prog.progress(min(1.0, max(0.0, done/total)))
-        status.caption(f"{phase}: {done}/{total}")
-        st.session_state["pdb_last"] = {"phase": phase, "index": done, "total": total}
+    def _sink(ev: dict):
+        prog.progress(fraction(ev))
+        status.caption(format_event(ev))
+        st.session_state["pdb_last"] = {"phase": ev["phase"], "index": ev["done"], "total": ev["total"]}
+
+    # accepte (done, total, phase) comme le schéma commun; UI redessinée ~4 fois/s max
+    _cb = ProgressReporter(_sink, min_interval=0.25)
 
     if st.button("⬆️ Mettre à jour Players DB", use_container_width=True):
         try:
@@ -146,6 +149,7 @@ def render_players_db_admin(*, pdb_path: str, data_dir: str, season_lbl=None, up
                 cache_path=cache_path,
                 progress_cb=_cb,
             )
+            _cb.close()
             st.success("✅ Terminé.")
             if show_details:
                 st.json(stats)
@@ -167,6 +171,7 @@ def render_players_db_admin(*, pdb_path: str, data_dir: str, season_lbl=None, up
                 cache_path=cache_path,
                 progress_cb=_cb,
             )
+            _cb.close()
             st.success("✅ Terminé (resume).")
             if show_details:
                 st.json(stats)
@@ -0,0 +1,118 @@
+# pms_assets.py
+from __future__ import annotations
+
+import os
+import re
+from typing import Iterable, Optional
+
+import requests
+
+from pms_common import strip_accents
+from pms_snapshot import content_hash
+
+# Cache local des images: drapeaux (flagcdn, téléchargés une fois) et miniatures de logos
+# nommées par hash du contenu source (un logo dupliqué data/ / assets/previews/ = une miniature).
+FLAG_URL = "https://flagcdn.com/w40/{cc}.png"
+THUMB_SIZES = (32, 64, 128)
+LOGO_DIRS = ["data", os.path.join("assets", "previews")]
+
+_memo: dict = {}
+
+
+def _slug(s: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", strip_accents(str(s or "")).lower())
+
+
+def thumbnail(src: str, cache_dir: str, size: int = 64) -> str:
+    """
+    Miniature PNG (côté max = size) de src, générée une fois dans cache_dir/thumbs/<hash>_<size>.png.
+    Retourne "" si src est absent ou illisible.
+    """
+    try:
+        st_ = os.stat(src)
+    except OSError:
+        return ""
+    memo_key = (src, st_.st_mtime_ns, st_.st_size, int(size))
+    hit = _memo.get(memo_key)
+    if hit and os.path.exists(hit):
+        return hit
+
+    out = os.path.join(cache_dir, "thumbs", f"{content_hash(src)}_{int(size)}.png")
+    if not os.path.exists(out):
+        try:
+            from PIL import Image
+        except Exception:
+            return ""
+        try:
+            with Image.open(src) as im:
+                im = im.convert("RGBA")
+                im.thumbnail((int(size), int(size)), Image.LANCZOS)
+                os.makedirs(os.path.dirname(out), exist_ok=True)
+                tmp = out + ".tmp"
+                im.save(tmp, format="PNG", optimize=True)
+                os.replace(tmp, out)
+        except Exception:
+            return ""
+    _memo[memo_key] = out
+    return out
+
+
+def find_logos(dirs: Iterable[str] = LOGO_DIRS) -> dict:
+    """slug d'équipe -> chemin du logo ("Red_Wings_Logo.png" -> "redwings"); premier dossier gagnant."""
+    out = {}
+    for d in dirs:
+        if not os.path.isdir(d):
+            continue
+        for f in sorted(os.listdir(d)):
+            stem, ext = os.path.splitext(f)
+            if ext.lower() not in (".png", ".jpg", ".jpeg", ".webp"):
+                continue
+            k = _slug(re.sub(r"[_\-\s]*logo$", "", stem, flags=re.IGNORECASE))
+            if k and k not in out:
+                out[k] = os.path.join(d, f)
+    return out
+
+
+def team_logo(owner: str, logos: dict) -> Optional[str]:
+    return logos.get(_slug(owner))
+
+
+def flag_file(iso2: str, cache_dir: str) -> str:
+    """Chemin du drapeau en cache local, "" si pas encore téléchargé (aucun appel réseau)."""
+    cc = str(iso2 or "").strip().lower()
+    if len(cc) != 2 or not cc.isalpha():
+        return ""
+    p = os.path.join(cache_dir, "flags", f"{cc}.png")
+    return p if os.path.exists(p) else ""
+
+
+def fetch_flags(codes: Iterable[str], cache_dir: str, *, url: str = FLAG_URL, timeout: float = 8.0) -> dict:
+    """Télécharge les drapeaux manquants (une seule fois par code). {"fetched", "cached", "failed"}"""
+    stats = {"fetched": 0, "cached": 0, "failed": []}
+    os.makedirs(os.path.join(cache_dir, "flags"), exist_ok=True)
+    for cc in sorted({str(c or "").strip().lower() for c in codes}):
+        if len(cc) != 2 or not cc.isalpha():
+            continue
+        if flag_file(cc, cache_dir):
+            stats["cached"] += 1
+            continue
+        try:
+            r = requests.get(url.format(cc=cc), timeout=timeout)
+            r.raise_for_status()
+            p = os.path.join(cache_dir, "flags", f"{cc}.png")
+            with open(p + ".tmp", "wb") as f:
+                f.write(r.content)
+            os.replace(p + ".tmp", p)
+            stats["fetched"] += 1
+        except Exception:
+            stats["failed"].append(cc.upper())
+    return stats
+
+
+def cache_stats(cache_dir: str) -> dict:
+    out = {}
+    for sub in ("flags", "thumbs"):
+        d = os.path.join(cache_dir, sub)
+        files = [os.path.join(d, f) for f in os.listdir(d)] if os.path.isdir(d) else []
+        out[sub] = {"files": len(files), "kb": round(sum(os.path.getsize(f) for f in files) / 1024, 1)}
+    return out
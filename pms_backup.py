@@ -0,0 +1,40 @@
+# pms_backup.py
+from __future__ import annotations
+
+import os
+import shutil
+import zipfile
+from datetime import datetime
+
+
+def zip_backup(dest_dir: str, files: list[str], data_dir: str) -> str:
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_path = os.path.join(dest_dir, f"backup_{ts}.zip")
+    with zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        for fp in files:
+            if fp and os.path.exists(fp):
+                arc = os.path.relpath(fp, data_dir) if fp.startswith(data_dir + os.sep) else os.path.basename(fp)
+                z.write(fp, arcname=arc)
+    return out_path
+
+
+def restore_zip(zip_path: str, dest_dir: str) -> dict:
+    if not os.path.exists(zip_path):
+        return {"ok": False, "error": "zip not found"}
+    try:
+        with zipfile.ZipFile(zip_path, "r") as z:
+            z.extractall(dest_dir)
+        return {"ok": True}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+def restore_csv_file(src_csv: str, dst_csv: str) -> dict:
+    if not src_csv or not os.path.exists(src_csv):
+        return {"ok": False, "error": "source csv not found"}
+    try:
+        os.makedirs(os.path.dirname(dst_csv) or ".", exist_ok=True)
+        shutil.copy2(src_csv, dst_csv)
+        return {"ok": True}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
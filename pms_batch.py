@@ -0,0 +1,202 @@
+# pms_batch.py
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Optional
+
+import pandas as pd
+
+from pms_cap import build_cap_ledger
+from pms_common import file_signature, read_json, write_csv_atomic, write_json
+from pms_contracts import contracts_map, enrich_roster_from_contracts
+from pms_enrich import _guess_name_col, enrich_level_from_players_db
+from pms_roster import ROSTER_COLS, slot_buckets
+from pms_schema import parse_cap_hit
+from pms_shared import shared_players_db
+from pms_snapshot import read_current
+from pms_tx import tx_read
+from pms_validate import classify, cross_rules, validate_frame
+
+# Recalcul de toutes les saisons de DATA_DIR (equipes_joueurs_* / transactions_*):
+# une tâche par saison sur un pool de process (enrichissement, validation, résumés cap).
+# Les workers lisent la players DB via le fichier Arrow mappé (pms_shared), construit
+# une fois par le parent. Sorties dans <out_dir>/<saison>/, chacune écrite de façon
+# atomique, manifest.json en dernier: une saison sans manifest à jour est recalculée.
+OUTPUTS = ["roster_enriched.csv", "roster_summary.csv", "cap_summary.csv", "validation.csv"]
+MANIFEST = "manifest.json"
+RESULT_COLS = ["season", "status", "players", "owners", "errors", "ms", "message"]
+
+
+def discover_seasons(data_dir: str) -> dict:
+    """Saison -> {"roster": chemin|"", "transactions": chemin|""}."""
+    out: dict = {}
+    if not os.path.isdir(data_dir):
+        return out
+    for f in sorted(os.listdir(data_dir)):
+        kind, season = classify(f)
+        if kind in ("roster", "transactions"):
+            out.setdefault(season, {"roster": "", "transactions": ""})[kind] = os.path.join(data_dir, f)
+    return out
+
+
+def _inputs(files: dict, players_path: str, contracts_cache: str) -> dict:
+    paths = [files.get("roster", ""), files.get("transactions", ""), players_path, contracts_cache]
+    return {p: file_signature(p) for p in paths if p}
+
+
+def is_current(season_dir: str, inputs: dict) -> bool:
+    m = read_json(os.path.join(season_dir, MANIFEST))
+    return m.get("inputs") == inputs and all(os.path.exists(os.path.join(season_dir, o)) for o in OUTPUTS)
+
+
+def roster_summary(roster: pd.DataFrame, tx: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Par propriétaire: joueurs par bloc (Actifs/Banc/IR/Mineur), salaire total, transactions."""
+    cols = ["owner", "players", "actifs", "banc", "ir", "mineur", "salary", "transactions"]
+    ocol, scol = ROSTER_COLS["owner"], ROSTER_COLS["slot"]
+    if roster is None or roster.empty or ocol not in roster.columns:
+        return pd.DataFrame(columns=cols)
+    stat = ROSTER_COLS["status"]
+    b = slot_buckets(roster[scol] if scol in roster.columns else pd.Series("", index=roster.index),
+                     roster[stat] if stat in roster.columns else None)
+    owner = roster[ocol].fillna("").astype(str).str.strip()
+    sal = parse_cap_hit(roster[ROSTER_COLS["salary"]].astype(object)) if ROSTER_COLS["salary"] in roster.columns else pd.Series(0, index=roster.index)
+    g = pd.crosstab(owner, b).reindex(columns=["ACTIFS", "BANC", "IR", "MINEUR"], fill_value=0)
+    out = pd.DataFrame({
+        "players": owner.value_counts(), "actifs": g["ACTIFS"], "banc": g["BANC"], "ir": g["IR"], "mineur": g["MINEUR"],
+        "salary": sal.astype("Int64").fillna(0).groupby(owner).sum(),
+    }).fillna(0)
+    n_tx = pd.Series(0, index=out.index)
+    if tx is not None and not tx.empty:
+        both = pd.concat([tx["owner_a"], tx["owner_b"]]).fillna("").astype(str).str.strip()
+        n_tx = both.value_counts().reindex(out.index, fill_value=0)
+    out["transactions"] = n_tx
+    out = out[out.index != ""].rename_axis("owner").reset_index()
+    return out[cols].astype({c: "int64" for c in cols[1:]})
+
+
+def season_job(season: str, files: dict, players_path: str, contracts_cache: str, out_dir: str, *, force: bool = False) -> dict:
+    """Une saison: enrichit le roster, valide roster + transactions, résume cap et roster. Exécuté dans un worker."""
+    t0 = time.perf_counter()
+    season_dir = os.path.join(out_dir, season)
+    inputs = _inputs(files, players_path, contracts_cache)
+    if not force and is_current(season_dir, inputs):
+        m = read_json(os.path.join(season_dir, MANIFEST))
+        return {"season": season, "status": "skipped", **{k: m.get(k, 0) for k in ("players", "owners", "errors")}, "ms": 0.0, "message": ""}
+    os.makedirs(season_dir, exist_ok=True)
+
+    db = shared_players_db(players_path).frame()
+    roster = read_current(files["roster"]) if files.get("roster") else pd.DataFrame()
+    tx = tx_read(files["transactions"]) if files.get("transactions") else pd.DataFrame()
+
+    # enrichissement: contrats PuckPedia (join persisté) puis players DB pour ce qui reste
+    enriched = roster
+    if not roster.empty and ROSTER_COLS["player"] in roster.columns:
+        if contracts_cache and os.path.exists(contracts_cache):
+            joined = pd.read_csv(contracts_cache, dtype={"Level": str, "Expiry Year": str, "_k": str}, keep_default_na=False)
+            enriched = enrich_roster_from_contracts(enriched, contracts_map(joined), name_col=ROSTER_COLS["player"])
+        enriched = enrich_level_from_players_db(enriched, db, name_col_df=ROSTER_COLS["player"])
+
+    # validation: schémas des fichiers de la saison + règles roster/transactions/players DB
+    name_col = _guess_name_col(db) if not db.empty else None
+    # cross_rules attend du texte: la frame partagée est typée (string[pyarrow], NA possibles)
+    names = db[[name_col]].astype(object).fillna("") if name_col else pd.DataFrame()
+    files_v = {"hockey.players.csv": ("players", "", names)}
+    parts = []
+    for kind in ("roster", "transactions"):
+        if files.get(kind):
+            f = os.path.basename(files[kind])
+            df = roster if kind == "roster" else read_current(files[kind])
+            files_v[f] = (kind, season, df)
+            parts.append(validate_frame(df, kind).assign(file=f, kind=kind))
+    parts.append(cross_rules(files_v))
+    parts = [p for p in parts if len(p)]
+    validation = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["file", "kind", "severity", "rule", "column", "line", "value", "message"])
+
+    cap = build_cap_ledger(roster, db, season).owner_summary() if not roster.empty else pd.DataFrame()
+    summ = roster_summary(roster, tx)
+
+    for name, df in zip(OUTPUTS, (enriched, summ, cap, validation)):
+        write_csv_atomic(df, os.path.join(season_dir, name))
+    res = {"season": season, "status": "ok", "players": int(len(roster)), "owners": int(len(summ)),
+           "errors": int(validation["severity"].eq("error").sum()) if len(validation) else 0,
+           "ms": round((time.perf_counter() - t0) * 1000.0, 1), "message": ""}
+    write_json(os.path.join(season_dir, MANIFEST), {**res, "inputs": inputs, "outputs": OUTPUTS,
+                                                     "built": datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+    return res
+
+
+def _job(args: tuple) -> dict:
+    season, files, players_path, contracts_cache, out_dir, force = args
+    try:
+        return season_job(season, files, players_path, contracts_cache, out_dir, force=force)
+    except Exception as e:
+        return {"season": season, "status": "error", "players": 0, "owners": 0, "errors": 0, "ms": 0.0, "message": f"{type(e).__name__}: {e}"}
+
+
+def run_batch(
+    data_dir: str,
+    *,
+    players_path: str = "",
+    contracts_cache: str = "",
+    out_dir: str = "",
+    seasons: Optional[list] = None,
+    workers: Optional[int] = None,
+    force: bool = False,
+    progress_cb: Optional[Callable] = None,
+) -> pd.DataFrame:
+    """
+    Toutes les saisons (ou `seasons`) en parallèle. workers=None: un process par cœur
+    (borné au nombre de saisons); workers=1: exécution dans le process courant.
+    Retourne une ligne par saison (RESULT_COLS), status ok / skipped / error.
+    """
+    players_path = players_path or os.path.join(data_dir, "hockey.players.csv")
+    contracts_cache = contracts_cache or os.path.join(data_dir, "contracts_join_cache.csv")
+    out_dir = out_dir or os.path.join(data_dir, "batch")
+    found = discover_seasons(data_dir)
+    todo = [s for s in found if seasons is None or s in seasons]
+    if not todo:
+        return pd.DataFrame(columns=RESULT_COLS)
+    # Arrow IPC construit ici: les workers ne font que le mapper
+    shared_players_db(players_path)
+    jobs = [(s, found[s], players_path, contracts_cache, out_dir, force) for s in todo]
+    n = min(len(jobs), workers or os.cpu_count() or 1)
+
+    rows, counters = [], {"ok": 0, "skipped": 0, "error": 0}
+
+    def _done(r):
+        rows.append(r)
+        counters[r["status"]] += 1
+        if progress_cb:
+            progress_cb({"phase": "batch", "done": len(rows), "total": len(jobs), "counters": dict(counters)})
+
+    if n <= 1:
+        for j in jobs:
+            _done(_job(j))
+    else:
+        # spawn: pas de fork d'un serveur multi-thread (Streamlit)
+        with ProcessPoolExecutor(max_workers=n, mp_context=mp.get_context("spawn")) as ex:
+            for fut in as_completed([ex.submit(_job, j) for j in jobs]):
+                _done(fut.result())
+    return pd.DataFrame(rows, columns=RESULT_COLS).sort_values("season").reset_index(drop=True)
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Recalcul de toutes les saisons de DATA_DIR")
+    ap.add_argument("data_dir", nargs="?", default="data")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--force", action="store_true")
+    ap.add_argument("--season", action="append", dest="seasons")
+    a = ap.parse_args(argv)
+    res = run_batch(a.data_dir, workers=a.workers, force=a.force, seasons=a.seasons)
+    print(res.to_string(index=False) if len(res) else "Aucune saison trouvée.")
+    return 1 if res["status"].eq("error").any() else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,285 @@
+# pms_cap.py
+from __future__ import annotations
+
+import re
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from pms_contracts import season_end_year
+from pms_enrich import _guess_name_col, _norm_player_key, player_keys, upper_col
+from pms_roster import ROSTER_COLS
+from pms_schema import parse_cap_hit
+
+# Plafond LNH par saison (année de fin); une ligue peut passer son propre plafond.
+CAP_LIMITS = {2026: 95_500_000, 2027: 104_000_000, 2028: 113_500_000}
+SEASONS_AHEAD = 3
+LEDGER_COLS = ["owner", "player", "_k", "cap_hit", "expiry_end", "level", "expiry_status", "source"]
+DB_COLS = ["cap_hit", "expiry_end", "level", "expiry_status"]
+
+
+def season_labels(season_lbl: str, n: int) -> list:
+    """ "2025-2026", 3 -> ["2025-2026", "2026-2027", "2027-2028"] """
+    end = season_end_year(season_lbl)
+    if end is None:
+        return []
+    return [f"{y - 1}-{y}" for y in range(end, end + int(n))]
+
+
+def split_names(txt) -> list:
+    """Liste libre du formulaire Transactions ("A, B" / une par ligne / ";") -> noms."""
+    return [p.strip() for p in re.split(r"[,;\n]+", str(txt or "")) if p.strip()]
+
+
+def _end_years(s: pd.Series) -> pd.Series:
+    s = s.astype(object).where(s.notna(), "").astype(str)
+    uniq = pd.unique(s)
+    return s.map(dict(zip(uniq, map(season_end_year, uniq)))).astype("Int64")
+
+
+def _db_contracts(players_db: pd.DataFrame) -> pd.DataFrame:
+    """players DB -> cap_hit, expiry_end, level, expiry_status indexés par clé (première ligne par clé)."""
+    name_col = _guess_name_col(players_db) if players_db is not None else None
+    if not name_col:
+        return pd.DataFrame(columns=["_k"] + DB_COLS).set_index("_k")
+    db = pd.DataFrame({
+        "_k": player_keys(players_db[name_col]),
+        "cap_hit": parse_cap_hit(players_db["Cap Hit"]) if "Cap Hit" in players_db.columns else pd.NA,
+        "expiry_end": _end_years(players_db["Expiry Year"]) if "Expiry Year" in players_db.columns else pd.NA,
+        "level": upper_col(players_db, "Level"),
+        "expiry_status": upper_col(players_db, "Expiry Status"),
+    })
+    return db[db["_k"].ne("")].drop_duplicates("_k").set_index("_k")
+
+
+def _ledger_rows(roster: pd.DataFrame, db: pd.DataFrame) -> pd.DataFrame:
+    """Roster -> lignes du registre (contrat de la players DB, sinon Salaire du roster)."""
+    if roster is None or roster.empty or ROSTER_COLS["player"] not in roster.columns:
+        return pd.DataFrame(columns=LEDGER_COLS)
+
+    def _text(c):
+        if c not in roster.columns:
+            return pd.Series("", index=roster.index, dtype=object)
+        return roster[c].astype(object).where(roster[c].notna(), "").astype(str).str.strip()
+
+    sal_col = ROSTER_COLS["salary"]
+    r = pd.DataFrame({
+        "owner": _text(ROSTER_COLS["owner"]),
+        "player": _text(ROSTER_COLS["player"]),
+        "salary": parse_cap_hit(roster[sal_col].astype(object)) if sal_col in roster.columns else pd.NA,
+    })
+    r["_k"] = player_keys(r["player"])
+    r = r[r["owner"].ne("") & r["_k"].ne("")]
+    r = r.merge(db, left_on="_k", right_index=True, how="left")
+    r["source"] = np.where(r["cap_hit"].notna(), "players_db", "roster")
+    r["cap_hit"] = r["cap_hit"].astype("Int64").fillna(r["salary"].astype("Int64"))
+    r[["level", "expiry_status"]] = r[["level", "expiry_status"]].fillna("")
+    return r[LEDGER_COLS].reset_index(drop=True)
+
+
+def _row_ids(rows: pd.DataFrame) -> pd.Series:
+    """Identité d'une ligne du registre (toutes les colonnes) + rang d'occurrence: diff en multiensemble."""
+    t = rows[LEDGER_COLS].astype(object).where(rows[LEDGER_COLS].notna(), "").astype(str)
+    ids = t[LEDGER_COLS[0]]
+    for c in LEDGER_COLS[1:]:
+        ids = ids + "\x00" + t[c]
+    return ids + "\x00" + ids.groupby(ids).cumcount().astype(str)
+
+
+class CapLedger:
+    """
+    Registre de cap par propriétaire: une ligne par joueur (cap_hit, dernière saison du contrat)
+    et les totaux propriétaire × saison. evaluate() ne touche que les joueurs échangés;
+    apply() déplace les joueurs et met les totaux à jour par delta.
+    Partagé entre sessions: les écritures construisent de nouvelles frames et les publient
+    ensemble sous verrou; les lecteurs prennent une paire (players, totals) cohérente.
+    """
+
+    def __init__(self, players: pd.DataFrame, season_lbl: str, *, seasons: int = SEASONS_AHEAD + 1, db: Optional[pd.DataFrame] = None):
+        self.season = season_lbl
+        self.seasons = season_labels(season_lbl, seasons)
+        self._ends = np.array([season_end_year(s) for s in self.seasons], dtype=np.int64)
+        self.players = players.reset_index(drop=True)
+        self._db = db if db is not None else pd.DataFrame(columns=["_k"] + DB_COLS).set_index("_k")
+        self.totals = self._totals(self.players)
+        self._lock = threading.Lock()
+
+    def _snapshot(self) -> tuple:
+        """(players, totals) publiés ensemble; jamais modifiés en place après publication."""
+        with self._lock:
+            return self.players, self.totals
+
+    def _matrix(self, rows: pd.DataFrame) -> np.ndarray:
+        """Joueurs × saisons: cap_hit tant que la saison ne dépasse pas la fin du contrat."""
+        cap = rows["cap_hit"].astype("Float64").fillna(0).to_numpy(dtype=np.float64)
+        # fin inconnue: compté pour la saison courante seulement
+        end = rows["expiry_end"].astype("Float64").fillna(float(self._ends[0]) if len(self._ends) else 0).to_numpy(dtype=np.float64)
+        return cap[:, None] * (self._ends[None, :] <= end[:, None])
+
+    def _totals(self, rows: pd.DataFrame) -> pd.DataFrame:
+        m = pd.DataFrame(self._matrix(rows), columns=self.seasons, index=rows.index)
+        return m.groupby(rows["owner"].to_numpy()).sum().astype(np.int64)
+
+    @staticmethod
+    def _owner_in(totals: pd.DataFrame, owner: str) -> str:
+        o = str(owner or "").strip()
+        m = {str(x).strip().lower(): x for x in totals.index}
+        return m.get(o.lower(), o)
+
+    def owner_of(self, owner: str) -> str:
+        """Nom de propriétaire tel qu'écrit dans le roster (casse/espaces ignorés)."""
+        return self._owner_in(self._snapshot()[1], owner)
+
+    def resolve(self, owner: str, names) -> tuple:
+        """
+        Noms -> (lignes du registre pour ce propriétaire, not_owned, unresolved). Un nom connu
+        (players DB ou autre roster) mais absent du roster du propriétaire va dans not_owned:
+        il ne peut pas être cédé et ne compte dans aucun delta; un nom inconnu va dans unresolved.
+        """
+        players, totals = self._snapshot()
+        return self._resolve(players, self._owner_in(totals, owner), names)
+
+    def _resolve(self, players: pd.DataFrame, owner: str, names) -> tuple:
+        names = split_names(names) if isinstance(names, str) else list(names or [])
+        mine = players[players["owner"].eq(owner)]
+        by_key = dict(zip(mine["_k"], mine.index))
+        known = set(players["_k"]) | set(self._db.index)
+        rows, not_owned, unresolved = [], [], []
+        for n in names:
+            k = _norm_player_key(n)
+            if k in by_key:
+                rows.append(by_key[k])
+            elif k in known:
+                not_owned.append(n)
+            else:
+                unresolved.append(n)
+        return players.loc[rows], not_owned, unresolved
+
+    def evaluate(self, owner_a: str, owner_b: str, a_players, b_players, *, cap: Optional[dict] = None) -> dict:
+        """
+        Cap avant/après par propriétaire et par saison pour A -> B (a_players) et B -> A (b_players).
+        Seuls les joueurs au roster du cédant comptent; les autres sont listés (not_owned / unresolved) et ok=False.
+        """
+        players, totals = self._snapshot()
+        a, b = self._owner_in(totals, owner_a), self._owner_in(totals, owner_b)
+        a_out, no_a, un_a = self._resolve(players, a, a_players)
+        b_out, no_b, un_b = self._resolve(players, b, b_players)
+        da = self._matrix(a_out).sum(axis=0) if len(a_out) else np.zeros(len(self.seasons))
+        db = self._matrix(b_out).sum(axis=0) if len(b_out) else np.zeros(len(self.seasons))
+        cap = CAP_LIMITS if cap is None else cap
+        rows = []
+        for owner, delta in ((a, db - da), (b, da - db)):
+            before = totals.loc[owner].to_numpy() if owner in totals.index else np.zeros(len(self.seasons))
+            for i, s in enumerate(self.seasons):
+                limit = cap.get(int(self._ends[i]))
+                after = int(before[i] + delta[i])
+                rows.append({
+                    "owner": owner, "season": s, "before": int(before[i]), "after": after, "delta": int(delta[i]),
+                    "cap": limit, "space_after": None if limit is None else int(limit - after),
+                    "over_cap": bool(limit is not None and after > limit),
+                })
+        table = pd.DataFrame(rows)
+        table[["cap", "space_after"]] = table[["cap", "space_after"]].astype("Int64")
+        return {
+            "ok": not (un_a or un_b or no_a or no_b),
+            "table": table,
+            "over_cap": bool(table["over_cap"].any()),
+            "unresolved": {a: un_a, b: un_b},
+            "not_owned": {a: no_a, b: no_b},
+            "moved": {a: a_out["player"].tolist(), b: b_out["player"].tolist()},
+        }
+
+    def apply(self, owner_a: str, owner_b: str, a_players, b_players) -> None:
+        """Applique un échange accepté au registre (totaux mis à jour par delta)."""
+        with self._lock:
+            players, totals = self.players.copy(), self.totals.copy()
+            a, b = self._owner_in(totals, owner_a), self._owner_in(totals, owner_b)
+            moves = [(a, b, self._resolve(players, a, a_players)[0]), (b, a, self._resolve(players, b, b_players)[0])]
+            for src, dst, rows in moves:
+                if rows.empty:
+                    continue
+                d = pd.Series(self._matrix(rows).sum(axis=0).round().astype(np.int64), index=self.seasons)
+                players.loc[rows.index, "owner"] = dst
+                for o in (src, dst):
+                    if o not in totals.index:
+                        totals.loc[o] = 0
+                totals.loc[src] -= d
+                totals.loc[dst] += d
+            self.players, self.totals = players, totals
+
+    def update_roster(self, roster: pd.DataFrame) -> dict:
+        """
+        Roster modifié -> registre à jour sans tout recalculer: seules les lignes ajoutées /
+        retirées changent les totaux. Diff sur la ligne complète (salaire, contrat inclus),
+        en multiensemble: un joueur listé deux fois compte deux fois.
+        """
+        new = _ledger_rows(roster, self._db)
+        with self._lock:
+            players, totals = self.players, self.totals
+            old_ids, new_ids = _row_ids(players), _row_ids(new)
+            gone = players[~old_ids.isin(set(new_ids))]
+            added = new[~new_ids.isin(set(old_ids))]
+            for rows, sign in ((gone, -1), (added, 1)):
+                if rows.empty:
+                    continue
+                totals = totals.add(self._totals(rows) * sign, fill_value=0).astype(np.int64)
+            self.players = pd.concat([players.drop(gone.index), added], ignore_index=True)
+            self.totals = totals
+        return {"removed": len(gone), "added": len(added)}
+
+    def projection(self, owner: str = "") -> pd.DataFrame:
+        """
+        Matrice joueur × saison (cap_hit par saison sous contrat) + statut à l'échéance:
+        flag = "ELC" (fin d'ELC), "UFA" ou "RFA" si le contrat se termine dans la fenêtre.
+        """
+        players, totals = self._snapshot()
+        rows = players if not owner else players[players["owner"].eq(self._owner_in(totals, owner))]
+        return self._projection(rows)
+
+    def _projection(self, rows: pd.DataFrame) -> pd.DataFrame:
+        out = rows[["owner", "player", "level", "cap_hit", "expiry_end"]].reset_index(drop=True)
+        m = pd.DataFrame(self._matrix(rows).round().astype(np.int64), columns=self.seasons)
+        end = rows["expiry_end"].astype("Float64").to_numpy(dtype=np.float64, na_value=np.nan)
+        in_window = (end >= self._ends[0]) & (end <= self._ends[-1]) if len(self._ends) else np.zeros(len(rows), bool)
+        status = rows["expiry_status"].astype(str).to_numpy()
+        level = rows["level"].astype(str).to_numpy()
+        flag = np.where(level == "ELC", "ELC", np.where(np.char.startswith(status.astype(str), "UFA"), "UFA",
+                                                        np.where(np.char.startswith(status.astype(str), "RFA"), "RFA", "")))
+        out["flag"] = np.where(in_window, flag, "")
+        out["expiry"] = [f"{int(e) - 1}-{int(e)}" if e == e else "" for e in end]
+        return pd.concat([out.drop(columns=["expiry_end"]), m], axis=1)
+
+    def owner_summary(self, *, cap: Optional[dict] = None) -> pd.DataFrame:
+        """Par propriétaire et saison: cap engagé, joueurs sous contrat, échéances ELC/UFA/RFA, espace."""
+        cap = CAP_LIMITS if cap is None else cap
+        rows = self._snapshot()[0]
+        cols = ["owner", "season", "committed", "players", "expiring_elc", "expiring_ufa", "expiring_rfa", "cap", "space"]
+        if rows.empty or not self.seasons:
+            return pd.DataFrame(columns=cols)
+        m = self._matrix(rows)
+        p = self._projection(rows)
+        end = rows["expiry_end"].astype("Float64").to_numpy(dtype=np.float64, na_value=np.nan)
+        expiring = end[:, None] == self._ends[None, :]
+        owners = rows["owner"].to_numpy()
+        parts = {"committed": m, "players": m > 0}
+        for f in ("ELC", "UFA", "RFA"):
+            parts[f"expiring_{f.lower()}"] = expiring & (p["flag"].to_numpy() == f)[:, None]
+        stacked = {
+            k: pd.DataFrame(v, columns=self.seasons).groupby(owners).sum().stack()
+            for k, v in parts.items()
+        }
+        out = pd.DataFrame(stacked).round().astype(np.int64).rename_axis(["owner", "season"]).reset_index()
+        out["cap"] = out["season"].map(lambda s: cap.get(season_end_year(s))).astype("Int64")
+        out["space"] = (out["cap"] - out["committed"]).astype("Int64")
+        return out[cols]
+
+
+def build_cap_ledger(roster: pd.DataFrame, players_db: pd.DataFrame, season_lbl: str, *, seasons: int = SEASONS_AHEAD + 1) -> CapLedger:
+    """
+    Roster de la saison + players DB -> CapLedger. Cap Hit / Expiry Year viennent de la players DB;
+    à défaut, Salaire du roster (saison courante seulement).
+    """
+    db = _db_contracts(players_db)
+    return CapLedger(_ledger_rows(roster, db), season_lbl, seasons=seasons, db=db)
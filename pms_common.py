@@ -0,0 +1,81 @@
+# pms_common.py
+from __future__ import annotations
+
+import json
+import os
+import re
+import unicodedata
+
+
+def read_json(path: str) -> dict:
+    try:
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                d = json.load(f)
+                return d if isinstance(d, dict) else {}
+    except Exception:
+        pass
+    return {}
+
+
+def write_json(path: str, data: dict) -> None:
+    if not path:
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data or {}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def write_csv_atomic(df, path: str) -> None:
+    tmp = path + ".tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def file_signature(path: str) -> str:
+    """mtime_ns:size — change dès que le fichier est réécrit (clé de cache)."""
+    try:
+        st_ = os.stat(path)
+        return f"{st_.st_mtime_ns}:{st_.st_size}"
+    except Exception:
+        return ""
+
+
+def strip_accents(s: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
+
+
+def norm_player_key(name: str) -> str:
+    s = strip_accents(str(name or "")).lower().strip()
+    s = re.sub(r"[^a-z0-9\s\-']", " ", s)
+    s = s.replace("’", "'")
+    s = re.sub(r"\s+", " ", s).strip()
+    s = s.replace("matthew ", "matt ")
+    return s
+
+
+# ISO 3166 alpha-3 -> alpha-2 (pays de hockey + ceux présents dans hockey.players.csv)
+ISO3_TO_ISO2 = {
+    "AUS": "AU", "AUT": "AT", "BLR": "BY", "CAN": "CA", "CHE": "CH", "CHN": "CN", "CZE": "CZ",
+    "DEU": "DE", "DNK": "DK", "EST": "EE", "FIN": "FI", "FRA": "FR", "GBR": "GB", "HRV": "HR",
+    "HUN": "HU", "ITA": "IT", "JAM": "JM", "JPN": "JP", "KAZ": "KZ", "KOR": "KR", "LTU": "LT",
+    "LVA": "LV", "NLD": "NL", "NOR": "NO", "POL": "PL", "ROU": "RO", "RUS": "RU", "SRB": "RS",
+    "SVK": "SK", "SVN": "SI", "SWE": "SE", "TUR": "TR", "UKR": "UA", "USA": "US", "BRA": "BR",
+    "NGA": "NG", "ZAF": "ZA", "KEN": "KE", "VEN": "VE", "PRY": "PY", "TWN": "TW", "BHS": "BS",
+    "MEX": "MX", "ARG": "AR", "BEL": "BE", "ESP": "ES", "IRL": "IE", "ISL": "IS", "ISR": "IL",
+    "NZL": "NZ", "PRT": "PT", "BGR": "BG", "GRC": "GR", "LUX": "LU", "BIH": "BA", "MNE": "ME",
+    "GEO": "GE", "ARM": "AM", "UZB": "UZ", "MNG": "MN", "PHL": "PH", "THA": "TH", "SGP": "SG",
+    # codes sportifs (IOC/IIHF) qui diffèrent de l'ISO
+    "GER": "DE", "SUI": "CH", "DEN": "DK", "NED": "NL", "SLO": "SI", "LAT": "LV", "CRO": "HR",
+}
+
+
+def iso2_from_code(code) -> str:
+    """Code pays (ISO2, ISO3 ou IOC) -> ISO2, sinon ""."""
+    cc = str(code or "").strip().upper()
+    if len(cc) == 2 and cc.isalpha():
+        return cc
+    if len(cc) == 3 and cc.isalpha():
+        return ISO3_TO_ISO2.get(cc, "")
+    return ""
@@ -0,0 +1,227 @@
+# pms_contracts.py
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from pms_common import file_signature, read_json, write_csv_atomic, write_json
+from pms_enrich import _guess_name_col, player_keys
+from pms_schema import read_players_db
+
+CONTRACT_LEVEL_MAP = {"entry_level": "ELC", "standard_level": "STD"}
+
+# short_code puckpedia -> code d'équipe de hockey.players.csv
+TEAM_ALIASES = {"NAS": "NSH", "WAS": "WSH", "LA": "LAK", "NJ": "NJD", "SJ": "SJS", "TB": "TBL", "ARI": "UTA"}
+
+JOIN_COLS = ["_row", "_k", "Level", "Expiry Year", "contract_team", "contract_birthdate", "match"]
+
+
+def season_short(lbl) -> str:
+    """ "2025-2026" / "2025-26" / 2026 -> "2025-26" (format Expiry Year de la players DB) """
+    s = str(lbl or "").strip()
+    if not s or s.lower() == "nan":
+        return ""
+    parts = [p for p in s.replace("/", "-").split("-") if p.strip()]
+    try:
+        y0 = int(float(parts[0]))
+    except Exception:
+        return ""
+    if len(parts) == 1:
+        # année seule = année de fin de saison
+        y0 -= 1
+    return f"{y0}-{str(y0 + 1)[-2:]}"
+
+
+def season_end_year(lbl) -> Optional[int]:
+    """ "2025-26" -> 2026, 2026 -> 2026, "" -> None """
+    s = season_short(lbl)
+    return int(s[:4]) + 1 if s else None
+
+
+def _birthdates(s: pd.Series) -> pd.Series:
+    d = pd.to_datetime(s, format="%m/%d/%y", errors="coerce")
+    # %y place 00-68 dans les années 2000: un joueur ne naît pas dans le futur
+    future = d.dt.year > datetime.now().year
+    return d.where(~future, d - pd.DateOffset(years=100))
+
+
+def load_puckpedia_contracts(path: str) -> pd.DataFrame:
+    """
+    data/puckpedia.contracts.csv -> DataFrame normalisé:
+    _k, first_name, last_name, birthdate, team, Level (STD/ELC), Expiry Year ("2025-26").
+    """
+    cols = ["_k", "first_name", "last_name", "birthdate", "team", "Level", "Expiry Year"]
+    if not path or not os.path.exists(path):
+        return pd.DataFrame(columns=cols)
+    raw = pd.read_csv(path, dtype=str, keep_default_na=False)
+
+    def _col(c: str) -> pd.Series:
+        return raw[c].str.strip() if c in raw.columns else pd.Series("", index=raw.index)
+
+    out = pd.DataFrame({"first_name": _col("first_name"), "last_name": _col("last_name")})
+    full = out["first_name"] + " " + out["last_name"]
+    out["_k"] = player_keys(full)
+    out["birthdate"] = _birthdates(_col("birthdate"))
+    team = _col("short_code").str.upper()
+    out["team"] = team.replace(TEAM_ALIASES)
+    out["Level"] = _col("contract_level").str.lower().map(CONTRACT_LEVEL_MAP).fillna("")
+    end = _col("contract_end")
+    out["Expiry Year"] = end.map(dict(zip(pd.unique(end), map(season_short, pd.unique(end)))))
+    out = out[out["_k"].ne("")].reset_index(drop=True)
+    return out[cols]
+
+
+def join_contracts(players_db: pd.DataFrame, contracts: pd.DataFrame, *, ref_year: Optional[int] = None):
+    """
+    Joint les contrats à la players DB en une passe (merge sur le nom normalisé),
+    puis départage avec date de naissance et équipe:
+
+    - sr_dob identique: +4 (sr_dob différent: paire rejetée)
+    - année de naissance compatible avec Age (±1): +1
+    - même équipe: +2
+
+    Retourne (joined, ambiguous):
+    joined = une ligne par ligne players DB matchée (_row = index d'origine);
+    ambiguous = lignes dont plusieurs contrats ont le meilleur score (non remplies).
+    """
+    empty = pd.DataFrame(columns=JOIN_COLS)
+    name_col = _guess_name_col(players_db)
+    if players_db is None or players_db.empty or contracts is None or contracts.empty or not name_col:
+        return empty, pd.DataFrame(columns=["_row", "Player", "candidates"])
+
+    ref_year = ref_year or datetime.now().year
+
+    def _col(c: str) -> pd.Series:
+        return players_db[c] if c in players_db.columns else pd.Series(np.nan, index=players_db.index)
+
+    left = pd.DataFrame({
+        "_row": players_db.index,
+        "_k": player_keys(players_db[name_col]).values,
+        "_team": _col("Team").astype(object).fillna("").astype(str).str.upper().values,
+        "_dob": pd.to_datetime(_col("sr_dob"), errors="coerce").values,
+        "_age": pd.to_numeric(_col("Age"), errors="coerce").values,
+    })
+    left = left[left["_k"].ne("")]
+
+    right = contracts.rename(columns={"team": "contract_team", "birthdate": "contract_birthdate"})
+    pairs = left.merge(right[["_k", "contract_team", "contract_birthdate", "Level", "Expiry Year"]], on="_k", how="inner")
+    if pairs.empty:
+        return empty, pd.DataFrame(columns=["_row", "Player", "candidates"])
+
+    dob_known = pairs["_dob"].notna() & pairs["contract_birthdate"].notna()
+    pairs["_dob_same"] = dob_known & (pairs["_dob"] == pairs["contract_birthdate"])
+    pairs = pairs[~dob_known | pairs["_dob_same"]].copy()
+
+    age_by = ref_year - pairs["_age"]
+    age_ok = pairs["_age"].gt(0) & (age_by - pairs["contract_birthdate"].dt.year).abs().le(1)
+    team_ok = pairs["_team"].ne("") & pairs["_team"].eq(pairs["contract_team"])
+    dob_same = pairs["_dob_same"]
+
+    pairs["_score"] = dob_same.astype(int) * 4 + team_ok.astype(int) * 2 + age_ok.astype(int)
+    pairs["match"] = np.select(
+        [dob_same & team_ok, dob_same, team_ok, age_ok],
+        ["name+dob+team", "name+dob", "name+team", "name+age"],
+        default="name",
+    )
+
+    best = pairs["_score"].eq(pairs.groupby("_row")["_score"].transform("max"))
+    top = pairs[best]
+    n_top = top.groupby("_row")["_row"].transform("size")
+
+    joined = top[n_top.eq(1)][JOIN_COLS].reset_index(drop=True)
+
+    amb = top[n_top.gt(1)]
+    ambiguous = (
+        amb.assign(cand=amb["contract_team"] + " " + amb["contract_birthdate"].dt.strftime("%Y-%m-%d").fillna("?"))
+        .groupby("_row")["cand"].agg(lambda s: ", ".join(sorted(s)))
+        .rename("candidates")
+        .reset_index()
+    )
+    ambiguous.insert(1, "Player", players_db.loc[ambiguous["_row"], name_col].values)
+    return joined, ambiguous
+
+
+def apply_contracts(players_db: pd.DataFrame, joined: pd.DataFrame) -> pd.DataFrame:
+    """Remplit Level / Expiry Year (sans écraser un Level STD/ELC ou une Expiry déjà présente)."""
+    out = players_db.copy()
+    for c in ["Level", "Expiry Year"]:
+        if c not in out.columns:
+            out[c] = ""
+        out[c] = out[c].astype(object)
+    if joined is None or joined.empty:
+        return out
+
+    j = joined.set_index("_row")
+    lvl = out.loc[j.index, "Level"].fillna("").astype(str).str.strip().str.upper()
+    need = lvl.index[~lvl.isin(["STD", "ELC"]) & j["Level"].ne("")]
+    out.loc[need, "Level"] = j.loc[need, "Level"].values
+
+    exp = out.loc[j.index, "Expiry Year"].fillna("").astype(str).str.strip().str.lower()
+    need = exp.index[exp.isin(["", "nan"]) & j["Expiry Year"].ne("")]
+    out.loc[need, "Expiry Year"] = j.loc[need, "Expiry Year"].values
+    return out
+
+
+def contracts_map(joined: pd.DataFrame) -> dict:
+    """Nom normalisé -> {"level", "expiry"} (seulement les noms sans conflit)."""
+    if joined is None or joined.empty:
+        return {}
+    j = joined.drop_duplicates(["_k", "Level", "Expiry Year"])
+    j = j[~j["_k"].duplicated(keep=False)]
+    return {k: {"level": lv, "expiry": ex} for k, lv, ex in zip(j["_k"], j["Level"], j["Expiry Year"])}
+
+
+def build_contracts_join(players_path: str, contracts_path: str, cache_path: str) -> dict:
+    """
+    Join persisté (cache_path .csv + .meta.json) et réutilisé tant que ni la players DB
+    ni le fichier puckpedia n'ont changé.
+    Retourne {"joined", "ambiguous", "cached", "contracts"}.
+    """
+    meta_path = cache_path + ".meta.json"
+    amb_path = cache_path.replace(".csv", "") + ".ambiguous.csv"
+    sig = {"players": file_signature(players_path), "contracts": file_signature(contracts_path)}
+
+    meta = read_json(meta_path)
+    if meta.get("sig") == sig and os.path.exists(cache_path):
+        try:
+            joined = pd.read_csv(cache_path, dtype={"Level": str, "Expiry Year": str, "_k": str}, keep_default_na=False)
+            ambiguous = pd.read_csv(amb_path, keep_default_na=False) if os.path.exists(amb_path) else pd.DataFrame()
+            return {"joined": joined, "ambiguous": ambiguous, "cached": True, "contracts": int(meta.get("contracts", 0))}
+        except Exception:
+            pass
+
+    contracts = load_puckpedia_contracts(contracts_path)
+    players_db = read_players_db(players_path)
+    joined, ambiguous = join_contracts(players_db, contracts)
+
+    write_csv_atomic(joined, cache_path)
+    write_csv_atomic(ambiguous, amb_path)
+    write_json(meta_path, {"sig": sig, "contracts": len(contracts), "built": datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+    return {"joined": joined, "ambiguous": ambiguous, "cached": False, "contracts": len(contracts)}
+
+
+def enrich_roster_from_contracts(df: pd.DataFrame, cmap: dict, *, name_col: str = "Joueur") -> pd.DataFrame:
+    """Level / Expiry Year d'un roster depuis contracts_map (sans écraser les valeurs valides)."""
+    if df is None or df.empty or not cmap or name_col not in df.columns:
+        return df
+    out = df.copy()
+    for c in ["Level", "Expiry Year"]:
+        if c not in out.columns:
+            out[c] = ""
+        out[c] = out[c].astype(object)
+    keys = player_keys(out[name_col])
+    hit = keys.map(cmap)
+    found = hit.notna()
+
+    lvl = out["Level"].fillna("").astype(str).str.strip().str.upper()
+    need = found & ~lvl.isin(["STD", "ELC"])
+    out.loc[need, "Level"] = hit[need].map(lambda d: d.get("level", ""))
+
+    exp = out["Expiry Year"].fillna("").astype(str).str.strip().str.lower()
+    need = found & exp.isin(["", "nan"])
+    out.loc[need, "Expiry Year"] = hit[need].map(lambda d: d.get("expiry", ""))
+    return out
@@ -0,0 +1,393 @@
+# pms_country.py
+from __future__ import annotations
+
+import os
+import re
+from typing import Optional
+
+import pandas as pd
+
+import pms_nhl
+from pms_common import iso2_from_code, read_json, strip_accents, write_json
+from pms_enrich import _norm_player_key
+
+COUNTRY_SOURCE_COL = "Country Source"
+
+FALLBACK_LEAGUE_TO_COUNTRY = {"NCAA":"US","USHL":"US","OHL":"CA","WHL":"CA","QMJHL":"CA","CHL":"CA","SHL":"SE","ALLSVENSKAN":"SE","LIIGA":"FI","MESTIS":"FI","KHL":"RU","NL":"CH","NLA":"CH","DEL":"DE","DEL2":"DE","LIGUE MAGNUS":"FR"}
+SEED_CLUB_TOKENS = {"FROLUNDA":"SE","FÄRJESTAD":"SE","DJURGARDEN":"SE","KARPAT":"FI","HIFK":"FI","DAVOS":"CH","LUGANO":"CH"}
+
+# Les codes d'équipe LNH ne disent rien sur la nationalité: jamais appris ni utilisés comme club.
+NHL_TEAM_CODES = {
+    "ANA", "ARI", "BOS", "BUF", "CAR", "CBJ", "CGY", "CHI", "COL", "DAL", "DET", "EDM", "FLA", "LAK",
+    "MIN", "MTL", "NJD", "NSH", "NYI", "NYR", "OTT", "PHI", "PIT", "SEA", "SJS", "STL", "TBL", "TOR",
+    "UTA", "VAN", "VGK", "WPG", "WSH", "NAS", "WAS",
+}
+
+NATIONALITY_TO_ISO2 = {
+    "CANADA": "CA", "CANADIAN": "CA", "USA": "US", "UNITED STATES": "US", "AMERICAN": "US",
+    "SWEDEN": "SE", "SWEDISH": "SE", "FINLAND": "FI", "FINNISH": "FI", "RUSSIA": "RU", "RUSSIAN": "RU",
+    "CZECHIA": "CZ", "CZECH REPUBLIC": "CZ", "CZECH": "CZ", "SLOVAKIA": "SK", "SLOVAK": "SK",
+    "GERMANY": "DE", "GERMAN": "DE", "SWITZERLAND": "CH", "SWISS": "CH", "DENMARK": "DK", "DANISH": "DK",
+    "NORWAY": "NO", "NORWEGIAN": "NO", "LATVIA": "LV", "LATVIAN": "LV", "BELARUS": "BY", "BELARUSIAN": "BY",
+    "AUSTRIA": "AT", "AUSTRIAN": "AT", "FRANCE": "FR", "FRENCH": "FR", "SLOVENIA": "SI", "SLOVENIAN": "SI",
+    "KAZAKHSTAN": "KZ", "UKRAINE": "UA", "UKRAINIAN": "UA", "AUSTRALIA": "AU", "ITALY": "IT",
+    "UNITED KINGDOM": "GB", "GREAT BRITAIN": "GB", "BRITISH": "GB", "NETHERLANDS": "NL", "POLAND": "PL",
+    "JAMAICA": "JM", "TURKEY": "TR", "JAPAN": "JP", "KOREA": "KR", "SOUTH KOREA": "KR",
+}
+
+CONTRACT_COUNTRY_COLS = ["country", "nationality", "birth_country", "birthCountry"]
+CLUB_COLS = ["Club", "Team", "Current Team", "Junior Team", "Jr Team"]
+LEAGUE_COLS = ["League", "League Name", "Competition", "Junior League", "Jr League"]
+
+
+def _club_slug(s: str) -> str:
+    s = strip_accents((s or "").upper())
+    s = re.sub(r"[\-/_\,\.\(\)]+", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    for w in [" HC"," IF"," IK"," SK"," HOCKEY"," CLUB"," TEAM"," U20"," J20"," U18"," J18"]:
+        s = s.replace(w, "")
+    return s.strip()
+
+
+def _country_from_league(v: str) -> str:
+    up = v.upper()
+    if "ICEHL" in up or "EBEL" in up:
+        return ""
+    for k, cc in FALLBACK_LEAGUE_TO_COUNTRY.items():
+        if k in up:
+            return cc
+    return ""
+
+
+def _country_from_club(v: str, club_cache: dict) -> str:
+    slug = _club_slug(v)
+    if not slug or slug in NHL_TEAM_CODES:
+        return ""
+    if slug in club_cache:
+        return str(club_cache.get(slug) or "").strip().upper()
+    for tok, cc in SEED_CLUB_TOKENS.items():
+        if tok in slug:
+            return cc
+    return ""
+
+
+def _infer_from_league(row: dict) -> str:
+    for col in LEAGUE_COLS:
+        v = row.get(col)
+        if isinstance(v, str) and v.strip():
+            cc = _country_from_league(v)
+            if cc:
+                return cc
+    return ""
+
+
+def _infer_from_club(row: dict, club_cache: dict) -> str:
+    for col in CLUB_COLS:
+        v = row.get(col)
+        if isinstance(v, str) and v.strip():
+            cc = _country_from_club(v, club_cache)
+            if cc:
+                return cc
+    return ""
+
+
+def _learn_club(row: dict, cc: str, club_cache: dict) -> None:
+    for col in CLUB_COLS:
+        v = row.get(col)
+        if isinstance(v, str) and v.strip():
+            slug = _club_slug(v)
+            if slug and slug not in NHL_TEAM_CODES and slug not in club_cache:
+                club_cache[slug] = cc
+
+
+def _text(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[col].fillna("").astype(str).str.strip()
+
+
+def _map_unique(s: pd.Series, fn) -> pd.Series:
+    """Applique fn une seule fois par valeur distincte (les colonnes club/ligue se répètent beaucoup)."""
+    uniq = pd.unique(s)
+    return s.map(dict(zip(uniq, (fn(u) for u in uniq))))
+
+
+def _pid_text(df: pd.DataFrame) -> pd.Series:
+    """playerId lu en float par pandas ("8478402.0") -> "8478402"."""
+    return _text(df, "playerId").str.replace(r"\.0$", "", regex=True)
+
+
+def _name_col(df: pd.DataFrame) -> Optional[str]:
+    for c in ["Player", "Joueur", "Name", "Nom"]:
+        if c in df.columns:
+            return c
+    return None
+
+
+def load_contracts_countries(path: str) -> pd.DataFrame:
+    """Puckpedia contracts -> (_k, country) si le fichier porte une colonne pays, sinon vide."""
+    empty = pd.DataFrame(columns=["_k", "country"])
+    if not path or not os.path.exists(path):
+        return empty
+    try:
+        c = pd.read_csv(path)
+    except Exception:
+        return empty
+    col = next((x for x in CONTRACT_COUNTRY_COLS if x in c.columns), None)
+    if not col or "first_name" not in c.columns or "last_name" not in c.columns:
+        return empty
+    out = pd.DataFrame({
+        "_k": (_text(c, "first_name") + " " + _text(c, "last_name")).map(_norm_player_key),
+        "country": _text(c, col).map(lambda v: iso2_from_code(v) or NATIONALITY_TO_ISO2.get(v.upper(), "")),
+    })
+    return out[out["_k"].ne("") & out["country"].ne("")]
+
+
+def resolve_countries_local(
+    df: pd.DataFrame,
+    *,
+    cache: Optional[dict] = None,
+    club_cache: Optional[dict] = None,
+    contracts: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Résout le pays (ISO2) de chaque ligne à partir des seules données locales,
+    par paliers, en traitant toute la colonne d'un coup:
+
+    existing -> flag_iso2 -> sr_country_code3 -> sr_nationality -> cache
+    -> db_sibling -> puckpedia -> club -> league
+
+    Retourne un DataFrame (même index) avec "country" et "source" ("" si non résolu).
+    """
+    cache = cache or {}
+    club_cache = club_cache or {}
+
+    country = pd.Series("", index=df.index, dtype=object)
+    source = pd.Series("", index=df.index, dtype=object)
+
+    def _take(values: pd.Series, label: str) -> None:
+        values = values.fillna("").astype(str)
+        hit = country.eq("") & values.ne("")
+        country[hit] = values[hit]
+        source[hit] = label
+
+    _take(_text(df, "Country").map(iso2_from_code), "existing")
+    _take(_text(df, "FlagISO2").map(iso2_from_code), "flag_iso2")
+    _take(_text(df, "sr_country_code3").map(iso2_from_code), "sr_country_code3")
+    _take(
+        _map_unique(_text(df, "sr_nationality"), lambda v: iso2_from_code(v) or NATIONALITY_TO_ISO2.get(v.upper(), "")),
+        "sr_nationality",
+    )
+
+    name_col = _name_col(df)
+    names = _text(df, name_col) if name_col else pd.Series("", index=df.index, dtype=object)
+
+    # Verdicts ok déjà en cache (par playerId puis par nom): aucune requête à refaire.
+    def _cached(key: str) -> str:
+        v = cache.get(key)
+        if isinstance(v, dict) and v.get("ok") is True:
+            return str(v.get("country") or "").strip().upper()
+        return ""
+
+    _take(_map_unique(_pid_text(df), lambda p: _cached(p) if p else ""), "cache")
+    _take(_map_unique(names, lambda n: _cached(f"NAME::{n.lower().strip()}") if n else ""), "cache")
+
+    keys = _map_unique(names, _norm_player_key)
+
+    # Même joueur présent sous une autre graphie ("Last, First" / "First Last").
+    if keys.ne("").any():
+        known = pd.DataFrame({"_k": keys, "cc": country})
+        known = known[known["_k"].ne("") & known["cc"].ne("")].drop_duplicates("_k")
+        _take(keys.map(dict(zip(known["_k"], known["cc"]))), "db_sibling")
+
+    if contracts is not None and not contracts.empty:
+        m = contracts.drop_duplicates("_k")
+        _take(keys.map(dict(zip(m["_k"], m["country"]))), "puckpedia")
+
+    for col in CLUB_COLS:
+        if col in df.columns:
+            _take(_map_unique(_text(df, col), lambda v: _country_from_club(v, club_cache) if v else ""), "club")
+
+    for col in LEAGUE_COLS:
+        if col in df.columns:
+            _take(_map_unique(_text(df, col), lambda v: _country_from_league(v) if v else ""), "league")
+
+    return pd.DataFrame({"country": country, "source": source})
+
+
+def update_players_db(
+    path: str,
+    *,
+    max_calls: int = 300,
+    save_every: int = 500,
+    resume_only: bool = True,
+    reset_progress: bool = False,
+    failed_only: bool = False,
+    progress_cb=None,
+    cache_path: Optional[str] = None,
+    club_cache_path: Optional[str] = None,
+    checkpoint_path: Optional[str] = None,
+    contracts_path: Optional[str] = None,
+):
+    if not os.path.exists(path):
+        return {"ok": False, "error": f"File not found: {path}"}
+
+    data_dir = os.path.dirname(path) or "."
+    cache_path = cache_path or os.path.join(data_dir, "nhl_country_cache.json")
+    club_cache_path = club_cache_path or os.path.join(data_dir, "club_country_cache.json")
+    checkpoint_path = checkpoint_path or os.path.join(data_dir, "nhl_country_checkpoint.json")
+
+    df = pd.read_csv(path, low_memory=False)
+    if "Country" not in df.columns:
+        df["Country"] = ""
+    if "playerId" not in df.columns:
+        df["playerId"] = ""
+    if COUNTRY_SOURCE_COL not in df.columns:
+        df[COUNTRY_SOURCE_COL] = ""
+    df["Country"] = df["Country"].astype(object)
+    df[COUNTRY_SOURCE_COL] = df[COUNTRY_SOURCE_COL].astype(object)
+
+    cache = read_json(cache_path)
+    club_cache = read_json(club_cache_path)
+    ckpt = read_json(checkpoint_path)
+
+    if reset_progress:
+        ckpt = {}
+        write_json(checkpoint_path, {})
+
+    # 1) Toute l'évidence locale, en bloc, avant la moindre requête réseau.
+    local = resolve_countries_local(
+        df,
+        cache=cache,
+        club_cache=club_cache,
+        contracts=load_contracts_countries(contracts_path) if contracts_path else None,
+    )
+    country_now = _text(df, "Country")
+    src_now = _text(df, COUNTRY_SOURCE_COL)
+    df.loc[country_now.ne("") & src_now.eq(""), COUNTRY_SOURCE_COL] = "existing"
+    fill = country_now.eq("") & local["country"].ne("")
+    df.loc[fill, "Country"] = local.loc[fill, "country"]
+    df.loc[fill, COUNTRY_SOURCE_COL] = local.loc[fill, "source"]
+    local_sources = {str(k): int(v) for k, v in local.loc[fill, "source"].value_counts().items()}
+
+    # 2) Résidu: seulement ce qui reste vide part vers l'API LNH.
+    start = int(ckpt.get("cursor", 0)) if resume_only else 0
+
+    empty = _text(df, "Country").eq("")
+    if failed_only:
+        pids = _pid_text(df)
+        names = _text(df, "Player") if "Player" in df.columns else _text(df, "Joueur")
+
+        def _failed(key: str) -> bool:
+            v = cache.get(key)
+            return isinstance(v, dict) and v.get("ok") is False
+
+        failed = (pids.ne("") & pids.map(_failed)) | (pids.eq("") & names.map(lambda n: _failed(f"NAME::{n.lower().strip()}")))
+        empty &= failed
+    cand = list(df.index[empty])
+
+    total = len(cand)
+    end = min(start + int(max_calls), total)
+
+    updated = processed = errors = cached = 0
+
+    for pos in range(start, end):
+        i = cand[pos]
+        row = df.loc[i]
+        rowd = row.to_dict()
+
+        nm = str(row.get("Player") or row.get("Joueur") or "").strip()
+        pid = None
+        pid_raw = str(row.get("playerId") or "").strip()
+        if pid_raw:
+            try:
+                pid = int(float(pid_raw))
+            except Exception:
+                pid = None
+
+        name_key = f"NAME::{nm.lower().strip()}" if nm else ""
+
+        if pid is None and nm:
+            pid = pms_nhl.search_playerid(nm)
+
+        if pid:
+            pid_key = str(pid)
+            cached_pid = cache.get(pid_key)
+            if isinstance(cached_pid, dict) and cached_pid.get("ok") is True and cached_pid.get("country"):
+                cc = str(cached_pid.get("country")).strip().upper()
+                df.at[i, "Country"] = cc
+                df.at[i, COUNTRY_SOURCE_COL] = "cache"
+                df.at[i, "playerId"] = pid
+                cached += 1
+            else:
+                cc = pms_nhl.landing_country(pid)
+                if cc:
+                    df.at[i, "Country"] = cc
+                    df.at[i, COUNTRY_SOURCE_COL] = "nhl_api"
+                    df.at[i, "playerId"] = pid
+                    cache[pid_key] = {"ok": True, "country": cc}
+                    if name_key:
+                        cache[name_key] = {"ok": True, "country": cc, "source": "pid"}
+                    _learn_club(rowd, cc, club_cache)
+                    updated += 1
+                else:
+                    cc2 = _infer_from_league(rowd) or _infer_from_club(rowd, club_cache)
+                    if cc2:
+                        df.at[i, "Country"] = cc2
+                        df.at[i, COUNTRY_SOURCE_COL] = "fallback"
+                        df.at[i, "playerId"] = pid
+                        cache[pid_key] = {"ok": True, "country": cc2, "source": "fallback"}
+                        if name_key:
+                            cache[name_key] = {"ok": True, "country": cc2, "source": "fallback"}
+                        _learn_club(rowd, cc2, club_cache)
+                        updated += 1
+                    else:
+                        cache[pid_key] = {"ok": False, "reason": "no_country"}
+                        if name_key:
+                            cache[name_key] = {"ok": False, "reason": "no_country"}
+                        errors += 1
+        else:
+            cc2 = _infer_from_league(rowd) or _infer_from_club(rowd, club_cache)
+            if cc2:
+                df.at[i, "Country"] = cc2
+                df.at[i, COUNTRY_SOURCE_COL] = "fallback"
+                _learn_club(rowd, cc2, club_cache)
+                if name_key:
+                    cache[name_key] = {"ok": True, "country": cc2, "source": "fallback"}
+                updated += 1
+            else:
+                if name_key:
+                    cache[name_key] = {"ok": False, "reason": "no_pid"}
+                errors += 1
+
+        processed += 1
+
+        if callable(progress_cb):
+            try:
+                progress_cb({"phase": "country", "done": pos + 1, "total": total,
+                             "counters": {"updated": updated, "processed": processed, "cached": cached, "errors": errors}})
+            except Exception:
+                pass
+
+        if save_every and processed % int(save_every) == 0:
+            df.to_csv(path, index=False)
+            write_json(cache_path, cache)
+            write_json(club_cache_path, club_cache)
+            write_json(checkpoint_path, {"cursor": pos + 1})
+
+    df.to_csv(path, index=False)
+    write_json(cache_path, cache)
+    write_json(club_cache_path, club_cache)
+    write_json(checkpoint_path, {"cursor": end})
+
+    return {
+        "ok": True,
+        "local": int(fill.sum()),
+        "local_sources": local_sources,
+        "updated": updated,
+        "processed": processed,
+        "cached": cached,
+        "errors": errors,
+        "total": total,
+        "cursor": end,
+    }
@@ -0,0 +1,257 @@
+# pms_dedup.py
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from pms_common import write_csv_atomic
+from pms_enrich import _guess_name_col, player_keys
+
+# Doublons de la players DB (plusieurs sources: _source, sr_player_urn, nhl_id).
+# 1) blocage: paires candidates seulement à l'intérieur de petits blocs (nom normalisé,
+#    nom + initiale + date de naissance, nom + initiale + équipe, identifiants);
+# 2) score vectorisé par paire; 3) grappes (union-find); 4) fusion colonne par colonne
+#    selon des règles de priorité (source, dernière synchro, ligne la plus remplie).
+MATCH, REVIEW = 0.6, 0.4
+MAX_BLOCK = 64
+ID_COLS = ["nhl_id", "playerId", "sr_player_urn"]
+SOURCE_PRIORITY = ["PuckPedia", "Hockey_Players"]
+CONTRACT_COLS = ["Cap Hit", "Level", "Status", "Signing Status", "Start Year", "Expiry Year", "Expiry Status", "Length", "UFA Year"]
+PAIR_COLS = ["i", "j", "score", "name", "dob", "ids", "team", "pos"]
+
+
+def _text(df: pd.DataFrame, c: str, *, ident: bool = False) -> np.ndarray:
+    if c not in df.columns:
+        return np.full(len(df), "", dtype=object)
+    s = df[c].astype(object).where(df[c].notna(), "").astype(str).str.strip()
+    if ident:
+        s = s.str.replace(r"\.0$", "", regex=True)  # 8478402.0 (colonne lue en float) == 8478402
+    return s.to_numpy(dtype=object)
+
+
+def _features(df: pd.DataFrame) -> dict:
+    name_col = _guess_name_col(df)
+    names = pd.Series(_text(df, name_col) if name_col else np.full(len(df), "", dtype=object))
+    key = player_keys(names).to_numpy(dtype=object)
+    toks = pd.Series(key).str.split(" ")
+    pos = pd.Series(_text(df, "Position")).str.upper()
+    return {
+        "key": key,
+        "first": toks.str[0].fillna("").to_numpy(dtype=object),
+        "last": toks.str[-1].fillna("").to_numpy(dtype=object),
+        "dob": pd.Series(_text(df, "sr_dob")).str[:10].to_numpy(dtype=object),
+        "team": pd.Series(_text(df, "Team")).str.upper().to_numpy(dtype=object),
+        "pos": pos.str[:1].to_numpy(dtype=object),
+        "ids": {c: _text(df, c, ident=True) for c in ID_COLS if c in df.columns},
+    }
+
+
+def _block_pairs(codes: np.ndarray, max_block: int) -> np.ndarray:
+    """Toutes les paires (i < j) de lignes partageant un code (>= 0), blocs de taille 2..max_block."""
+    rows = np.flatnonzero(codes >= 0)
+    if len(rows) < 2:
+        return np.zeros((0, 2), np.int64)
+    order = rows[np.argsort(codes[rows], kind="stable")]
+    c = codes[order]
+    starts = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+    sizes = np.diff(np.r_[starts, len(c)])
+    out = []
+    for s in np.unique(sizes[(sizes >= 2) & (sizes <= max_block)]):
+        a, b = np.triu_indices(int(s), 1)
+        st_ = starts[sizes == s][:, None]
+        out.append(np.stack([order[st_ + a].ravel(), order[st_ + b].ravel()], axis=1))
+    return np.concatenate(out) if out else np.zeros((0, 2), np.int64)
+
+
+def candidate_pairs(df: pd.DataFrame, *, max_block: int = MAX_BLOCK, feats: Optional[dict] = None) -> np.ndarray:
+    f = feats or _features(df)
+    key, last, ini = f["key"], f["last"], pd.Series(f["first"]).str[:1].to_numpy(dtype=object)
+    blocks = [
+        (key, key != ""),
+        (last + "|" + ini + "|" + f["dob"], (last != "") & (f["dob"] != "")),
+        (last + "|" + ini + "|" + f["team"], (last != "") & (f["team"] != "")),
+    ] + [(v, v != "") for v in f["ids"].values()]
+    pairs = []
+    for vals, ok in blocks:
+        codes = pd.factorize(pd.Series(vals).where(ok))[0]
+        pairs.append(_block_pairs(codes, max_block))
+    p = np.concatenate(pairs)
+    p = np.sort(p, axis=1)
+    return np.unique(p, axis=0) if len(p) else p
+
+
+def score_pairs(df: pd.DataFrame, pairs: np.ndarray, *, feats: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Score additif par paire (composantes gardées pour l'affichage):
+    nom (0.6 identique, 0.45 prénom abrégé, 0.25 même initiale), date de naissance (+0.35 / -1),
+    identifiants (+1 / -1), équipe (+0.1 / -0.15), position (-0.2, -0.5 gardien vs patineur).
+    """
+    f = feats or _features(df)
+    if len(pairs) == 0:
+        return pd.DataFrame(columns=PAIR_COLS)
+    i, j = pairs[:, 0], pairs[:, 1]
+
+    def _both(a):
+        return (a[i] != "") & (a[j] != "")
+
+    same_key = (f["key"][i] == f["key"][j]) & (f["key"][i] != "")
+    fi, fj = f["first"][i].astype(str), f["first"][j].astype(str)
+    same_last = (f["last"][i] == f["last"][j]) & (f["last"][i] != "")
+    prefix = same_last & (np.char.startswith(fi, fj) | np.char.startswith(fj, fi)) & (np.char.str_len(fi) > 0) & (np.char.str_len(fj) > 0)
+    ii, ij = pd.Series(fi).str[:1].to_numpy(), pd.Series(fj).str[:1].to_numpy()
+    initial = same_last & (ii != "") & (ii == ij)
+    name = np.where(same_key, 0.6, np.where(prefix, 0.45, np.where(initial, 0.25, 0.0)))
+
+    dob = np.where(_both(f["dob"]), np.where(f["dob"][i] == f["dob"][j], 0.35, -1.0), 0.0)
+    ids = np.zeros(len(i))
+    for v in f["ids"].values():
+        both = _both(v)
+        ids = np.where(both & (v[i] == v[j]), np.maximum(ids, 1.0), ids)
+        ids = np.where(both & (v[i] != v[j]), -1.0, ids)
+    team = np.where(_both(f["team"]), np.where(f["team"][i] == f["team"][j], 0.1, -0.15), 0.0)
+    pi, pj = f["pos"][i], f["pos"][j]
+    goalie = (pi == "G") != (pj == "G")
+    pos = np.where(_both(f["pos"]), np.where(goalie, -0.5, np.where(pi != pj, -0.2, 0.0)), 0.0)
+
+    # un identifiant contradictoire l'emporte sur tout le reste
+    score = np.where(ids < 0, -1.0, name + dob + ids + team + pos)
+    return pd.DataFrame({"i": i, "j": j, "score": score.round(3), "name": name, "dob": dob, "ids": ids, "team": team, "pos": pos})
+
+
+def find_duplicates(df: pd.DataFrame, *, review: float = REVIEW, max_block: int = MAX_BLOCK) -> pd.DataFrame:
+    """Paires de score >= review, triées par score décroissant (i, j = positions des lignes)."""
+    f = _features(df)
+    s = score_pairs(df, candidate_pairs(df, max_block=max_block, feats=f), feats=f)
+    return s[s["score"].ge(review)].sort_values(["score", "i", "j"], ascending=[False, True, True]).reset_index(drop=True)
+
+
+def pair_table(df: pd.DataFrame, pairs: pd.DataFrame) -> pd.DataFrame:
+    """Paires lisibles pour revue: lignes du CSV, nom / équipe / source de chaque côté."""
+    name_col = _guess_name_col(df)
+    cols = {"nom": _text(df, name_col) if name_col else np.full(len(df), "", dtype=object),
+            "équipe": _text(df, "Team"), "source": _text(df, "_source")}
+    i, j = pairs["i"].to_numpy(dtype=np.int64), pairs["j"].to_numpy(dtype=np.int64)
+    out = {"score": pairs["score"].to_numpy(), "ligne A": i + 2, "ligne B": j + 2}
+    for c, v in cols.items():
+        out[f"{c} A"], out[f"{c} B"] = v[i], v[j]
+    return pd.DataFrame(out)
+
+
+def clusters(n: int, pairs: pd.DataFrame, *, threshold: float = MATCH) -> np.ndarray:
+    """Étiquette de grappe par ligne (union-find sur les paires >= threshold); -1 = ligne unique."""
+    parent = np.arange(n)
+
+    def _find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    m = pairs[pairs["score"].ge(threshold)] if len(pairs) else pairs
+    for a, b in zip(m["i"].to_numpy(), m["j"].to_numpy()):
+        ra, rb = _find(a), _find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    roots = np.array([_find(x) for x in range(n)]) if len(m) else parent
+    sizes = np.bincount(roots, minlength=n)
+    return np.where(sizes[roots] > 1, roots, -1)
+
+
+def _source_rank(df: pd.DataFrame) -> np.ndarray:
+    src = pd.Series(_text(df, "_source"))
+    return src.map({s: r for r, s in enumerate(SOURCE_PRIORITY)}).fillna(len(SOURCE_PRIORITY)).to_numpy()
+
+
+def merge_rules(columns) -> list:
+    """(colonnes, clé de priorité) — la première valeur non vide selon la priorité gagne."""
+    cols = list(columns)
+    nhl = [c for c in cols if c.startswith("nhl_") and c != "nhl_id"]
+    sr = [c for c in cols if c.startswith("sr_")]
+    contract = [c for c in CONTRACT_COLS if c in cols]
+    rest = [c for c in cols if c not in set(nhl) | set(sr) | set(contract)]
+    return [(contract, "source"), (nhl, "latest:nhl_last_stats_sync"), (sr, "latest:sr_last_sync"), (rest, "filled")]
+
+
+def _rank(df: pd.DataFrame, how: str) -> list:
+    """Clés de tri (croissantes = prioritaire) pour une règle."""
+    filled = -df.notna().sum(axis=1).to_numpy()
+    if how == "source":
+        return [_source_rank(df), filled]
+    if how.startswith("latest:"):
+        ts = pd.Series(_text(df, how.split(":", 1)[1]))
+        # ISO: tri lexical = chronologique (plus récent d'abord); vide = jamais synchronisé, en dernier
+        return [-pd.factorize(ts, sort=True)[0] + (ts.eq("").to_numpy() * 10**9), filled]
+    return [filled, _source_rank(df)]
+
+
+def merge_duplicates(df: pd.DataFrame, labels: np.ndarray) -> tuple:
+    """
+    Fusionne chaque grappe en une ligne (à la position du meilleur enregistrement "filled").
+    Retourne (DataFrame fusionné, rapport: cluster, kept, merged, names).
+    """
+    df = df.reset_index(drop=True)
+    in_c = np.flatnonzero(labels >= 0)
+    if len(in_c) == 0:
+        return df.copy(), pd.DataFrame(columns=["cluster", "kept", "merged", "names"])
+    sub = df.iloc[in_c]
+    sub = sub.apply(lambda s: s.mask(s.eq("")) if s.dtype == object else s)  # "" = vide pour les priorités
+    lab = labels[in_c]
+    merged = {}
+    keep_pos = None
+    for cols, how in merge_rules(df.columns):
+        if not cols:
+            continue
+        keys = _rank(sub, how)
+        order = np.lexsort(tuple(reversed([lab] + keys)))
+        ordered = sub.iloc[order]
+        merged.update(ordered[cols].groupby(lab[order], sort=True).first().to_dict("series"))
+        if how == "filled":
+            keep_pos = pd.Series(in_c[order]).groupby(lab[order], sort=True).first()
+    out_rows = pd.DataFrame(merged, index=keep_pos.index)[list(df.columns)]
+    out = df.copy()
+    out.loc[keep_pos.to_numpy(), :] = out_rows.set_axis(keep_pos.to_numpy()).to_numpy()
+    drop = np.setdiff1d(in_c, keep_pos.to_numpy())
+    name_col = _guess_name_col(df)
+    names = _text(df, name_col) if name_col else np.full(len(df), "", dtype=object)
+    kept = dict(zip(keep_pos.index, keep_pos.to_numpy()))
+    merged_lines, seen = {c: [] for c in kept}, {c: [] for c in kept}
+    for c, x in zip(lab, in_c):
+        if x != kept[c]:
+            merged_lines[c].append(str(x + 2))  # lignes du CSV (en-tête = 1)
+        if names[x] not in seen[c]:
+            seen[c].append(names[x])
+    report = pd.DataFrame({
+        "cluster": list(kept), "kept": [k + 2 for k in kept.values()],
+        "merged": [", ".join(merged_lines[c]) for c in kept], "names": [" | ".join(seen[c]) for c in kept],
+    })
+    return out.drop(index=drop).reset_index(drop=True), report
+
+
+def dedup_frame(df: pd.DataFrame, *, threshold: float = MATCH) -> tuple:
+    """(DataFrame dédoublonné, rapport de fusion, paires candidates >= REVIEW)."""
+    df = df.reset_index(drop=True)
+    pairs = find_duplicates(df, review=min(REVIEW, threshold))
+    out, report = merge_duplicates(df, clusters(len(df), pairs, threshold=threshold))
+    return out, report, pairs
+
+
+def merge_sources(base: pd.DataFrame, other: pd.DataFrame, source: str, *, threshold: float = MATCH) -> tuple:
+    """Ajoute une source externe à la players DB puis fusionne les doublons (other._source = source)."""
+    other = other.copy()
+    other["_source"] = source
+    return dedup_frame(pd.concat([base, other], ignore_index=True), threshold=threshold)
+
+
+def dedup_players_csv(path: str, *, threshold: float = MATCH, out_path: Optional[str] = None) -> dict:
+    """Dédoublonne hockey.players.csv (lu en texte: aucun reformatage des colonnes non fusionnées)."""
+    if not os.path.exists(path):
+        return {"ok": False, "error": f"File not found: {path}"}
+    df = pd.read_csv(path, dtype=str, low_memory=False)
+    out, report, pairs = dedup_frame(df, threshold=threshold)
+    if len(report):
+        write_csv_atomic(out, out_path or path)
+    return {"ok": True, "rows": len(df), "rows_after": len(out), "clusters": len(report),
+            "review": int(pairs["score"].lt(threshold).sum()), "report": report}
@@ -8,6 +8,10 @@ from typing import Optional
 import numpy as np
 import pandas as pd
 
+from pms_schema import parse_cap_hit
+
+POINT_METRICS = ["nhl_pts", "NHL P"]  # première colonne disponible de la players DB
+GOALIE_METRIC = ("nhl_w", 2.0)  # gardiens: 2 pts par victoire si la colonne existe
 
 def _strip_accents(s: str) -> str:
     s = unicodedata.normalize("NFKD", s)
@@ -49,6 +53,47 @@ def _guess_name_col(players_db: pd.DataFrame) -> Optional[str]:
     return None
 
 
+def player_keys(names: pd.Series) -> pd.Series:
+    """Clés normalisées (NaN -> ""), chaque nom distinct normalisé une seule fois."""
+    s = text_col(names)
+    uniq = pd.unique(s)
+    return s.map(dict(zip(uniq, map(_norm_player_key, uniq))))
+
+
+def text_col(s: pd.Series) -> pd.Series:
+    """Colonne en texte (object), NaN / NA -> ""; accepte les colonnes typées (string, category)."""
+    return s.astype(object).where(s.notna(), "").astype(str)
+
+
+def upper_col(df: pd.DataFrame, c: str) -> pd.Series:
+    """Colonne c en majuscules sans espaces autour; "" partout si absente."""
+    if c not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return text_col(df[c]).str.strip().str.upper()
+
+
+def points_frame(players_db: pd.DataFrame) -> pd.DataFrame:
+    """players DB -> (points, cap_hit, db_pos) indexé par clé, première ligne par clé."""
+    name_col = _guess_name_col(players_db) if players_db is not None else None
+    if not name_col:
+        return pd.DataFrame(columns=["points", "cap_hit", "db_pos"])
+    pts = pd.Series(np.nan, index=players_db.index)
+    for c in POINT_METRICS:
+        if c in players_db.columns:
+            pts = pts.fillna(pd.to_numeric(players_db[c], errors="coerce"))
+    pos = text_col(players_db["Position"]) if "Position" in players_db.columns else pd.Series("", index=players_db.index)
+    gcol, gw = GOALIE_METRIC
+    if gcol in players_db.columns:
+        pts = pts.where(~pos.str.upper().eq("G"), pd.to_numeric(players_db[gcol], errors="coerce") * gw)
+    out = pd.DataFrame({
+        "_k": player_keys(players_db[name_col]),
+        "points": pts.fillna(0.0).astype(float),
+        "cap_hit": parse_cap_hit(players_db["Cap Hit"]) if "Cap Hit" in players_db.columns else pd.NA,
+        "db_pos": pos,
+    })
+    return out[out["_k"].ne("")].drop_duplicates("_k").set_index("_k")
+
+
 def enrich_level_from_players_db(
     df: pd.DataFrame,
     players_db: pd.DataFrame,
@@ -94,41 +139,27 @@ def enrich_level_from_players_db(
     if expiry_col_db not in db.columns:
         db[expiry_col_db] = ""
 
-    db["_k"] = db[name_col_db].astype(str).map(_norm_player_key)
-    db["_level"] = db[level_col_db].astype(str).str.strip().str.upper()
+    db["_k"] = player_keys(db[name_col_db])
+    # astype(object): Level peut être catégoriel (players DB typée)
+    db["_level"] = db[level_col_db].astype(object).fillna("").astype(str).str.strip().str.upper()
 
     # Expiry: normaliser en "YYYY" string ou ""
     exp_raw = pd.to_numeric(db[expiry_col_db], errors="coerce")
-    exp_clean: list[str] = []
-    for v in exp_raw.values:
-        if v is None or (isinstance(v, float) and np.isnan(v)):
-            exp_clean.append("")
-            continue
-        try:
-            exp_clean.append(str(int(float(v))))
-        except Exception:
-            exp_clean.append("")
-    db["_exp"] = exp_clean
-
-    # mapping key -> (level, exp)
-    m_level: dict[str, str] = {}
-    m_exp: dict[str, str] = {}
-    for _, r in db.iterrows():
-        k = str(r["_k"] or "").strip()
-        if not k:
-            continue
-        lv = str(r["_level"] or "").strip().upper()
-        ex = str(r["_exp"] or "").strip()
-
-        if k not in m_level or (not m_level[k] and lv):
-            m_level[k] = lv
-        if k not in m_exp or (not m_exp[k] and ex):
-            m_exp[k] = ex
+    exp_raw = exp_raw.where(np.isfinite(exp_raw))
+    db["_exp"] = exp_raw.map(lambda v: "" if pd.isna(v) else str(int(v)))
+
+    # mapping key -> première valeur non vide (clé absente = "")
+    def _first_filled(col: str) -> dict:
+        d = db.loc[db["_k"].ne("") & db[col].ne(""), ["_k", col]].drop_duplicates("_k")
+        return dict(zip(d["_k"], d[col]))
+
+    m_level = _first_filled("_level")
+    m_exp = _first_filled("_exp")
 
     def _valid_level(x: str) -> bool:
         return str(x or "").strip().upper() in {"STD", "ELC"}
 
-    out["_k"] = out[name_col_df].astype(str).map(_norm_player_key)
+    out["_k"] = player_keys(out[name_col_df])
 
     # Remplir Level si vide/invalide
     lvl_now = out["Level"].astype(str)
@@ -0,0 +1,163 @@
+# pms_httpcache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlencode
+
+# Cache disque des réponses JSON de l'API LNH (corps brut complet, pas seulement le verdict):
+# une entrée par URL+params, TTL par endpoint, revalidation ETag / Last-Modified une fois
+# expirée, éviction LRU (date d'accès = mtime du fichier) au-delà de max_mb.
+DEFAULT_TTL = 3600.0
+ENDPOINT_TTLS = [
+    # (regex sur l'URL, TTL en secondes) — premier match gagnant
+    (re.compile(r"/player/\d+/landing"), 7 * 86400.0),   # pays, date de naissance, taille: quasi fixes
+    (re.compile(r"/search/player"), 3 * 86400.0),
+    (re.compile(r"/stats/rest/"), 1800.0),                # tables de stats: changent chaque soir de match
+]
+
+
+def cache_key(url: str, params=None) -> str:
+    q = urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return hashlib.sha1(f"{url}?{q}".encode("utf-8")).hexdigest()
+
+
+def ttl_for(url: str) -> float:
+    for rx, ttl in ENDPOINT_TTLS:
+        if rx.search(url):
+            return ttl
+    return DEFAULT_TTL
+
+
+class HttpCache:
+    """
+    Entrées JSON dans root/<2 premiers car. du hash>/<hash>.json:
+    {"url", "params", "ts" (dernière validation), "etag", "last_modified", "body"}.
+    """
+
+    def __init__(self, root: str, *, max_mb: float = 200.0, clock=time.time):
+        self.root = root
+        self.max_bytes = int(float(max_mb) * 1e6)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._sizes: Optional[dict] = None  # hash -> octets, chargé au premier put
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, url: str, params=None) -> Optional[dict]:
+        p = self._path(cache_key(url, params))
+        try:
+            with open(p, "r", encoding="utf-8") as f:
+                ent = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(p)  # accès récent: dernier évincé
+        except OSError:
+            pass
+        return ent
+
+    def is_fresh(self, ent: dict, ttl: Optional[float] = None) -> bool:
+        ttl = ttl_for(ent.get("url", "")) if ttl is None else float(ttl)
+        return self.clock() - float(ent.get("ts") or 0) < ttl
+
+    @staticmethod
+    def validators(ent: Optional[dict]) -> dict:
+        h = {}
+        if ent and ent.get("etag"):
+            h["If-None-Match"] = ent["etag"]
+        if ent and ent.get("last_modified"):
+            h["If-Modified-Since"] = ent["last_modified"]
+        return h
+
+    def put(self, url: str, params, body, headers=None) -> dict:
+        headers = headers or {}
+        ent = {
+            "url": url, "params": {str(k): str(v) for k, v in (params or {}).items()}, "ts": self.clock(),
+            "etag": headers.get("ETag") or "", "last_modified": headers.get("Last-Modified") or "", "body": body,
+        }
+        self._write(cache_key(url, params), ent)
+        self.stats["stored"] += 1
+        return ent
+
+    def touch(self, ent: dict, headers=None) -> dict:
+        """304: même corps, nouvelle date de validation (et validateurs mis à jour s'il y en a)."""
+        headers = headers or {}
+        ent = dict(ent, ts=self.clock())
+        ent["etag"] = headers.get("ETag") or ent.get("etag") or ""
+        ent["last_modified"] = headers.get("Last-Modified") or ent.get("last_modified") or ""
+        self._write(cache_key(ent["url"], ent.get("params")), ent)
+        self.stats["revalidated"] += 1
+        return ent
+
+    def _write(self, key: str, ent: dict) -> None:
+        p = self._path(key)
+        os.makedirs(os.path.dirname(p), exist_ok=True)
+        raw = json.dumps(ent, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        tmp = f"{p}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, p)
+        with self._lock:
+            sizes = self._scan()
+            sizes[key] = len(raw)
+            if sum(sizes.values()) > self.max_bytes:
+                self._evict(sizes, keep=key)
+
+    def _scan(self) -> dict:
+        if self._sizes is None:
+            self._sizes = {e["key"]: e["bytes"] for e in self._entries()}
+        return self._sizes
+
+    def _entries(self) -> list:
+        out = []
+        if not os.path.isdir(self.root):
+            return out
+        for d in os.scandir(self.root):
+            if not d.is_dir():
+                continue
+            for f in os.scandir(d.path):
+                if f.name.endswith(".json"):
+                    st_ = f.stat()
+                    out.append({"key": f.name[:-5], "bytes": st_.st_size, "atime": st_.st_mtime, "path": f.path})
+        return out
+
+    def _evict(self, sizes: dict, keep: str) -> None:
+        # on descend à 90% du budget pour ne pas évincer à chaque écriture
+        target = int(self.max_bytes * 0.9)
+        total = sum(sizes.values())
+        for e in sorted(self._entries(), key=lambda e: e["atime"]):
+            if total <= target:
+                break
+            if e["key"] == keep:
+                continue
+            try:
+                os.remove(e["path"])
+            except OSError:
+                continue
+            total -= sizes.pop(e["key"], e["bytes"])
+            self.stats["evicted"] += 1
+
+    def usage(self) -> dict:
+        ents = self._entries()
+        return {"entries": len(ents), "mb": round(sum(e["bytes"] for e in ents) / 1e6, 2),
+                "max_mb": round(self.max_bytes / 1e6, 1), **self.stats}
+
+    def clear(self) -> int:
+        n = 0
+        with self._lock:
+            for e in self._entries():
+                try:
+                    os.remove(e["path"])
+                    n += 1
+                except OSError:
+                    pass
+            self._sizes = {}
+        return n
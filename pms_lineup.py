@@ -0,0 +1,254 @@
+# pms_lineup.py
+from __future__ import annotations
+
+from itertools import product
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from pms_enrich import player_keys, points_frame
+from pms_roster import ROSTER_COLS, slot_buckets
+from pms_schema import parse_cap_hit
+
+POSITIONS = ("F", "D", "G")
+DEFAULT_QUOTAS = {"F": 12, "D": 6, "G": 2}
+CAP_UNIT = 100_000  # résolution du cap dans la DP (cap hits arrondis au-dessus)
+POS_ALIASES = {"C": "F", "LW": "F", "RW": "F", "W": "F", "F": "F", "D": "D", "G": "G"}
+
+
+def eligible(pos) -> tuple:
+    """ "F,D" -> ("F", "D"); "C" -> ("F",) """
+    out = []
+    for p in str(pos or "").replace("/", ",").upper().split(","):
+        q = POS_ALIASES.get(p.strip())
+        if q and q not in out:
+            out.append(q)
+    return tuple(out)
+
+
+def _dp(pts: np.ndarray, w: np.ndarray, elig: list, q: list, C: int) -> list:
+    """DP conjointe (nb F, nb D, nb G, cap): repli quand beaucoup de joueurs ont plusieurs positions."""
+    n = len(pts)
+    shape = (q[0] + 1, q[1] + 1, q[2] + 1, C + 1)
+    best = np.zeros(shape, dtype=np.float32)
+    decision = np.zeros((n,) + shape, dtype=np.int8)
+    for i in range(n):
+        wi = int(w[i])
+        if not elig[i] or pts[i] <= 0 or wi > C:
+            continue
+        new = best.copy()
+        for p in elig[i]:
+            if q[p] == 0:
+                continue
+            dst = [slice(None)] * 4
+            src = [slice(None)] * 4
+            dst[p], src[p] = slice(1, None), slice(0, -1)
+            dst[3], src[3] = slice(wi, None), slice(0, C + 1 - wi)
+            cand = best[tuple(src)] + np.float32(pts[i])
+            view = new[tuple(dst)]
+            better = cand > view
+            np.copyto(view, cand, where=better)
+            np.copyto(decision[i][tuple(dst)], p + 1, where=better)
+        best = new
+
+    # meilleur état (cap plein disponible: best[..., C] est monotone en c)
+    s = list(np.unravel_index(int(np.argmax(best[..., C])), best.shape[:3])) + [C]
+    assign = [""] * n
+    for i in range(n - 1, -1, -1):
+        d = int(decision[i][tuple(s)])
+        if d:
+            assign[i] = POSITIONS[d - 1]
+            s[d - 1] -= 1
+            s[3] -= int(w[i])
+    return assign
+
+
+def _pos_table(pts: np.ndarray, w: np.ndarray, qp: int, C: int) -> tuple:
+    """Une position: T[k, c] = meilleurs points avec au plus k joueurs et cap <= c (+ décisions)."""
+    n = len(pts)
+    best = np.zeros((qp + 1, C + 1), dtype=np.float32)
+    took = np.zeros((n, qp + 1, C + 1), dtype=bool)
+    if qp == 0:
+        return best, took
+    for i in range(n):
+        wi = int(w[i])
+        if pts[i] <= 0 or wi > C:
+            continue
+        cand = best[:-1, : C + 1 - wi] + np.float32(pts[i])
+        new = best.copy()
+        view = new[1:, wi:]
+        better = cand > view
+        np.copyto(view, cand, where=better)
+        took[i, 1:, wi:] = better
+        best = new
+    return best, took
+
+
+def _pos_backtrack(took: np.ndarray, w: np.ndarray, k: int, c: int) -> list:
+    out = []
+    for i in range(len(w) - 1, -1, -1):
+        if k > 0 and took[i, k, c]:
+            out.append(i)
+            k -= 1
+            c -= int(w[i])
+    return out
+
+
+def _steps(t: np.ndarray) -> np.ndarray:
+    """Indices où une table croissante en c change de valeur (0 inclus)."""
+    return np.flatnonzero(np.diff(t, prepend=-np.inf) > 0)
+
+
+def _maxplus(a: np.ndarray, b: np.ndarray) -> tuple:
+    """
+    out[c] = max_{x<=c} a[x] + b[c-x]; arg[c] = x. Tables croissantes en c: l'optimum est
+    atteint sur un palier de l'une des deux, on itère sur celle qui en a le moins.
+    """
+    C = len(a) - 1
+    swap = len(_steps(a)) < len(_steps(b))
+    u, v = (b, a) if swap else (a, b)
+    out = np.full(C + 1, -np.inf)
+    ys = np.zeros(C + 1, dtype=np.int64)
+    for y in _steps(v):
+        cand = u[: C + 1 - y] + v[y]
+        better = cand > out[y:]
+        out[y:][better] = cand[better]
+        ys[y:][better] = y
+    # ys = cap de v; arg = cap de a
+    arg = ys if swap else np.arange(C + 1) - ys
+    return out, arg
+
+
+def _separable(pts: np.ndarray, w: np.ndarray, groups: list, q: list, C: int) -> tuple:
+    """
+    Joueurs déjà affectés à une position: une DP par position, combinées sur le cap
+    (D ⊕ G par paliers, puis F au seul cap C). Retourne (points, {indice: position}).
+    """
+    tables = []
+    for p, idx in enumerate(groups):
+        best, took = _pos_table(pts[idx], w[idx], q[p], C)
+        tables.append((best[q[p]].astype(np.float64), took, idx))
+    dg, arg_d = _maxplus(tables[1][0], tables[2][0])
+    tot = tables[0][0] + dg[::-1]
+    x = int(np.argmax(tot))
+    caps = [x, int(arg_d[C - x]), C - x - int(arg_d[C - x])]
+    assign = {}
+    for p, (_, took, idx) in enumerate(tables):
+        for j in _pos_backtrack(took, w[idx], q[p], caps[p]):
+            assign[int(idx[j])] = POSITIONS[p]
+    return float(tot[x]), assign
+
+
+def solve_lineup(points, cap_hits, positions, *, quotas: Optional[Dict[str, int]] = None,
+                 cap: Optional[int] = None, unit: int = CAP_UNIT, max_multi: int = 4) -> dict:
+    """
+    Alignement optimal: maximise la somme des points avec au plus quotas[p] joueurs
+    par position et sum(cap_hit) <= cap (cap hits arrondis à l'unité supérieure).
+
+    Les positions ne se couplent que par le cap: une DP (joueurs, cap) par position,
+    puis convolution max-plus. Les joueurs à plusieurs positions ("F,D") sont énumérés
+    (max_multi au plus), sinon DP conjointe (nb F, nb D, nb G, cap).
+    Retourne {"assign": [pos ou ""], "points", "cap_used"}.
+    """
+    quotas = {**DEFAULT_QUOTAS, **(quotas or {})}
+    q = [int(quotas.get(p, 0)) for p in POSITIONS]
+    pts = np.nan_to_num(np.asarray(points, dtype=np.float64), nan=0.0)
+    hits = np.nan_to_num(np.asarray(cap_hits, dtype=np.float64), nan=0.0)
+    elig = [tuple(POSITIONS.index(p) for p in e if p in POSITIONS) for e in positions]
+    n = len(pts)
+    if cap is None:
+        w, C = np.zeros(n, dtype=np.int64), 0
+    else:
+        w = np.ceil(np.maximum(hits, 0) / unit).astype(np.int64)
+        C = max(int(cap) // unit, 0)
+
+    multi = [i for i in range(n) if len(elig[i]) > 1]
+    assign = [""] * n
+    if len(multi) > max_multi:
+        assign = _dp(pts, w, elig, q, C)
+    else:
+        single = [[i for i in range(n) if elig[i] == (p,)] for p in range(len(POSITIONS))]
+        best_total, best_map = -1.0, {}
+        for combo in product(*[elig[i] for i in multi]):
+            groups = [list(g) for g in single]
+            for i, p in zip(multi, combo):
+                groups[p].append(i)
+            total, amap = _separable(pts, w, [np.asarray(sorted(g), dtype=np.int64) for g in groups], q, C)
+            if total > best_total:
+                best_total, best_map = total, amap
+        for i, p in best_map.items():
+            assign[i] = p
+    total = float(sum(pts[i] for i in range(n) if assign[i]))
+    used = int(sum(hits[i] for i in range(n) if assign[i]))
+    return {"assign": assign, "points": total, "cap_used": used}
+
+
+def optimize_lineups(roster: pd.DataFrame, players_db: pd.DataFrame, *, owners: Optional[list] = None,
+                     quotas: Optional[Dict[str, int]] = None, cap: Optional[int] = None,
+                     exclude_ir: bool = True) -> pd.DataFrame:
+    """
+    Mode batch: alignement optimal de chaque propriétaire (ou de owners).
+    Retourne le roster avec points, cap_hit, eligible et suggested ("F"/"D"/"G" = actif, "" = banc).
+    Les joueurs IR ne sont pas alignables si exclude_ir.
+    """
+    cols = ["owner", "player", "pos", "points", "cap_hit", "bucket", "suggested"]
+    if roster is None or roster.empty:
+        return pd.DataFrame(columns=cols)
+    db = points_frame(players_db)
+
+    def _text(c):
+        if c not in roster.columns:
+            return pd.Series("", index=roster.index, dtype=object)
+        return roster[c].astype(object).where(roster[c].notna(), "").astype(str).str.strip()
+
+    r = pd.DataFrame({"owner": _text(ROSTER_COLS["owner"]), "player": _text(ROSTER_COLS["player"]), "pos": _text(ROSTER_COLS["pos"])})
+    r["_k"] = player_keys(r["player"])
+    r = r.join(db, on="_k")
+    r["pos"] = r["pos"].where(r["pos"].ne(""), r["db_pos"].fillna(""))
+    sal = parse_cap_hit(roster[ROSTER_COLS["salary"]].astype(object)) if ROSTER_COLS["salary"] in roster.columns else pd.NA
+    r["cap_hit"] = r["cap_hit"].astype("Int64").fillna(pd.Series(sal, index=r.index).astype("Int64"))
+    r["points"] = r["points"].fillna(0.0)
+    slot = roster[ROSTER_COLS["slot"]] if ROSTER_COLS["slot"] in roster.columns else pd.Series("", index=roster.index)
+    statut = roster[ROSTER_COLS["status"]] if ROSTER_COLS["status"] in roster.columns else None
+    r["bucket"] = slot_buckets(slot, statut)
+    r["suggested"] = ""
+
+    wanted = set(owners) if owners else None
+    for owner, g in r.groupby("owner", sort=True):
+        if not owner or (wanted is not None and owner not in wanted):
+            continue
+        ok = g[~(exclude_ir & g["bucket"].eq("IR"))]
+        res = solve_lineup(
+            ok["points"].to_numpy(), ok["cap_hit"].astype("Float64").to_numpy(dtype=np.float64, na_value=0.0),
+            [eligible(p) for p in ok["pos"]], quotas=quotas, cap=cap,
+        )
+        r.loc[ok.index, "suggested"] = res["assign"]
+    if wanted is not None:
+        r = r[r["owner"].isin(wanted)]
+    return r[cols]
+
+
+def lineup_summary(opt: pd.DataFrame, *, cap: Optional[int] = None) -> pd.DataFrame:
+    """Par propriétaire: points de l'alignement actuel vs optimal, cap de l'alignement optimal, changements."""
+    if opt.empty:
+        return pd.DataFrame(columns=["owner", "current_points", "optimal_points", "gain", "optimal_cap", "changes"])
+    cur = opt["bucket"].eq("ACTIFS")
+    sug = opt["suggested"].ne("")
+    g = opt.assign(
+        cur_pts=opt["points"].where(cur, 0.0),
+        opt_pts=opt["points"].where(sug, 0.0),
+        opt_cap=opt["cap_hit"].astype("Float64").fillna(0).where(sug, 0.0),
+        changed=(cur != sug).astype(int),
+    ).groupby("owner")
+    out = pd.DataFrame({
+        "current_points": g["cur_pts"].sum(),
+        "optimal_points": g["opt_pts"].sum(),
+        "optimal_cap": g["opt_cap"].sum().astype(np.int64),
+        "changes": g["changed"].sum(),
+    }).reset_index()
+    out["gain"] = out["optimal_points"] - out["current_points"]
+    if cap is not None:
+        out["cap_ok"] = out["optimal_cap"] <= int(cap)
+    return out[["owner", "current_points", "optimal_points", "gain", "optimal_cap", "changes"] + (["cap_ok"] if cap is not None else [])]
+
@@ -0,0 +1,141 @@
+# pms_nhl.py
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+import requests
+
+import pms_profile
+from pms_common import iso2_from_code
+from pms_httpcache import HttpCache
+
+NHL_SEARCH_URL = "https://search.d3.nhle.com/api/v1/search/player"
+NHL_WEB_BASE = "https://api-web.nhle.com/v1"
+NHL_STATS_BASE = "https://api.nhle.com/stats/rest/en"
+
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Cache disque des réponses (désactivé tant que l'app n'en fournit pas un: set_response_cache).
+_cache: Optional[HttpCache] = None
+
+
+def set_response_cache(cache: Optional[HttpCache]) -> None:
+    global _cache
+    _cache = cache
+
+
+def response_cache() -> Optional[HttpCache]:
+    return _cache
+
+
+class _Retry(Exception):
+    pass
+
+
+def http_get_json(url: str, params=None, timeout: int = 12, *, retries: int = 2, backoff: float = 0.5,
+                  ttl: Optional[float] = None, use_cache: bool = True):
+    """
+    GET JSON; réessaie (backoff exponentiel) sur 429/5xx et erreurs réseau seulement.
+    Avec un cache de réponses: entrée fraîche -> aucun appel; expirée -> requête conditionnelle
+    (ETag / If-Modified-Since), 304 -> corps en cache.
+    """
+    t0 = time.perf_counter()
+    cache = _cache if use_cache else None
+    ent = cache.get(url, params) if cache is not None else None
+    if ent is not None and cache.is_fresh(ent, ttl):
+        cache.stats["hits"] += 1
+        pms_profile.record_http(url, (time.perf_counter() - t0) * 1000.0, ok=True, cache="hit")
+        return ent["body"]
+    if cache is not None:
+        cache.stats["stale" if ent is not None else "misses"] += 1
+    headers = HttpCache.validators(ent)
+    attempt = 0
+    status = None
+    while True:
+        try:
+            r = requests.get(url, params=params or {}, timeout=timeout, headers=headers)
+            status = r.status_code
+            if status in RETRY_STATUS and attempt < retries:
+                raise _Retry()
+            if status == 304 and ent is not None:
+                cache.touch(ent, getattr(r, "headers", None))
+                pms_profile.record_http(url, (time.perf_counter() - t0) * 1000.0, ok=True, retries=attempt,
+                                        status=status, cache="revalidated")
+                return ent["body"]
+            r.raise_for_status()
+            data = r.json()
+            if cache is not None:
+                cache.put(url, params, data, getattr(r, "headers", None))
+            pms_profile.record_http(url, (time.perf_counter() - t0) * 1000.0, ok=True, retries=attempt, status=status)
+            return data
+        except (_Retry, requests.ConnectionError, requests.Timeout):
+            if attempt >= retries:
+                pms_profile.record_http(url, (time.perf_counter() - t0) * 1000.0, ok=False, retries=attempt, status=status)
+                raise
+            time.sleep(backoff * (2 ** attempt))
+            attempt += 1
+        except Exception:
+            pms_profile.record_http(url, (time.perf_counter() - t0) * 1000.0, ok=False, retries=attempt, status=status)
+            raise
+
+
+def search_playerid(player_name: str) -> Optional[int]:
+    if not player_name:
+        return None
+    q = str(player_name).strip()
+    if not q:
+        return None
+    try:
+        data = http_get_json(NHL_SEARCH_URL, params={"q": q, "limit": 10}, timeout=12)
+    except Exception:
+        return None
+
+    # l'API de recherche renvoie une liste; ancien format {"items": [...]}
+    items = data if isinstance(data, list) else ((data or {}).get("items") or [])
+    name_norm = q.lower().strip()
+    last = name_norm.split()[-1] if name_norm.split() else name_norm
+
+    for it in items:
+        try:
+            pid_i = int(it.get("playerId") or it.get("id"))
+        except Exception:
+            continue
+        nm = str(it.get("name") or it.get("playerName") or it.get("fullName") or "").lower().strip()
+        if not nm:
+            continue
+        if nm == name_norm or (last and last in nm):
+            return pid_i
+    return None
+
+
+def cached_json(url: str, params=None):
+    """Corps en cache pour url+params, même expiré; None sans cache ni entrée (aucun appel réseau)."""
+    ent = _cache.get(url, params) if _cache is not None else None
+    return ent["body"] if ent is not None else None
+
+
+def landing(player_id: int, *, offline: bool = False) -> Optional[dict]:
+    """Payload "landing" complet (pays, date de naissance, taille, position...). offline: cache seulement."""
+    url = f"{NHL_WEB_BASE}/player/{int(player_id)}/landing"
+    if offline:
+        return cached_json(url)
+    try:
+        return http_get_json(url, timeout=12)
+    except Exception:
+        return None
+
+
+def landing_country(player_id: int) -> str:
+    data = landing(player_id)
+    if not isinstance(data, dict):
+        return ""
+    for k in ["birthCountryCode", "birthCountry", "nationality", "countryCode"]:
+        v = data.get(k)
+        if isinstance(v, str) and v.strip():
+            cc = iso2_from_code(v)
+            if cc:
+                return cc
+    # code inconnu de ISO3_TO_ISO2: pas de deuxième lettre devinée (MEX != ME)
+    return ""
@@ -0,0 +1,155 @@
+# pms_profile.py
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+# Profilage opt-in: PMS_PROFILE=1 au démarrage, ou la case à cocher dans Gestion Admin.
+# L'état est au niveau du process (partagé par toutes les sessions Streamlit).
+_enabled = os.environ.get("PMS_PROFILE", "").strip().lower() in ("1", "true", "yes", "on")
+_lock = threading.Lock()
+_runs: deque = deque(maxlen=50)
+_open: dict = {}
+_http: deque = deque(maxlen=2000)
+_current: contextvars.ContextVar = contextvars.ContextVar("pms_profile_run", default=None)
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(on: bool) -> None:
+    global _enabled
+    _enabled = bool(on)
+
+
+def reset() -> None:
+    with _lock:
+        _runs.clear()
+        _open.clear()
+        _http.clear()
+
+
+def _close(run: dict) -> None:
+    run["total_ms"] = round((time.perf_counter() - run.pop("_t0")) * 1000.0, 2)
+    _runs.append(run)
+
+
+def begin_run(session_key: str, label: str = "") -> None:
+    """Début d'un rerun. Un rerun précédent resté ouvert (st.stop) est clôturé au passage."""
+    if not _enabled:
+        _current.set(None)
+        return
+    run = {"session": str(session_key), "label": label, "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+           "spans": [], "_t0": time.perf_counter()}
+    with _lock:
+        prev = _open.pop(str(session_key), None)
+        if prev is not None:
+            _close(prev)
+        _open[str(session_key)] = run
+    _current.set(run)
+
+
+def end_run(session_key: str) -> None:
+    with _lock:
+        run = _open.pop(str(session_key), None)
+        if run is not None:
+            _close(run)
+    _current.set(None)
+
+
+@contextmanager
+def span(name: str):
+    """Chronomètre un bloc et l'ajoute au rerun courant (no-op si le profilage est off)."""
+    run = _current.get()
+    if not _enabled or run is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = round((time.perf_counter() - t0) * 1000.0, 2)
+        with _lock:
+            run["spans"].append((name, ms))
+
+
+def _endpoint(url: str) -> str:
+    # https://api-web.nhle.com/v1/player/8478402/landing -> api-web.nhle.com/v1/player/{id}/landing
+    u = re.sub(r"^https?://", "", str(url or "")).split("?", 1)[0]
+    return re.sub(r"/\d+(?=/|$)", "/{id}", u)
+
+
+def record_http(url: str, ms: float, *, ok: bool, retries: int = 0, status: Optional[int] = None, cache: str = "") -> None:
+    # cache: "hit" (aucun appel réseau), "revalidated" (304), "" (réponse complète)
+    if not _enabled:
+        return
+    with _lock:
+        _http.append({"endpoint": _endpoint(url), "ms": round(float(ms), 2), "ok": bool(ok),
+                      "retries": int(retries), "status": status, "cache": cache})
+
+
+def stage_summary(last_n: int = 20) -> pd.DataFrame:
+    """Par étape, sur les last_n derniers reruns: appels, total, moyenne, p95, max (ms), trié par total."""
+    with _lock:
+        runs = list(_runs)[-int(last_n):]
+    rows = [{"stage": n, "ms": ms} for r in runs for n, ms in r["spans"]]
+    rows += [{"stage": "(rerun total)", "ms": r["total_ms"]} for r in runs]
+    cols = ["stage", "calls", "total_ms", "mean_ms", "p95_ms", "max_ms"]
+    if not rows:
+        return pd.DataFrame(columns=cols)
+    g = pd.DataFrame(rows).groupby("stage")["ms"]
+    out = pd.DataFrame({
+        "calls": g.size(),
+        "total_ms": g.sum(),
+        "mean_ms": g.mean(),
+        "p95_ms": g.quantile(0.95),
+        "max_ms": g.max(),
+    }).round(2).reset_index()
+    return out.sort_values("total_ms", ascending=False)[cols].reset_index(drop=True)
+
+
+def http_summary() -> pd.DataFrame:
+    with _lock:
+        rows = list(_http)
+    cols = ["endpoint", "calls", "errors", "retries", "cache_hits", "revalidated", "mean_ms", "p95_ms", "max_ms"]
+    if not rows:
+        return pd.DataFrame(columns=cols)
+    df = pd.DataFrame(rows)
+    g = df.groupby("endpoint")
+    out = pd.DataFrame({
+        "calls": g.size(),
+        "errors": g["ok"].apply(lambda s: int((~s).sum())),
+        "retries": g["retries"].sum(),
+        "cache_hits": g["cache"].apply(lambda s: int(s.eq("hit").sum())),
+        "revalidated": g["cache"].apply(lambda s: int(s.eq("revalidated").sum())),
+        "mean_ms": g["ms"].mean(),
+        "p95_ms": g["ms"].quantile(0.95),
+        "max_ms": g["ms"].max(),
+    }).round(2).reset_index()
+    return out.sort_values("calls", ascending=False)[cols].reset_index(drop=True)
+
+
+def export_json(last_n: int = 20) -> str:
+    with _lock:
+        runs = [dict(r) for r in list(_runs)[-int(last_n):]]
+    return json.dumps(
+        {
+            "enabled": _enabled,
+            "stages": stage_summary(last_n).to_dict("records"),
+            "http": http_summary().to_dict("records"),
+            "runs": runs,
+        },
+        ensure_ascii=False,
+        indent=2,
+    )
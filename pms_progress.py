@@ -0,0 +1,122 @@
+# pms_progress.py
+from __future__ import annotations
+
+import time
+from typing import Callable, Optional
+
+# Canal de progression commun aux traitements longs (country fill, stats sync, players_db).
+# Schéma unique d'événement (dict):
+#   {"phase": str, "done": int, "total": int, "counters": dict,
+#    "elapsed": float (s), "rate": float (unités/s), "eta": float | None (s), "final": bool}
+# Le producteur appelle le reporter à chaque unité; le sink (UI) n'est appelé
+# qu'au plus toutes les min_interval secondes, au changement de phase et à la fin.
+EVENT_KEYS = ("phase", "done", "total", "counters", "elapsed", "rate", "eta", "final")
+
+
+def normalize_event(*args, **kw) -> dict:
+    """
+    Accepte le schéma commun, l'ancien dict du country fill ({"cursor", "total", ...compteurs})
+    ou la signature players_db (done, total, phase).
+    """
+    if args and not isinstance(args[0], dict):
+        done, total, phase = (list(args) + [0, 0, ""])[:3]
+        raw = {"done": done, "total": total, "phase": phase}
+    else:
+        raw = dict(args[0]) if args else {}
+    raw.update(kw)
+    done = raw.pop("done", raw.pop("cursor", 0))
+    total = raw.pop("total", 0)
+    phase = raw.pop("phase", "")
+    counters = dict(raw.pop("counters", None) or {})
+    counters.update({k: v for k, v in raw.items() if k not in EVENT_KEYS and isinstance(v, (int, float))})
+    return {"phase": str(phase or ""), "done": int(done or 0), "total": int(total or 0), "counters": counters}
+
+
+class ProgressReporter:
+    """
+    Callable passé comme progress_cb. Calcule débit et ETA, et limite les appels au sink.
+    Le débit est mesuré depuis le premier événement de la phase (une reprise sur checkpoint
+    ne compte pas les lignes déjà faites).
+    """
+
+    def __init__(self, sink: Optional[Callable[[dict], None]] = None, *, min_interval: float = 0.25,
+                 clock: Callable[[], float] = time.monotonic):
+        self.sink = sink
+        self.min_interval = float(min_interval)
+        self.clock = clock
+        self.last: Optional[dict] = None
+        self.emitted = 0
+        self.received = 0
+        self._t0 = self.clock()
+        self._phase: Optional[str] = None
+        self._phase_t0 = self._t0
+        self._phase_done0 = 0
+        self._last_emit = float("-inf")
+
+    def __call__(self, *args, **kw) -> None:
+        ev = normalize_event(*args, **kw)
+        now = self.clock()
+        self.received += 1
+        new_phase = ev["phase"] != self._phase
+        if new_phase:
+            self._phase, self._phase_t0, self._phase_done0 = ev["phase"], now, ev["done"]
+        self.last = self._decorate(ev, now)
+        done_all = ev["total"] > 0 and ev["done"] >= ev["total"]
+        if new_phase or done_all or now - self._last_emit >= self.min_interval:
+            self._emit(now)
+
+    def _decorate(self, ev: dict, now: float) -> dict:
+        dt = now - self._phase_t0
+        n = ev["done"] - self._phase_done0
+        rate = n / dt if dt > 0 and n > 0 else 0.0
+        left = max(ev["total"] - ev["done"], 0)
+        ev["elapsed"] = round(now - self._t0, 3)
+        ev["rate"] = round(rate, 2)
+        ev["eta"] = round(left / rate, 1) if rate > 0 else (0.0 if ev["total"] and not left else None)
+        ev["final"] = False
+        return ev
+
+    def _emit(self, now: float) -> None:
+        self._last_emit = now
+        self.emitted += 1
+        if callable(self.sink):
+            try:
+                self.sink(self.last)
+            except Exception:
+                pass
+
+    def close(self) -> Optional[dict]:
+        """Dernier événement (final=True), toujours transmis au sink."""
+        if self.last is None:
+            return None
+        self.last = self._decorate({k: self.last[k] for k in ("phase", "done", "total", "counters")}, self.clock())
+        self.last["final"] = True
+        self._emit(self.clock())
+        return self.last
+
+
+def _fmt_secs(s) -> str:
+    if s is None:
+        return "?"
+    s = int(round(float(s)))
+    return f"{s // 3600}:{s % 3600 // 60:02d}:{s % 60:02d}" if s >= 3600 else f"{s // 60}:{s % 60:02d}"
+
+
+def format_event(ev: dict) -> str:
+    """ "country: 120/800 (15%) · 42.0/s · ETA 0:16 · updated=100, errors=3" """
+    if not ev:
+        return ""
+    total = ev.get("total") or 0
+    head = f"{ev.get('phase') or 'progress'}: {ev.get('done', 0)}/{total}"
+    if total:
+        head += f" ({100.0 * ev.get('done', 0) / total:.0f}%)"
+    parts = [head, f"{ev.get('rate', 0.0):.1f}/s"]
+    parts.append("terminé" if ev.get("final") else f"ETA {_fmt_secs(ev.get('eta'))}")
+    if ev.get("counters"):
+        parts.append(", ".join(f"{k}={v}" for k, v in ev["counters"].items()))
+    return " · ".join(parts)
+
+
+def fraction(ev: dict) -> float:
+    total = (ev or {}).get("total") or 0
+    return min(1.0, max(0.0, ev.get("done", 0) / total)) if total else 0.0
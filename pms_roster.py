@@ -0,0 +1,45 @@
+# pms_roster.py
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+ROSTER_COLS = {"owner":"Propriétaire","player":"Joueur","pos":"Pos","team":"Equipe","salary":"Salaire","level":"Level","status":"Statut","slot":"Slot","ir_date":"IR Date"}
+
+
+def slot_bucket(slot_val: str, statut_val: str = "") -> str:
+    s = str(slot_val or "").strip().lower()
+    t = str(statut_val or "").strip().lower()
+    if "actif" in s:
+        return "ACTIFS"
+    if "banc" in s:
+        return "BANC"
+    if s == "ir" or "inj" in s or "bless" in s:
+        return "IR"
+    if "mineur" in s or "minor" in s or "ahl" in s or "farm" in s:
+        return "MINEUR"
+    if "ir" in t or "inj" in t or "bless" in t:
+        return "IR"
+    if "mineur" in t or "ahl" in t:
+        return "MINEUR"
+    if "banc" in t:
+        return "BANC"
+    return "ACTIFS"
+
+
+def _text(s: Optional[pd.Series], index) -> pd.Series:
+    if s is None:
+        return pd.Series("", index=index, dtype=object)
+    return s.astype(object).where(s.notna(), "").astype(str)
+
+
+def slot_buckets(slot: pd.Series, statut: Optional[pd.Series] = None) -> pd.Series:
+    """slot_bucket sur toute une colonne: évalué une fois par couple (Slot, Statut) distinct."""
+    s = _text(slot, slot.index)
+    t = _text(statut, slot.index)
+    pairs = pd.MultiIndex.from_arrays([s, t])
+    codes, uniq = pd.factorize(pairs)
+    labels = np.array([slot_bucket(a, b) for a, b in uniq], dtype=object)
+    return pd.Series(labels[codes], index=slot.index, dtype=object)
@@ -0,0 +1,128 @@
+# pms_schema.py
+from __future__ import annotations
+
+import os
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from pms_common import iso2_from_code, norm_player_key
+
+try:
+    import pyarrow  # noqa: F401
+    _STRING_DTYPE = "string[pyarrow]"
+except Exception:
+    _STRING_DTYPE = "string"
+
+# Schéma mémoire de hockey.players.csv (lecture seule: Cap Hit devient un entier,
+# ne pas réécrire le CSV à partir d'un DataFrame chargé avec ce schéma).
+CATEGORY_COLS = [
+    "Team", "Position", "Country", "Flag", "FlagISO2", "Level", "Status", "Signing Status",
+    "Expiry Status", "Start Year", "Expiry Year", "H(f)", "_source", "Country Source",
+    "sr_country_code3", "sr_nationality", "sr_position_type", "sr_team_id", "sr_team_name",
+    # horodatages / dates: très répétés (une valeur par lot de sync)
+    "sr_dob", "sr_last_sync", "nhl_last_stats_sync",
+]
+STRING_COLS = ["Player", "sr_player_urn"]
+INT16_COLS = [
+    "Jersey#", "W(lbs)", "Age", "Draft Year", "UFA Year", "Length",
+    "NHL GP", "NHL G", "NHL A", "NHL P", "GP", "G", "A", "P",
+    "sr_height_cm", "sr_weight_kg", "sr_jersey_number",
+    "nhl_gp", "nhl_g", "nhl_a", "nhl_pts", "nhl_plus_minus", "nhl_pim", "nhl_ppp", "nhl_shp",
+    "nhl_gwg", "nhl_sog", "nhl_hits", "nhl_blk", "nhl_w", "nhl_l", "nhl_otl", "nhl_so",
+    "nhl_saves", "nhl_sa", "nhl_ga",
+]
+INT32_COLS = ["Cap Hit", "nhl_id", "playerId"]
+FLOAT32_COLS = ["NHL SV%", "NHL GAA", "nhl_sh_pct", "nhl_toi_avg", "nhl_fo_pct", "nhl_gaa", "nhl_sv_pct"]
+
+PLAYERS_DB_SCHEMA = {
+    **{c: "category" for c in CATEGORY_COLS},
+    **{c: _STRING_DTYPE for c in STRING_COLS},
+    **{c: "Int16" for c in INT16_COLS},
+    **{c: "Int32" for c in INT32_COLS},
+    **{c: "float32" for c in FLOAT32_COLS},
+}
+
+
+def parse_cap_hit(s: pd.Series) -> pd.Series:
+    """ "4 750 000 $" / "4,750,000" / 4750000.0 -> 4750000 (Int32, <NA> si vide) """
+    if pd.api.types.is_numeric_dtype(s):
+        return pd.to_numeric(s, errors="coerce").round().astype("Int32")
+    digits = s.astype("string").str.replace(r"[^\d.]", "", regex=True).replace("", pd.NA)
+    return pd.to_numeric(digits, errors="coerce").round().astype("Int32")
+
+
+def _to_int(s: pd.Series, dtype: str) -> pd.Series:
+    v = pd.to_numeric(s, errors="coerce")
+    info = np.iinfo(dtype.lower())
+    # une valeur hors plage (donnée corrompue) ne doit pas faire planter le chargement
+    v = v.where(v.isna() | ((v >= info.min) & (v <= info.max)))
+    return v.round().astype(dtype)
+
+
+def apply_players_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Applique PLAYERS_DB_SCHEMA aux colonnes présentes (les autres restent intactes)."""
+    out = df.copy()
+    for c, dtype in PLAYERS_DB_SCHEMA.items():
+        if c not in out.columns:
+            continue
+        if c == "Cap Hit":
+            out[c] = parse_cap_hit(out[c])
+        elif dtype in ("Int16", "Int32"):
+            out[c] = _to_int(out[c], dtype)
+        elif dtype == "float32":
+            out[c] = pd.to_numeric(out[c], errors="coerce").astype("float32")
+        elif dtype == "category":
+            out[c] = out[c].astype("string").str.strip().replace("", pd.NA).astype("category")
+        else:
+            out[c] = out[c].astype(dtype)
+    return out
+
+
+def read_players_db(path: str) -> pd.DataFrame:
+    """pd.read_csv + schéma compact. DataFrame vide si le fichier est absent/illisible."""
+    if not path or not os.path.exists(path):
+        return pd.DataFrame()
+    try:
+        df = pd.read_csv(path, low_memory=False)
+    except Exception:
+        return pd.DataFrame()
+    return apply_players_schema(df)
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    return float(df.memory_usage(deep=True).sum()) / 1e6
+
+
+def players_db_map(df: pd.DataFrame) -> Dict[str, dict]:
+    """
+    Nom normalisé -> {"country" (ISO2), "pos", "salary"}; la première ligne gagne pour une clé.
+    Vectorisé: la normalisation ne tourne qu'une fois par nom distinct.
+    """
+    if df is None or df.empty:
+        return {}
+    col_name = next((c for c in ["Joueur", "Player", "Name", "Nom"] if c in df.columns), None)
+    if not col_name:
+        return {}
+
+    def _text(c) -> pd.Series:
+        if not c or c not in df.columns:
+            return pd.Series("", index=df.index, dtype=object)
+        return df[c].astype(object).where(df[c].notna(), "").astype(str).str.strip()
+
+    names = _text(col_name)
+    uniq = pd.unique(names)
+    keys = names.map(dict(zip(uniq, map(norm_player_key, uniq))))
+
+    col_pos = "Pos" if "Pos" in df.columns else ("Position" if "Position" in df.columns else None)
+    col_salary = next((c for c in ["Salaire", "Salary", "Cap Hit"] if c in df.columns), None)
+
+    cc = _text("FlagISO2").map(iso2_from_code)
+    cc = cc.where(cc.ne(""), _text("Country").map(iso2_from_code))
+    sal = df[col_salary].astype(object).where(df[col_salary].notna(), "") if col_salary else pd.Series("", index=df.index)
+
+    m = pd.DataFrame({"k": keys, "country": cc, "pos": _text(col_pos), "salary": sal})
+    m = m[m["k"].ne("")].drop_duplicates("k")
+    return {k: {"country": c, "pos": p, "salary": v} for k, c, p, v in zip(m["k"], m["country"], m["pos"], m["salary"])}
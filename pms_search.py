@@ -0,0 +1,105 @@
+# pms_search.py
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+
+from pms_enrich import _guess_name_col, _norm_player_key, player_keys
+
+# rang des variantes indexées: nom complet > nom de famille (suffixes) > "last first"
+RANK_FULL, RANK_SUFFIX, RANK_REVERSED = 0, 1, 2
+
+
+def first_last(name: str) -> str:
+    """ "Zub, Artyom" -> "Artyom Zub" (les listes du formulaire Transactions sont séparées par virgule) """
+    last, sep, first = str(name or "").partition(",")
+    return f"{first.strip()} {last.strip()}" if sep and first.strip() and last.strip() else str(name or "").strip()
+
+
+def _variants(key: str) -> list:
+    """ "james van riemsdyk" -> [(full, 0), ("van riemsdyk", 1), ("riemsdyk", 1), ("riemsdyk james van", 2)] """
+    toks = key.split(" ")
+    out = [(key, RANK_FULL)]
+    out += [(" ".join(toks[i:]), RANK_SUFFIX) for i in range(1, len(toks))]
+    if len(toks) > 1:
+        out.append((" ".join([toks[-1]] + toks[:-1]), RANK_REVERSED))
+    return out
+
+
+class PlayerIndex:
+    """
+    Index de préfixes sur les noms normalisés de la players DB (tableau trié + bisect).
+    Construit une fois par version du fichier; lecture seule ensuite (partageable entre sessions).
+    """
+
+    def __init__(self, players_db: pd.DataFrame):
+        name_col = _guess_name_col(players_db) if players_db is not None and not players_db.empty else None
+        if not name_col:
+            self.players = pd.DataFrame(columns=["name", "team", "pos", "_k"])
+            self._terms, self._ids, self._rank = [], np.zeros(0, np.int64), np.zeros(0, np.int8)
+            self._pop = np.zeros(0, np.int64)
+            self._cols = {c: np.zeros(0, object) for c in ("name", "team", "pos")}
+            return
+
+        def _text(c):
+            if c not in players_db.columns:
+                return pd.Series("", index=players_db.index, dtype=object)
+            return players_db[c].astype(object).where(players_db[c].notna(), "").astype(str).str.strip()
+
+        names = _text(name_col)
+        uniq = pd.unique(names)
+        keys = player_keys(names)
+        p = pd.DataFrame({"name": names.map(dict(zip(uniq, map(first_last, uniq)))), "team": _text("Team"), "pos": _text("Position"), "_k": keys})
+        gp = pd.to_numeric(players_db["NHL GP"], errors="coerce") if "NHL GP" in players_db.columns else pd.Series(0, index=p.index)
+        p["_pop"] = gp.fillna(0).astype(np.int64).to_numpy()
+        # une entrée par joueur (première ligne par clé, comme players_db_map)
+        self.players = p[p["_k"].ne("")].drop_duplicates("_k").reset_index(drop=True)
+
+        entries = sorted(
+            (term, i, rank)
+            for i, k in enumerate(self.players["_k"])
+            for term, rank in _variants(k)
+        )
+        self._terms = [e[0] for e in entries]
+        self._ids = np.fromiter((e[1] for e in entries), np.int64, len(entries))
+        self._rank = np.fromiter((e[2] for e in entries), np.int8, len(entries))
+        self._pop = self.players["_pop"].to_numpy()
+        self._cols = {c: self.players[c].to_numpy(dtype=object) for c in ("name", "team", "pos")}
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def search(self, text: str, limit: int = 10) -> pd.DataFrame:
+        """
+        Joueurs dont un nom indexé commence par text (normalisé comme les rosters).
+        Tri: nom exact, rang de la variante, matchs LNH (NHL GP) décroissants, nom.
+        """
+        # "Zub, Art" se cherche tel quel ("zub art" -> variante "last first"), sans inversion
+        q = _norm_player_key(str(text or "").replace(",", " "))
+        if not q:
+            return self._rows(np.zeros(0, np.int64))
+        lo = bisect_left(self._terms, q)
+        hi = bisect_left(self._terms, q + "\uffff", lo)
+        if lo == hi:
+            return self._rows(np.zeros(0, np.int64))
+        ids, rank = self._ids[lo:hi], self._rank[lo:hi]
+        # les termes égaux à q sont en tête de la plage triée
+        exact = np.arange(hi - lo) < (bisect_right(self._terms, q, lo, hi) - lo)
+        order = np.lexsort((ids, -self._pop[ids], rank, ~exact))
+        ids = ids[order]
+        _, first = np.unique(ids, return_index=True)
+        ids = ids[np.sort(first)][: int(limit)]
+        return self._rows(ids)
+
+    def _rows(self, ids: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame({c: a[ids] for c, a in self._cols.items()})
+
+    def suggest(self, text: str, limit: int = 10) -> list:
+        """Libellés "Nom (TEAM · POS)" -> nom canonique, pour un selectbox."""
+        r = self.search(text, limit)
+        return [
+            (f"{n} ({' · '.join(x for x in (t, p) if x)})" if (t or p) else n, n)
+            for n, t, p in zip(r["name"], r["team"], r["pos"])
+        ]
@@ -0,0 +1,150 @@
+# pms_shared.py
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import pandas as pd
+
+from pms_common import file_signature
+from pms_schema import players_db_map, read_players_db
+
+try:
+    import pyarrow as pa
+except Exception:  # pragma: no cover - pyarrow est dans requirements.txt
+    pa = None
+
+# Players DB partagée par process: une table Arrow immuable par version du CSV,
+# adossée à un fichier IPC mappé en mémoire (<csv>.arrow, pages partagées entre
+# sessions et entre process). Quand le CSV change, la nouvelle version est construite
+# à côté puis publiée d'un coup; les sessions en cours gardent l'ancienne jusqu'à la fin de leur rerun.
+SIG_META = b"pms_csv_sig"
+
+_lock = threading.Lock()
+_registry: Dict[str, "PlayersSnapshot"] = {}
+_index_store = None  # IndexStore (pms_warmup): players_map persistée par version du CSV
+
+
+def set_index_store(store) -> None:
+    global _index_store
+    _index_store = store
+
+
+def arrow_cache_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".arrow"
+
+
+class PlayersSnapshot:
+    """Version figée de la players DB. Ne pas modifier frame() ni players_map() (partagés)."""
+
+    def __init__(self, path: str, sig: str, table, *, source: str, load_ms: float):
+        self.path = path
+        self.sig = sig
+        self.table = table
+        self.source = source
+        self.load_ms = load_ms
+        self._lock = threading.RLock()
+        self._frame: Optional[pd.DataFrame] = None
+        self._map: Optional[dict] = None
+
+    def frame(self) -> pd.DataFrame:
+        """DataFrame typé (PLAYERS_DB_SCHEMA), converti une seule fois par version."""
+        if self._frame is None:
+            with self._lock:
+                if self._frame is None:
+                    if self.table is None:
+                        self._frame = pd.DataFrame()
+                    else:
+                        # Player reste string[pyarrow] comme à la lecture CSV
+                        self._frame = self.table.to_pandas(types_mapper=lambda t: pd.StringDtype("pyarrow") if t == pa.string() else None)
+        return self._frame
+
+    def players_map(self) -> dict:
+        if self._map is None:
+            with self._lock:
+                if self._map is None:
+                    if _index_store is not None and self.sig:
+                        self._map, _ = _index_store.get_or_build("players_map", self.sig, lambda: players_db_map(self.frame()))
+                    else:
+                        self._map = players_db_map(self.frame())
+        return self._map
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path, "sig": self.sig, "source": self.source, "load_ms": self.load_ms,
+            "rows": int(self.table.num_rows) if self.table is not None else 0,
+            "arrow_mb": round(self.table.nbytes / 1e6, 2) if self.table is not None else 0.0,
+            "frame": self._frame is not None, "map": self._map is not None,
+        }
+
+
+def _read_ipc(path: str, sig: str):
+    ipc = arrow_cache_path(path)
+    if not os.path.exists(ipc):
+        return None
+    try:
+        table = pa.ipc.open_file(pa.memory_map(ipc, "r")).read_all()
+    except Exception:
+        return None
+    meta = table.schema.metadata or {}
+    return table if meta.get(SIG_META, b"").decode() == sig else None
+
+
+def _write_ipc(path: str, sig: str, table):
+    ipc = arrow_cache_path(path)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), SIG_META: sig.encode()})
+    tmp = f"{ipc}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(tmp, "wb") as f, pa.ipc.new_file(f, table.schema) as w:
+            w.write_table(table)
+        os.replace(tmp, ipc)
+        mapped = _read_ipc(path, sig)
+        return table if mapped is None else mapped
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return table
+
+
+def _build(path: str, sig: str) -> PlayersSnapshot:
+    t0 = time.perf_counter()
+    if pa is None:
+        snap = PlayersSnapshot(path, sig, None, source="csv", load_ms=0.0)
+        snap._frame = read_players_db(path)
+        snap.load_ms = round((time.perf_counter() - t0) * 1000.0, 2)
+        return snap
+    if not sig:
+        table, source = None, "missing"
+    else:
+        table = _read_ipc(path, sig)
+        source = "arrow"
+        if table is None:
+            df = read_players_db(path)
+            table = _write_ipc(path, sig, pa.Table.from_pandas(df, preserve_index=False)) if not df.empty else None
+            source = "csv"
+    return PlayersSnapshot(path, sig, table, source=source, load_ms=round((time.perf_counter() - t0) * 1000.0, 2))
+
+
+def shared_players_db(path: str) -> PlayersSnapshot:
+    """Version courante (signature du CSV) de la players DB, construite au plus une fois par process."""
+    sig = file_signature(path)
+    snap = _registry.get(path)
+    if snap is not None and snap.sig == sig:
+        return snap
+    with _lock:
+        snap = _registry.get(path)
+        if snap is None or snap.sig != sig:
+            snap = _build(path, sig)
+            _registry[path] = snap
+    return snap
+
+
+def registry_stats() -> list:
+    return [s.stats() for s in list(_registry.values())]
+
+
+def clear() -> None:
+    with _lock:
+        _registry.clear()
@@ -0,0 +1,150 @@
+# pms_snapshot.py
+from __future__ import annotations
+
+import hashlib
+import os
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from pms_common import read_json, write_json
+from pms_enrich import _guess_name_col, _norm_player_key
+from pms_roster import ROSTER_COLS
+
+# Versions compactes (csv.gz) de la players DB et des rosters, nommées par hash du contenu:
+# un fichier inchangé ne crée pas de nouvelle copie.
+KIND_PLAYERS = "players"
+KIND_ROSTER = "roster"
+INDEX_FILE = "index.json"
+
+
+def content_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def list_snapshots(snap_dir: str, kind: str = "") -> list:
+    """Plus récent d'abord."""
+    snaps = read_json(os.path.join(snap_dir, INDEX_FILE)).get("snapshots", [])
+    return [s for s in reversed(snaps) if not kind or s.get("kind") == kind]
+
+
+def take_snapshot(path: str, snap_dir: str, kind: str, *, label: str = "") -> Optional[dict]:
+    """Enregistre une version du fichier. Retourne l'entrée d'index (None si fichier absent)."""
+    if not path or not os.path.exists(path):
+        return None
+    h = content_hash(path)
+    out = os.path.join(snap_dir, kind, f"{h}.csv.gz")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    df = None
+    if not os.path.exists(out):
+        df = pd.read_csv(path, dtype=str, keep_default_na=False, low_memory=False)
+        tmp = out + ".tmp"
+        df.to_csv(tmp, index=False, compression="gzip")
+        os.replace(tmp, out)
+
+    idx_path = os.path.join(snap_dir, INDEX_FILE)
+    index = read_json(idx_path)
+    snaps = index.get("snapshots", [])
+    prev = next((s for s in reversed(snaps) if s.get("kind") == kind and s.get("source") == path), None)
+    if prev is not None and prev.get("hash") == h:
+        # même contenu que la dernière version de ce fichier: rien à ajouter
+        return prev
+    if df is None:
+        df = load_snapshot(snap_dir, kind, h)
+    entry = {
+        "hash": h, "kind": kind, "source": path, "label": label,
+        "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "rows": int(len(df)), "cols": int(df.shape[1]),
+    }
+    snaps.append(entry)
+    index["snapshots"] = snaps
+    write_json(idx_path, index)
+    return entry
+
+
+def load_snapshot(snap_dir: str, kind: str, h: str) -> pd.DataFrame:
+    return pd.read_csv(os.path.join(snap_dir, kind, f"{h}.csv.gz"), dtype=str, keep_default_na=False, low_memory=False)
+
+
+def read_current(path: str) -> pd.DataFrame:
+    """Fichier courant lu comme un snapshot (tout en texte) pour le comparer."""
+    if not path or not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_csv(path, dtype=str, keep_default_na=False, low_memory=False)
+
+
+def identity_keys(df: pd.DataFrame, kind: str, keymap: Optional[dict] = None) -> pd.Series:
+    """
+    Identité d'une ligne: propriétaire + joueur (roster), nom normalisé (players DB).
+    Les homonymes sont départagés par leur rang d'apparition ("nom#2").
+    """
+    if df.empty:
+        return pd.Series([], dtype=object)
+    if kind == KIND_ROSTER and ROSTER_COLS["player"] in df.columns:
+        names = df[ROSTER_COLS["player"]].astype(str)
+        owner = df[ROSTER_COLS["owner"]].astype(str).str.strip() if ROSTER_COLS["owner"] in df.columns else ""
+    else:
+        col = _guess_name_col(df)
+        names = df[col].astype(str) if col else pd.Series(df.index.astype(str), index=df.index)
+        owner = ""
+    # keymap partagé entre les deux versions: chaque nom n'est normalisé qu'une fois
+    keymap = {} if keymap is None else keymap
+    todo = [x for x in pd.unique(names) if x not in keymap]
+    keymap.update(zip(todo, map(_norm_player_key, todo)))
+    k = names.map(keymap)
+    if isinstance(owner, pd.Series):
+        k = owner + " / " + k
+    n = k.groupby(k).cumcount()
+    return k.where(n.eq(0), k + "#" + (n + 1).astype(str))
+
+
+def diff_frames(old: pd.DataFrame, new: pd.DataFrame, kind: str) -> dict:
+    """
+    Diff ligne/cellule par identité joueur. Comparaison vectorisée des valeurs texte
+    (load_snapshot / read_current) sur les colonnes communes; les colonnes
+    ajoutées/retirées sont listées à part.
+    """
+    keymap: dict = {}
+    ko, kn = identity_keys(old, kind, keymap), identity_keys(new, kind, keymap)
+    o = old.set_axis(ko.to_numpy(), axis=0) if len(old) else old
+    n = new.set_axis(kn.to_numpy(), axis=0) if len(new) else new
+
+    added = n.index.difference(o.index, sort=False)
+    removed = o.index.difference(n.index, sort=False)
+    common = n.index.intersection(o.index, sort=False)
+    cols = [c for c in n.columns if c in o.columns]
+
+    a = o.loc[common, cols].to_numpy(dtype=object)
+    b = n.loc[common, cols].to_numpy(dtype=object)
+    r, c = np.nonzero(a != b)
+    cells = pd.DataFrame({
+        "key": common.to_numpy()[r],
+        "column": np.asarray(cols, dtype=object)[c],
+        "old": a[r, c],
+        "new": b[r, c],
+    })
+    return {
+        "added": n.loc[added].reset_index(names="key") if len(added) else pd.DataFrame(columns=["key"] + list(n.columns)),
+        "removed": o.loc[removed].reset_index(names="key") if len(removed) else pd.DataFrame(columns=["key"] + list(o.columns)),
+        "cells": cells,
+        "changed_rows": int(len(np.unique(r))),
+        "columns_added": [x for x in n.columns if x not in o.columns],
+        "columns_removed": [x for x in o.columns if x not in n.columns],
+    }
+
+
+def diff_summary(d: dict) -> dict:
+    return {
+        "added": int(len(d["added"])),
+        "removed": int(len(d["removed"])),
+        "changed_rows": d["changed_rows"],
+        "changed_cells": int(len(d["cells"])),
+        "by_column": d["cells"]["column"].value_counts().to_dict() if len(d["cells"]) else {},
+        "columns_added": d["columns_added"],
+        "columns_removed": d["columns_removed"],
+    }
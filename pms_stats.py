@@ -0,0 +1,243 @@
+# pms_stats.py
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import pms_nhl
+from pms_common import write_csv_atomic
+from pms_enrich import _norm_player_key, player_keys
+
+STATS_SYNC_COL = "nhl_last_stats_sync"
+
+# endpoint -> {champ API: colonne players DB}
+SKATER_SUMMARY_FIELDS = {
+    "gamesPlayed": "nhl_gp", "goals": "nhl_g", "assists": "nhl_a", "points": "nhl_pts",
+    "plusMinus": "nhl_plus_minus", "penaltyMinutes": "nhl_pim", "ppPoints": "nhl_ppp",
+    "shPoints": "nhl_shp", "gameWinningGoals": "nhl_gwg", "shots": "nhl_sog",
+    "shootingPct": "nhl_sh_pct", "timeOnIcePerGame": "nhl_toi_avg", "faceoffWinPct": "nhl_fo_pct",
+}
+SKATER_REALTIME_FIELDS = {"hits": "nhl_hits", "blockedShots": "nhl_blk"}
+GOALIE_SUMMARY_FIELDS = {
+    "gamesPlayed": "nhl_gp", "wins": "nhl_w", "losses": "nhl_l", "otLosses": "nhl_otl",
+    "goalsAgainstAverage": "nhl_gaa", "savePct": "nhl_sv_pct", "shutouts": "nhl_so",
+    "saves": "nhl_saves", "shotsAgainst": "nhl_sa", "goalsAgainst": "nhl_ga",
+    "goals": "nhl_g", "assists": "nhl_a", "points": "nhl_pts", "penaltyMinutes": "nhl_pim",
+}
+STATS_COLS = list(dict.fromkeys(
+    list(SKATER_SUMMARY_FIELDS.values()) + list(SKATER_REALTIME_FIELDS.values()) + list(GOALIE_SUMMARY_FIELDS.values())
+))
+
+FLOAT_STATS_COLS = {"nhl_sh_pct", "nhl_toi_avg", "nhl_fo_pct", "nhl_gaa", "nhl_sv_pct"}
+
+STATS_ENDPOINTS = [
+    ("skater/summary", "skaterFullName", SKATER_SUMMARY_FIELDS),
+    ("skater/realtime", "skaterFullName", SKATER_REALTIME_FIELDS),
+    ("goalie/summary", "goalieFullName", GOALIE_SUMMARY_FIELDS),
+]
+
+TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+def season_id(season_lbl: str) -> str:
+    """ "2025-2026" / "2025-26" -> "20252026" """
+    s = str(season_lbl or "").strip()
+    parts = [p for p in s.replace("/", "-").split("-") if p]
+    try:
+        y0 = int(parts[0][:4])
+    except Exception:
+        return ""
+    return f"{y0}{y0 + 1}"
+
+
+def fetch_stats_table(endpoint: str, season_lbl: str, *, base_url: Optional[str] = None, page_size: int = 1000,
+                      game_type: int = 2, ttl: Optional[float] = None) -> list:
+    """
+    Une requête paginée par endpoint pour toute la ligue (au lieu d'un landing par joueur).
+    ttl: fraîcheur acceptée du cache de réponses (None = défaut de l'endpoint, 0 = toujours revalider).
+    """
+    base = (base_url or pms_nhl.NHL_STATS_BASE).rstrip("/")
+    sid = season_id(season_lbl)
+    rows: list = []
+    start = 0
+    while True:
+        data = pms_nhl.http_get_json(
+            f"{base}/{endpoint}",
+            params={
+                "isAggregate": "false",
+                "isGame": "false",
+                "start": start,
+                "limit": int(page_size),
+                "cayenneExp": f"seasonId={sid} and gameTypeId={int(game_type)}",
+            },
+            timeout=20,
+            ttl=ttl,
+        )
+        page = (data or {}).get("data") or []
+        rows.extend(page)
+        total = int((data or {}).get("total") or 0)
+        start += len(page)
+        if not page or len(page) < int(page_size) or (total and start >= total):
+            break
+    return rows
+
+
+def _last_team(v) -> str:
+    # teamAbbrevs = "TOR,BOS" pour un joueur échangé: l'équipe courante est la dernière
+    parts = [p.strip() for p in str(v or "").split(",") if p.strip()]
+    return parts[-1].upper() if parts else ""
+
+
+def build_stats_frame(tables: dict) -> pd.DataFrame:
+    """
+    tables = {endpoint: [rows API]} -> un DataFrame par playerId avec les colonnes nhl_*,
+    plus _k (nom normalisé) et _team pour le matching sans nhl_id.
+    """
+    frames = []
+    for endpoint, name_field, fields in STATS_ENDPOINTS:
+        rows = tables.get(endpoint) or []
+        if not rows:
+            continue
+        raw = pd.DataFrame(rows)
+        if "playerId" not in raw.columns:
+            continue
+        f = pd.DataFrame({"playerId": pd.to_numeric(raw["playerId"], errors="coerce")})
+        f["_name"] = raw[name_field] if name_field in raw.columns else ""
+        f["_team"] = raw["teamAbbrevs"].map(_last_team) if "teamAbbrevs" in raw.columns else ""
+        for api, col in fields.items():
+            if api in raw.columns:
+                f[col] = pd.to_numeric(raw[api], errors="coerce")
+        frames.append(f.dropna(subset=["playerId"]).drop_duplicates("playerId").set_index("playerId"))
+
+    if not frames:
+        return pd.DataFrame(columns=["_name", "_team", "_k"] + STATS_COLS)
+
+    out = frames[0]
+    for f in frames[1:]:
+        out = out.combine_first(f)
+    out.index = out.index.astype("int64")
+    out["_k"] = out["_name"].fillna("").astype(str).map(_norm_player_key)
+    if "nhl_toi_avg" in out.columns:
+        # secondes/match -> minutes
+        out["nhl_toi_avg"] = (out["nhl_toi_avg"] / 60.0).round(2)
+    for c in STATS_COLS:
+        if c not in out.columns:
+            out[c] = np.nan
+    return out
+
+
+def stale_mask(df: pd.DataFrame, *, max_age_hours: float, now: Optional[datetime] = None) -> pd.Series:
+    if STATS_SYNC_COL not in df.columns:
+        return pd.Series(True, index=df.index)
+    now = now or datetime.now()
+    ts = pd.to_datetime(df[STATS_SYNC_COL], errors="coerce", format=TS_FMT)
+    return ts.isna() | (ts < pd.Timestamp(now - timedelta(hours=float(max_age_hours))))
+
+
+def match_stats_rows(df: pd.DataFrame, stats: pd.DataFrame) -> pd.Series:
+    """
+    Index players DB -> playerId LNH. Priorité: nhl_id, puis nom normalisé + équipe,
+    puis nom seul si unique dans les stats.
+    """
+    pid = pd.Series(np.nan, index=df.index, dtype="float64")
+    if stats.empty:
+        return pid
+
+    if "nhl_id" in df.columns:
+        ids = pd.to_numeric(df["nhl_id"], errors="coerce")
+        pid[ids.isin(stats.index)] = ids[ids.isin(stats.index)]
+
+    name_col = next((c for c in ["Player", "Joueur", "Name", "Nom"] if c in df.columns), None)
+    if name_col is None:
+        return pid
+
+    keys = player_keys(df[name_col])
+    teams = df["Team"].fillna("").astype(str).str.upper() if "Team" in df.columns else pd.Series("", index=df.index)
+
+    s = stats.reset_index()[["playerId", "_k", "_team"]]
+    by_kt = s.drop_duplicates(["_k", "_team"], keep=False)
+    need = pid.isna()
+    left = pd.DataFrame({"_k": keys[need].values, "_team": teams[need].values})
+    pid[need] = left.merge(by_kt, on=["_k", "_team"], how="left")["playerId"].astype("float64").values
+
+    by_k = s.drop_duplicates("_k", keep=False).set_index("_k")["playerId"]
+    need = pid.isna()
+    pid[need] = keys[need].map(by_k).astype("float64")
+    return pid
+
+
+def sync_nhl_stats(
+    path: str,
+    season_lbl: str,
+    *,
+    max_age_hours: float = 24.0,
+    base_url: Optional[str] = None,
+    force: bool = False,
+    now: Optional[datetime] = None,
+    progress_cb=None,
+) -> dict:
+    """
+    Remplit les colonnes nhl_* de la players DB via les endpoints "bulk" de l'API stats LNH
+    (3 tables pour toute la ligue), seulement pour les lignes dont nhl_last_stats_sync
+    est vide ou plus vieille que max_age_hours. Écriture unique, atomique.
+    force: toutes les lignes, et le cache de réponses HTTP est revalidé au lieu d'être relu.
+    """
+    if not os.path.exists(path):
+        return {"ok": False, "error": f"File not found: {path}"}
+
+    df = pd.read_csv(path, low_memory=False)
+    for c in STATS_COLS + [STATS_SYNC_COL, "nhl_id"]:
+        if c not in df.columns:
+            df[c] = np.nan
+
+    stale = pd.Series(True, index=df.index) if force else stale_mask(df, max_age_hours=max_age_hours, now=now)
+    n_stale = int(stale.sum())
+    if n_stale == 0:
+        return {"ok": True, "stale": 0, "matched": 0, "endpoints": 0, "total": len(df)}
+
+    tables = {}
+    endpoints = 0
+    for i, (endpoint, _, _) in enumerate(STATS_ENDPOINTS):
+        try:
+            tables[endpoint] = fetch_stats_table(endpoint, season_lbl, base_url=base_url, ttl=0 if force else None)
+        except Exception as e:
+            return {"ok": False, "error": f"{endpoint}: {e}"}
+        endpoints += 1
+        if callable(progress_cb):
+            try:
+                progress_cb({"phase": endpoint, "done": i + 1, "total": len(STATS_ENDPOINTS)})
+            except Exception:
+                pass
+
+    stats = build_stats_frame(tables)
+    pid = match_stats_rows(df, stats)
+    rows = stale & pid.notna()
+    idx = df.index[rows]
+
+    if len(idx):
+        vals = stats.loc[pid[rows].astype("int64").values, STATS_COLS]
+        for c in STATS_COLS:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+            df.loc[idx, c] = vals[c].values
+            if c not in FLOAT_STATS_COLS:
+                df[c] = df[c].round().astype("Int64")
+        df["nhl_id"] = pd.to_numeric(df["nhl_id"], errors="coerce").astype("Int64")
+        df.loc[idx, "nhl_id"] = pid[rows].astype("int64").values
+
+    # Les lignes sans match (ligues mineures, etc.) sont aussi horodatées: pas de re-fetch avant max_age_hours.
+    df[STATS_SYNC_COL] = df[STATS_SYNC_COL].astype(object)
+    df.loc[stale, STATS_SYNC_COL] = (now or datetime.now()).strftime(TS_FMT)
+    write_csv_atomic(df, path)
+
+    return {
+        "ok": True,
+        "stale": n_stale,
+        "matched": int(len(idx)),
+        "unmatched": n_stale - int(len(idx)),
+        "endpoints": endpoints,
+        "total": len(df),
+    }
@@ -0,0 +1,238 @@
+# pms_store.py
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from pms_common import file_signature, write_csv_atomic
+from pms_enrich import _guess_name_col, _norm_player_key, player_keys
+from pms_roster import ROSTER_COLS
+from pms_tx import TX_COLS
+
+# Backend SQLite optionnel: miroir indexé des CSV de DATA_DIR.
+# Les CSV restent la source d'import/export; chaque table est réimportée
+# seulement quand la signature (mtime:size) du CSV change.
+PLAYERS = "players"
+ROSTERS = "rosters"
+TRANSACTIONS = "transactions"
+
+INDEXES = {
+    PLAYERS: [("ix_players_key", ["_key"]), ("ix_players_nhl_id", ["_nhl_id"])],
+    ROSTERS: [("ix_rosters_season_owner", ["_season", ROSTER_COLS["owner"]]), ("ix_rosters_key", ["_key"])],
+    TRANSACTIONS: [("ix_tx_season_ts", ["_season", "timestamp"]), ("ix_tx_trade_id", ["trade_id"])],
+}
+INTERNAL_COLS = ["_key", "_nhl_id", "_season"]
+
+
+def _q(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _nhl_ids(df: pd.DataFrame) -> pd.Series:
+    out = pd.Series(pd.NA, index=df.index, dtype="Int64")
+    for c in ["nhl_id", "playerId"]:
+        if c in df.columns:
+            out = out.fillna(pd.to_numeric(df[c], errors="coerce").round().astype("Int64"))
+    return out
+
+
+class Store:
+    """
+    Repository SQLite (WAL) pour players / rosters / transactions.
+    Une connexion par thread (sessions Streamlit), lecteurs concurrents via WAL.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        with self._lock, self._conn() as con:
+            con.execute("CREATE TABLE IF NOT EXISTS _meta (tbl TEXT, season TEXT, source TEXT, sig TEXT, "
+                        "PRIMARY KEY (tbl, season))")
+
+    def _conn(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            con = sqlite3.connect(self.path, timeout=10)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def close(self) -> None:
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
+
+    # ------------------------------------------------------------------ schéma
+    def _columns(self, con, table: str) -> list:
+        return [r[1] for r in con.execute(f"PRAGMA table_info({_q(table)})")]
+
+    def _ensure_table(self, con, table: str, cols: Iterable[str]) -> None:
+        cols = list(dict.fromkeys(cols))
+        have = self._columns(con, table)
+        if not have:
+            defs = ", ".join(f"{_q(c)} INTEGER" if c == "_nhl_id" else f"{_q(c)} TEXT" for c in cols)
+            con.execute(f"CREATE TABLE {_q(table)} ({defs})")
+        else:
+            for c in cols:
+                if c not in have:
+                    con.execute(f"ALTER TABLE {_q(table)} ADD COLUMN {_q(c)} TEXT")
+        for name, on in INDEXES.get(table, []):
+            con.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {_q(table)} ({', '.join(map(_q, on))})")
+
+    def _insert(self, con, table: str, df: pd.DataFrame) -> None:
+        self._ensure_table(con, table, df.columns)
+        cols = ", ".join(map(_q, df.columns))
+        marks = ", ".join("?" * len(df.columns))
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        con.executemany(f"INSERT INTO {_q(table)} ({cols}) VALUES ({marks})", rows)
+
+    def _set_sig(self, con, table: str, season: str, source: str) -> None:
+        con.execute("INSERT OR REPLACE INTO _meta VALUES (?, ?, ?, ?)", (table, season, source, file_signature(source)))
+
+    def _sig(self, table: str, season: str = "") -> Optional[str]:
+        r = self._conn().execute("SELECT sig FROM _meta WHERE tbl=? AND season=?", (table, season)).fetchone()
+        return r[0] if r else None
+
+    def _replace(self, table: str, season: str, source: str, df: pd.DataFrame) -> int:
+        with self._lock:
+            con = self._conn()
+            with con:
+                if self._columns(con, table):
+                    if table == PLAYERS:
+                        con.execute(f"DELETE FROM {_q(table)}")
+                    else:
+                        con.execute(f"DELETE FROM {_q(table)} WHERE _season=?", (season,))
+                self._insert(con, table, df)
+                self._set_sig(con, table, season, source)
+        return len(df)
+
+    # ------------------------------------------------------------------ import CSV
+    def import_players_csv(self, csv_path: str, *, force: bool = False) -> int:
+        """hockey.players.csv -> table players. -1 si déjà à jour (signature inchangée)."""
+        if not os.path.exists(csv_path):
+            return 0
+        if not force and self._sig(PLAYERS) == file_signature(csv_path):
+            return -1
+        df = pd.read_csv(csv_path, dtype=str, low_memory=False)
+        name_col = _guess_name_col(df)
+        df["_key"] = player_keys(df[name_col]) if name_col else ""
+        df["_nhl_id"] = _nhl_ids(df)
+        return self._replace(PLAYERS, "", csv_path, df)
+
+    def import_roster_csv(self, csv_path: str, season: str, *, force: bool = False) -> int:
+        if not os.path.exists(csv_path):
+            return 0
+        if not force and self._sig(ROSTERS, season) == file_signature(csv_path):
+            return -1
+        df = pd.read_csv(csv_path, dtype=str)
+        df["_key"] = player_keys(df[ROSTER_COLS["player"]]) if ROSTER_COLS["player"] in df.columns else ""
+        df["_season"] = season
+        return self._replace(ROSTERS, season, csv_path, df)
+
+    def import_transactions_csv(self, csv_path: str, season: str, *, force: bool = False) -> int:
+        if not os.path.exists(csv_path):
+            return 0
+        if not force and self._sig(TRANSACTIONS, season) == file_signature(csv_path):
+            return -1
+        df = pd.read_csv(csv_path, dtype=str)
+        for c in TX_COLS:
+            if c not in df.columns:
+                df[c] = None
+        df = df[TX_COLS].copy()
+        df["_season"] = season
+        return self._replace(TRANSACTIONS, season, csv_path, df)
+
+    def sync(self, *, players_path: str = "", roster_path: str = "", tx_path: str = "", season: str = "") -> dict:
+        """Réimporte seulement les CSV modifiés. {table: lignes importées | -1 (à jour) | 0 (absent)}"""
+        out = {}
+        if players_path:
+            out[PLAYERS] = self.import_players_csv(players_path)
+        if roster_path:
+            out[ROSTERS] = self.import_roster_csv(roster_path, season)
+        if tx_path:
+            out[TRANSACTIONS] = self.import_transactions_csv(tx_path, season)
+        return out
+
+    # ------------------------------------------------------------------ requêtes
+    def _query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        try:
+            df = pd.read_sql_query(sql, self._conn(), params=params)
+        except (sqlite3.OperationalError, pd.errors.DatabaseError):
+            # table pas encore importée
+            return pd.DataFrame()
+        return df.drop(columns=[c for c in INTERNAL_COLS if c in df.columns])
+
+    def player(self, name: str) -> Optional[dict]:
+        df = self._query(f"SELECT * FROM {PLAYERS} WHERE _key=? LIMIT 1", (_norm_player_key(name),))
+        return None if df.empty else df.iloc[0].to_dict()
+
+    def player_by_nhl_id(self, nhl_id) -> Optional[dict]:
+        df = self._query(f"SELECT * FROM {PLAYERS} WHERE _nhl_id=? LIMIT 1", (int(nhl_id),))
+        return None if df.empty else df.iloc[0].to_dict()
+
+    def players(self, names: Iterable[str]) -> pd.DataFrame:
+        keys = sorted({_norm_player_key(n) for n in names} - {""})
+        if not keys:
+            return pd.DataFrame()
+        return self._query(f"SELECT * FROM {PLAYERS} WHERE _key IN ({', '.join('?' * len(keys))})", tuple(keys))
+
+    def owners(self, season: str) -> list:
+        try:
+            rows = self._conn().execute(
+                f"SELECT DISTINCT {_q(ROSTER_COLS['owner'])} FROM {ROSTERS} WHERE _season=? ORDER BY 1", (season,)
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        return [r[0] for r in rows if r[0] is not None and str(r[0]).strip()]
+
+    def roster(self, season: str, owner: str = "") -> pd.DataFrame:
+        if owner:
+            return self._query(f"SELECT * FROM {ROSTERS} WHERE _season=? AND {_q(ROSTER_COLS['owner'])}=?", (season, owner))
+        return self._query(f"SELECT * FROM {ROSTERS} WHERE _season=?", (season,))
+
+    def transactions(self, season: str) -> pd.DataFrame:
+        df = self._query(f"SELECT * FROM {TRANSACTIONS} WHERE _season=? ORDER BY timestamp DESC", (season,))
+        return df if not df.empty else pd.DataFrame(columns=TX_COLS)
+
+    def add_transaction(self, season: str, row: dict, *, csv_path: str = "") -> None:
+        """
+        Insère une transaction. Si csv_path est donné (déjà écrit via tx_append), la signature
+        du CSV est mise à jour pour éviter une réimportation complète au prochain sync.
+        """
+        new = pd.DataFrame([{c: row.get(c, None) for c in TX_COLS}], columns=TX_COLS)
+        new["_season"] = season
+        with self._lock:
+            con = self._conn()
+            with con:
+                self._insert(con, TRANSACTIONS, new)
+                if csv_path:
+                    self._set_sig(con, TRANSACTIONS, season, csv_path)
+
+    # ------------------------------------------------------------------ export CSV
+    def export_csv(self, table: str, path: str, *, season: str = "") -> int:
+        if table == PLAYERS:
+            df = self._query(f"SELECT * FROM {PLAYERS} ORDER BY rowid")
+        else:
+            df = self._query(f"SELECT * FROM {_q(table)} WHERE _season=? ORDER BY rowid", (season,))
+        if df.empty:
+            return 0
+        write_csv_atomic(df, path)
+        return len(df)
+
+    def stats(self) -> dict:
+        con = self._conn()
+        out = {"path": self.path, "journal_mode": con.execute("PRAGMA journal_mode").fetchone()[0]}
+        for t in (PLAYERS, ROSTERS, TRANSACTIONS):
+            try:
+                out[t] = con.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+            except sqlite3.OperationalError:
+                out[t] = 0
+        return out
@@ -0,0 +1,323 @@
+# pms_sync.py
+from __future__ import annotations
+
+import hashlib
+import os
+from abc import ABC, abstractmethod
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from pms_common import file_signature, read_json, write_json
+
+# Synchro incrémentale des backups vers un stockage distant:
+# - manifest local (clé -> sha256, taille, signature locale) = état distant connu;
+#   un fichier dont le hash n'a pas changé n'est jamais renvoyé;
+# - envoi par morceaux (chunk_size), plusieurs morceaux/fichiers en parallèle;
+# - reprise: une session d'envoi est identifiée par (clé, sha256, chunk_size), les morceaux déjà
+#   reçus par le stockage ne sont pas renvoyés après une coupure;
+# - stockage enfichable (Storage); LocalDirStorage sert de cible locale / hors-ligne.
+CHUNK_SIZE = 4 * 1024 * 1024
+WORKERS = 4
+RETRIES = 3
+
+
+def sha256_file(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def upload_id(key: str, sha: str, chunk_size: int) -> str:
+    # chunk_size en fait partie: des morceaux reçus avec une autre taille ne sont jamais réutilisés
+    return hashlib.sha1(f"{key}\x00{sha}\x00{int(chunk_size)}".encode("utf-8")).hexdigest()[:20]
+
+
+class Storage(ABC):
+    """
+    Interface d'un stockage distant. Une implémentation fournit les sessions d'envoi
+    reprenables (begin / uploaded / put_chunk / commit) et la lecture (stat / list / download).
+    """
+
+    name = "storage"
+    url = ""
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def list(self) -> Dict[str, dict]:
+        ...
+
+    @abstractmethod
+    def begin(self, key: str, size: int, sha: str, chunk_size: int) -> str:
+        """Ouvre (ou retrouve) la session d'envoi de cette version du fichier, découpée en chunk_size."""
+
+    @abstractmethod
+    def uploaded(self, session: str) -> set:
+        """Index des morceaux déjà reçus pour la session."""
+
+    @abstractmethod
+    def put_chunk(self, session: str, index: int, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def commit(self, session: str, key: str, sha: str, n_chunks: int) -> None:
+        """Assemble, vérifie le sha256 et publie d'un coup (lève ValueError si le contenu ne correspond pas)."""
+
+    @abstractmethod
+    def abort(self, session: str) -> None:
+        ...
+
+    @abstractmethod
+    def download(self, key: str, dest: str) -> None:
+        ...
+
+
+class LocalDirStorage(Storage):
+    """Cible = dossier local (disque externe, montage réseau, tests). Sessions dans root/.uploads/<id>/."""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+        self.url = f"local:{root}"
+        os.makedirs(os.path.join(root, ".uploads"), exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        p = os.path.normpath(os.path.join(self.root, key))
+        if not p.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"clé hors du stockage: {key}")
+        return p
+
+    def _session_dir(self, session: str) -> str:
+        return os.path.join(self.root, ".uploads", session)
+
+    def stat(self, key: str) -> Optional[dict]:
+        try:
+            st_ = os.stat(self._path(key))
+        except (OSError, ValueError):
+            return None
+        return {"size": st_.st_size}
+
+    def list(self) -> Dict[str, dict]:
+        out = {}
+        for d, dirs, files in os.walk(self.root):
+            dirs[:] = [x for x in dirs if x != ".uploads"]
+            for f in files:
+                p = os.path.join(d, f)
+                out[os.path.relpath(p, self.root).replace(os.sep, "/")] = {"size": os.path.getsize(p)}
+        return out
+
+    def begin(self, key: str, size: int, sha: str, chunk_size: int) -> str:
+        session = upload_id(key, sha, chunk_size)
+        os.makedirs(self._session_dir(session), exist_ok=True)
+        return session
+
+    def uploaded(self, session: str) -> set:
+        d = self._session_dir(session)
+        if not os.path.isdir(d):
+            return set()
+        return {int(f[:-5]) for f in os.listdir(d) if f.endswith(".part")}
+
+    def put_chunk(self, session: str, index: int, data: bytes) -> None:
+        p = os.path.join(self._session_dir(session), f"{index:06d}.part")
+        tmp = f"{p}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, p)  # un morceau présent est complet
+
+    def commit(self, session: str, key: str, sha: str, n_chunks: int) -> None:
+        d = self._session_dir(session)
+        dest = self._path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{session}.tmp"
+        h = hashlib.sha256()
+        with open(tmp, "wb") as out:
+            for i in range(n_chunks):
+                with open(os.path.join(d, f"{i:06d}.part"), "rb") as f:
+                    data = f.read()
+                h.update(data)
+                out.write(data)
+        if h.hexdigest() != sha:
+            os.remove(tmp)
+            self.abort(session)
+            raise ValueError(f"sha256 différent après assemblage: {key}")
+        os.replace(tmp, dest)
+        self.abort(session)
+
+    def abort(self, session: str) -> None:
+        shutil.rmtree(self._session_dir(session), ignore_errors=True)
+
+    def download(self, key: str, dest: str) -> None:
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        tmp = dest + ".tmp"
+        shutil.copyfile(self._path(key), tmp)
+        os.replace(tmp, dest)
+
+
+# schéma -> fabrique: "local:/mnt/offsite" ; d'autres cibles (Drive, S3...) s'enregistrent ici
+STORAGES: Dict[str, Callable[[str], Storage]] = {"local": LocalDirStorage}
+
+
+def register_storage(scheme: str, factory: Callable[[str], Storage]) -> None:
+    STORAGES[scheme] = factory
+
+
+def storage_from_url(url: str) -> Storage:
+    scheme, _, rest = (url or "").partition(":")
+    if scheme not in STORAGES or not rest:
+        raise ValueError(f"cible inconnue: {url!r} (schémas: {', '.join(sorted(STORAGES))})")
+    return STORAGES[scheme](rest)
+
+
+def collect_files(backup_dir: str, extra: Optional[dict] = None) -> dict:
+    """Clé distante -> chemin local: tout backup_dir (backups/<relpath>) + fichiers courants (current/<nom>)."""
+    out = {}
+    if os.path.isdir(backup_dir):
+        for d, _, files in os.walk(backup_dir):
+            for f in sorted(files):
+                if f.endswith(".tmp"):
+                    continue
+                p = os.path.join(d, f)
+                out["backups/" + os.path.relpath(p, backup_dir).replace(os.sep, "/")] = p
+    for p in (extra or {}).values():
+        if p and os.path.exists(p):
+            out["current/" + os.path.basename(p)] = p
+    return out
+
+
+def load_manifest(path: str, target: str) -> dict:
+    m = read_json(path)
+    if m.get("target") != target:
+        # autre cible: rien n'est connu comme envoyé
+        m = {"target": target, "files": {}}
+    m.setdefault("files", {})
+    return m
+
+
+def plan(files: dict, manifest: dict, storage: Optional[Storage] = None) -> list:
+    """
+    Fichiers à envoyer: [(clé, chemin, sha256, taille)]. Le sha256 n'est recalculé que si la
+    signature locale (mtime:size) a changé; storage: vérifie aussi que l'objet distant existe encore.
+    """
+    todo = []
+    known = manifest.get("files", {})
+    for key, path in files.items():
+        sig = file_signature(path)
+        if not sig:
+            continue
+        ent = known.get(key) or {}
+        sha = ent.get("sha256") if ent.get("local_sig") == sig else None
+        if sha is None:
+            sha = sha256_file(path)
+        size = os.path.getsize(path)
+        if ent.get("sha256") == sha:
+            if ent.get("local_sig") != sig:
+                ent["local_sig"] = sig  # touché mais même contenu
+            remote = storage.stat(key) if storage is not None else {"size": size}
+            if remote is not None and int(remote.get("size", -1)) == size:
+                continue
+        todo.append((key, path, sha, size))
+    return todo
+
+
+def sync(
+    files: dict,
+    storage: Storage,
+    manifest_path: str,
+    *,
+    chunk_size: int = CHUNK_SIZE,
+    workers: int = WORKERS,
+    progress_cb: Optional[Callable] = None,
+    verify_remote: bool = True,
+) -> dict:
+    """
+    Envoie les fichiers nouveaux/modifiés. Le manifest est réécrit après chaque fichier publié,
+    donc une synchro interrompue reprend où elle s'est arrêtée (fichiers et morceaux).
+    """
+    t0 = time.perf_counter()
+    manifest = load_manifest(manifest_path, storage.url or storage.name)
+    todo = plan(files, manifest, storage if verify_remote else None)
+    stats = {"files": len(files), "uploaded": 0, "skipped": len(files) - len(todo), "bytes": 0,
+             "chunks": 0, "chunks_resumed": 0, "errors": []}
+    total_bytes = sum(s for *_, s in todo)
+    counters = {"uploaded": 0, "skipped": stats["skipped"], "errors": 0}
+
+    def _emit(final=False):
+        if progress_cb:
+            progress_cb({"phase": "sync", "done": stats["bytes"] if not final else total_bytes, "total": total_bytes, "counters": dict(counters)})
+
+    def _send(path, session, i):
+        with open(path, "rb") as f:
+            f.seek(i * chunk_size)
+            data = f.read(chunk_size)
+        for attempt in range(RETRIES):
+            try:
+                storage.put_chunk(session, i, data)
+                return len(data)
+            except Exception:
+                if attempt == RETRIES - 1:
+                    raise
+                time.sleep(0.2 * (attempt + 1))
+
+    sessions, remaining = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, int(workers))) as ex:
+        futs = {}
+        for key, path, sha, size in todo:
+            n = max(1, -(-size // chunk_size))
+            try:
+                session = storage.begin(key, size, sha, chunk_size)
+                done = storage.uploaded(session)
+            except Exception as e:
+                stats["errors"].append(f"{key}: {e}")
+                counters["errors"] += 1
+                continue
+            stats["chunks_resumed"] += len(done & set(range(n)))
+            sessions[key] = (path, sha, size, session, n)
+            missing = [i for i in range(n) if i not in done]
+            remaining[key] = len(missing)
+            for i in missing:
+                futs[ex.submit(_send, path, session, i)] = key
+        failed = set()
+
+        def _publish(key):
+            path, sha, size, session, n = sessions[key]
+            try:
+                storage.commit(session, key, sha, n)
+            except Exception as e:
+                stats["errors"].append(f"{key}: {e}")
+                counters["errors"] += 1
+                return
+            manifest["files"][key] = {"sha256": sha, "size": size, "local_sig": file_signature(path),
+                                      "uploaded": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+            write_json(manifest_path, manifest)
+            stats["uploaded"] += 1
+            counters["uploaded"] += 1
+
+        for key in [k for k, r in remaining.items() if r == 0]:
+            _publish(key)  # tous les morceaux déjà reçus: il ne reste qu'à publier
+        for fut in as_completed(futs):
+            key = futs[fut]
+            try:
+                stats["bytes"] += fut.result()
+                stats["chunks"] += 1
+            except Exception as e:
+                if key not in failed:
+                    failed.add(key)
+                    stats["errors"].append(f"{key}: {e}")
+                    counters["errors"] += 1
+            remaining[key] -= 1
+            if remaining[key] == 0 and key not in failed:
+                _publish(key)
+            _emit()
+    write_json(manifest_path, manifest)
+    _emit(final=True)
+    stats["ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+    return stats
@@ -0,0 +1,59 @@
+# pms_tx.py
+from __future__ import annotations
+
+import csv
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+TX_COLS = ["trade_id","timestamp","season","owner_a","owner_b","a_players","b_players","a_picks","b_picks","a_cash","b_cash","status","notes"]
+
+
+def tx_read(path: str) -> pd.DataFrame:
+    if os.path.exists(path):
+        try:
+            df = pd.read_csv(path)
+            for c in TX_COLS:
+                if c not in df.columns:
+                    df[c] = ""
+            return df[TX_COLS].copy()
+        except Exception:
+            pass
+    return pd.DataFrame(columns=TX_COLS)
+
+
+def tx_write(path: str, df: pd.DataFrame) -> None:
+    try:
+        df.to_csv(path, index=False)
+    except Exception:
+        pass
+
+
+def _header(path: str) -> list:
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return next(csv.reader(f), [])
+    except Exception:
+        return []
+
+
+def tx_append(path: str, row: dict) -> None:
+    """
+    Ajoute une transaction. Si l'en-tête du fichier est déjà TX_COLS, on écrit une seule
+    ligne en mode append (pas de relecture/réécriture du fichier complet).
+    """
+    new = pd.DataFrame([{c: row.get(c, "") for c in TX_COLS}], columns=TX_COLS)
+    if os.path.exists(path) and os.path.getsize(path) > 0 and _header(path) == TX_COLS:
+        with open(path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) not in (b"\n", b"\r"):
+                f.write(b"\n")
+        new.to_csv(path, mode="a", header=False, index=False)
+        return
+    tx_write(path, pd.concat([tx_read(path), new], ignore_index=True))
+
+
+def make_trade_id() -> str:
+    return "TR-" + datetime.now().strftime("%Y%m%d") + "-" + hex(int(time.time() * 1000))[-6:].upper()
@@ -0,0 +1,295 @@
+# pms_validate.py
+from __future__ import annotations
+
+import os
+import re
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from pms_cap import split_names
+from pms_common import file_signature
+from pms_contracts import season_end_year
+from pms_enrich import _guess_name_col, _norm_player_key, player_keys
+from pms_roster import ROSTER_COLS
+from pms_schema import parse_cap_hit
+from pms_snapshot import read_current
+
+# Validation de DATA_DIR: schémas déclarés par type de fichier + règles entre fichiers.
+# Chaque règle est vectorisée (une passe par colonne, évaluée par valeur distincte quand
+# la fonction est scalaire). Résultats gardés par signature de fichier (mtime:size).
+ERROR, WARNING = "error", "warning"
+REPORT_COLS = ["file", "kind", "severity", "rule", "column", "line", "value", "message"]
+MAX_MONEY = 30_000_000
+
+FILE_KINDS = [
+    ("players", re.compile(r"^hockey\.players\.csv$")),
+    ("roster", re.compile(r"^equipes_joueurs_(\d{4}-\d{4})\.csv$")),
+    ("transactions", re.compile(r"^transactions_(\d{4}-\d{4})\.csv$")),
+    ("contracts", re.compile(r"^puckpedia\.contracts\.csv$")),
+]
+
+SCHEMAS = {
+    "players": {
+        "required": ["Player"],
+        "columns": {
+            "Cap Hit": "money", "FlagISO2": "iso2", "Position": "position", "Level": ("enum", {"ELC", "STD"}),
+            "Expiry Year": "season", "Start Year": "season", "NHL GP": "int", "NHL P": "int", "Age": "int",
+        },
+    },
+    "roster": {
+        "required": [ROSTER_COLS[k] for k in ("owner", "player", "pos", "salary", "slot")],
+        "columns": {
+            ROSTER_COLS["salary"]: "money", ROSTER_COLS["slot"]: "slot", ROSTER_COLS["pos"]: "position",
+            ROSTER_COLS["level"]: ("enum", {"ELC", "STD"}),
+        },
+    },
+    "transactions": {
+        "required": ["trade_id", "timestamp", "owner_a", "owner_b"],
+        "columns": {"timestamp": "datetime", "season": "season", "a_cash": "money", "b_cash": "money"},
+        "unique": "trade_id",
+    },
+    "contracts": {
+        "required": ["first_name", "last_name", "contract_end"],
+        "columns": {"contract_end": "season", "contract_level": ("enum", {"entry_level", "standard_level"})},
+    },
+}
+
+_SLOT_WORDS = ("actif", "banc", "inj", "bless", "mineur", "minor", "ahl", "farm")  # mots reconnus par slot_bucket
+
+
+def classify(name: str) -> tuple:
+    """ "equipes_joueurs_2025-2026.csv" -> ("roster", "2025-2026"); fichier inconnu -> ("", "") """
+    for kind, rx in FILE_KINDS:
+        m = rx.match(name)
+        if m:
+            return kind, (m.group(1) if m.groups() else "")
+    return "", ""
+
+
+def _position_ok(v: str) -> bool:
+    parts = [p.strip() for p in v.replace("/", ",").upper().split(",")]
+    return all(p in ("F", "D", "G", "C", "LW", "RW", "W") for p in parts)
+
+
+def _slot_ok(v: str) -> bool:
+    s = v.strip().lower()
+    return s == "ir" or any(w in s for w in _SLOT_WORDS)
+
+
+def _bad_by_value(col: pd.Series, ok) -> pd.Series:
+    """ok(valeur) évalué une fois par valeur distincte non vide; masque des lignes invalides."""
+    filled = col.ne("")
+    uniq = pd.unique(col[filled])
+    verdict = dict(zip(uniq, map(ok, uniq)))
+    return filled & col.map(verdict).eq(False)
+
+
+def _check_column(col: pd.Series, rule) -> list:
+    """Liste de (masque, règle, sévérité, message) pour une colonne texte (dtype=str, vides = "")."""
+    col = col.str.strip()
+    filled = col.ne("")
+    if rule == "money":
+        v = parse_cap_hit(col.where(filled))
+        # "4,75M", "n/a": des chiffres manquent ou restent des lettres
+        junk = col.str.contains(r"[A-Za-z]", regex=True)
+        out = [(filled & (v.isna() | junk), "money_unparseable", ERROR, "montant illisible")]
+        out.append((filled & v.notna() & ~junk & v.gt(MAX_MONEY), "money_range", WARNING, f"montant > {MAX_MONEY:,}".replace(",", " ")))
+        return out
+    if rule == "int":
+        return [(filled & pd.to_numeric(col.where(filled), errors="coerce").isna(), "int_unparseable", ERROR, "entier attendu")]
+    if rule == "iso2":
+        return [(filled & ~col.str.fullmatch(r"[A-Za-z]{2}"), "iso2_format", ERROR, "code pays ISO2 attendu")]
+    if rule == "season":
+        return [(_bad_by_value(col, lambda v: season_end_year(v) is not None), "season_format", ERROR, "saison attendue (2025-26 / 2025-2026)")]
+    if rule == "datetime":
+        return [(filled & pd.to_datetime(col.where(filled), errors="coerce", format="mixed").isna(), "datetime_unparseable", ERROR, "date illisible")]
+    if rule == "position":
+        return [(_bad_by_value(col, _position_ok), "position_unknown", ERROR, "position inconnue (F/D/G/C/LW/RW)")]
+    if rule == "slot":
+        return [(_bad_by_value(col, _slot_ok), "slot_unknown", WARNING, "Slot non reconnu (compté Actif)")]
+    if isinstance(rule, tuple) and rule[0] == "enum":
+        allowed = rule[1]
+        return [(filled & ~col.isin(allowed), "enum", ERROR, "valeur hors " + "/".join(sorted(allowed)))]
+    return []
+
+
+def _rows(mask: pd.Series, df: pd.DataFrame, col: str, **kw) -> pd.DataFrame:
+    idx = np.flatnonzero(mask.to_numpy())
+    return pd.DataFrame({
+        "column": col, "line": idx + 2,  # ligne du CSV (en-tête = 1)
+        "value": df[col].to_numpy()[idx] if col in df.columns else "", **kw,
+    })
+
+
+def validate_frame(df: pd.DataFrame, kind: str) -> pd.DataFrame:
+    """Règles de schéma d'un fichier (colonnes requises, formats, unicité)."""
+    schema = SCHEMAS[kind]
+    parts = []
+    missing = [c for c in schema["required"] if c not in df.columns]
+    if missing:
+        parts.append(pd.DataFrame({"column": missing, "line": 0, "value": "", "severity": ERROR,
+                                   "rule": "missing_column", "message": "colonne requise absente"}))
+    for c, rule in schema["columns"].items():
+        if c not in df.columns:
+            continue
+        for mask, name, sev, msg in _check_column(df[c], rule):
+            if mask.any():
+                parts.append(_rows(mask, df, c, severity=sev, rule=name, message=msg))
+    u = schema.get("unique")
+    if u and u in df.columns:
+        dup = df[u].ne("") & df[u].duplicated(keep=False)
+        if dup.any():
+            parts.append(_rows(dup, df, u, severity=ERROR, rule="duplicate", message="identifiant en double"))
+    if kind == "players":
+        name_col = _guess_name_col(df)
+        if name_col:
+            k = player_keys(df[name_col])
+            dup = k.ne("") & k.duplicated(keep=False)
+            if dup.any():
+                parts.append(_rows(dup, df, name_col, severity=WARNING, rule="duplicate_key",
+                                   message="nom normalisé en double (homonyme ou doublon)"))
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=REPORT_COLS[2:])
+
+
+def cross_rules(files: dict) -> pd.DataFrame:
+    """
+    Règles entre fichiers. files: nom -> (kind, season, DataFrame texte).
+    Roster: joueur absent de la players DB, joueur dans deux équipes la même saison.
+    Transactions: propriétaires / joueurs inconnus du roster de la saison.
+    """
+    parts = []
+    players = next((df for k, _, df in files.values() if k == "players"), None)
+    db_keys = set()
+    if players is not None and _guess_name_col(players):
+        db_keys = set(player_keys(players[_guess_name_col(players)]))
+    rosters = {s: (name, df) for name, (k, s, df) in files.items() if k == "roster"}
+
+    def _add(name, kind, mask, df, col, **kw):
+        if mask.any():
+            parts.append(_rows(mask, df, col, **kw).assign(file=name, kind=kind))
+
+    pcol, ocol = ROSTER_COLS["player"], ROSTER_COLS["owner"]
+    for season, (name, df) in rosters.items():
+        if pcol not in df.columns:
+            continue
+        k = player_keys(df[pcol])
+        if db_keys:
+            _add(name, "roster", k.ne("") & ~k.isin(db_keys), df, pcol, severity=WARNING,
+                 rule="unmatched_player", message="joueur absent de la players DB")
+        if ocol in df.columns:
+            owners_per = pd.Series(df[ocol].to_numpy(), index=k.to_numpy()).groupby(level=0).nunique()
+            multi = set(owners_per[owners_per.gt(1)].index) - {""}
+            _add(name, "roster", k.isin(multi), df, pcol, severity=ERROR,
+                 rule="multi_owner", message="joueur dans plusieurs équipes la même saison")
+
+    for name, (kind, season, df) in files.items():
+        if kind != "transactions" or season not in rosters:
+            continue
+        rdf = rosters[season][1]
+        owners = set(rdf[ocol].str.strip()) if ocol in rdf.columns else set()
+        r_keys = set(player_keys(rdf[pcol])) if pcol in rdf.columns else set()
+        for c in ("owner_a", "owner_b"):
+            if c in df.columns and owners:
+                v = df[c].str.strip()
+                _add(name, kind, v.ne("") & ~v.isin(owners), df, c, severity=ERROR,
+                     rule="unknown_owner", message=f"propriétaire absent de equipes_joueurs_{season}")
+        for c in ("a_players", "b_players"):
+            if c not in df.columns or not (r_keys or db_keys):
+                continue
+            known = r_keys | db_keys
+            bad = df[c].map(lambda txt: any(_norm_player_key(n) not in known for n in split_names(txt)))
+            _add(name, kind, bad.astype(bool), df, c, severity=WARNING,
+                 rule="unknown_player", message="joueur échangé introuvable (roster / players DB)")
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=REPORT_COLS)
+
+
+CROSS_COLS = {"roster": [ROSTER_COLS["player"], ROSTER_COLS["owner"]],
+              "transactions": ["owner_a", "owner_b", "a_players", "b_players"]}
+
+
+def _cross_input(df: pd.DataFrame, kind: str) -> pd.DataFrame:
+    """Seules les colonnes lues par cross_rules (état gardé en mémoire et persisté)."""
+    if kind == "players":
+        c = _guess_name_col(df)
+        return df[[c]].drop_duplicates().reset_index(drop=True) if c else pd.DataFrame()
+    return df[[c for c in CROSS_COLS.get(kind, []) if c in df.columns]]
+
+
+class DataValidator:
+    """
+    Rapport complet de DATA_DIR. Les résultats par fichier sont gardés par signature;
+    les règles croisées sont rejouées seulement si une signature de l'ensemble change.
+    store (IndexStore): état persisté entre redémarrages, revalidé par les mêmes signatures.
+    """
+
+    def __init__(self, data_dir: str, *, store=None):
+        self.data_dir = data_dir
+        self.store = store
+        self._lock = threading.Lock()
+        self._per_file: dict = {}   # nom -> (sig, kind, season, colonnes de cross_rules, report)
+        self._cross: tuple = ((), pd.DataFrame(columns=REPORT_COLS))
+        self.runs = {"files": 0, "cross": 0}
+        state = store.load("validator") if store is not None else None
+        if isinstance(state, dict) and state.get("data_dir") == os.path.abspath(data_dir):
+            self._per_file, self._cross = state["per_file"], state["cross"]
+
+    def _scan(self) -> dict:
+        out = {}
+        if not os.path.isdir(self.data_dir):
+            return out
+        for f in sorted(os.listdir(self.data_dir)):
+            kind, season = classify(f)
+            if kind:
+                out[f] = (kind, season, os.path.join(self.data_dir, f))
+        return out
+
+    def report(self) -> pd.DataFrame:
+        with self._lock:
+            found = self._scan()
+            for f in [f for f in self._per_file if f not in found]:
+                self._per_file.pop(f)
+            for f, (kind, season, path) in found.items():
+                sig = file_signature(path)
+                cur = self._per_file.get(f)
+                if cur is not None and cur[0] == sig:
+                    continue
+                try:
+                    df = read_current(path)
+                    rep = validate_frame(df, kind)
+                except Exception as e:
+                    df = pd.DataFrame()
+                    rep = pd.DataFrame({"column": [""], "line": [0], "value": [""], "severity": [ERROR],
+                                        "rule": ["unreadable"], "message": [str(e)]})
+                self._per_file[f] = (sig, kind, season, _cross_input(df, kind), rep.assign(file=f, kind=kind))
+                self.runs["files"] += 1
+
+            sigs = tuple(sorted((f, v[0]) for f, v in self._per_file.items()))
+            if sigs != self._cross[0]:
+                cross = cross_rules({f: (v[1], v[2], v[3]) for f, v in self._per_file.items()})
+                self._cross = (sigs, cross)
+                self.runs["cross"] += 1
+                if self.store is not None:
+                    self.store.save("validator", {"data_dir": os.path.abspath(self.data_dir),
+                                                  "per_file": self._per_file, "cross": self._cross})
+            parts = [v[4] for v in self._per_file.values() if len(v[4])] + ([self._cross[1]] if len(self._cross[1]) else [])
+        if not parts:
+            return pd.DataFrame(columns=REPORT_COLS)
+        out = pd.concat(parts, ignore_index=True)[REPORT_COLS]
+        out["line"] = out["line"].astype(np.int64)
+        return out.sort_values(["severity", "file", "rule", "line"], kind="stable").reset_index(drop=True)
+
+
+def summary(report: pd.DataFrame) -> pd.DataFrame:
+    """Fichier × règle: nombre de lignes en erreur / avertissement."""
+    cols = ["file", "rule", "severity", "column", "count"]
+    if report is None or report.empty:
+        return pd.DataFrame(columns=cols)
+    g = report.groupby(["file", "rule", "severity", "column"], sort=False).size().rename("count").reset_index()
+    return g.sort_values(["severity", "count"], ascending=[True, False]).reset_index(drop=True)[cols]
+
+
+def validate_dir(data_dir: str, validator: Optional[DataValidator] = None) -> pd.DataFrame:
+    return (validator or DataValidator(data_dir)).report()
@@ -0,0 +1,190 @@
+# pms_views.py
+from __future__ import annotations
+
+import os
+import re
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from pms_common import iso2_from_code
+from pms_enrich import _guess_name_col, _norm_player_key, player_keys, points_frame, upper_col
+from pms_lineup import eligible
+from pms_roster import ROSTER_COLS
+from pms_schema import parse_cap_hit
+
+# Vues matérialisées de la ligue (onglet Home): roster × players DB joint une fois par saison,
+# agrégats additifs maintenus par delta quand un roster ou la players DB change.
+FACT_COLS = ["owner", "player", "_k", "pos", "country", "level", "cap_hit", "points"]
+MEASURES = ["players", "points", "cap_hit", "elc"]
+VIEWS = {
+    "owners": ["owner"],             # points, cap, nb ELC par propriétaire
+    "nationality": ["country"],      # répartition par pays
+    "positions": ["owner", "pos"],   # cap par position
+}
+ROSTER_FILE_RE = re.compile(r"^equipes_joueurs_(\d{4}-\d{4})\.csv$")
+
+
+def roster_files(data_dir: str) -> dict:
+    """Saison -> chemin, pour tout l'historique equipes_joueurs_{saison}.csv de DATA_DIR."""
+    if not os.path.isdir(data_dir):
+        return {}
+    out = {}
+    for f in sorted(os.listdir(data_dir)):
+        m = ROSTER_FILE_RE.match(f)
+        if m:
+            out[m.group(1)] = os.path.join(data_dir, f)
+    return out
+
+
+def _db_attrs(players_db: pd.DataFrame) -> pd.DataFrame:
+    """players DB -> points, cap_hit, db_pos, level, country indexés par clé (première ligne par clé)."""
+    pf = points_frame(players_db)
+    name_col = _guess_name_col(players_db) if players_db is not None else None
+    if pf.empty or not name_col:
+        return pd.DataFrame(columns=["points", "cap_hit", "db_pos", "level", "country"])
+    cc = upper_col(players_db, "FlagISO2").map(iso2_from_code)
+    cc = cc.where(cc.ne(""), upper_col(players_db, "Country").map(iso2_from_code))
+    extra = pd.DataFrame({"_k": player_keys(players_db[name_col]), "level": upper_col(players_db, "Level"), "country": cc})
+    extra = extra[extra["_k"].ne("")].drop_duplicates("_k").set_index("_k")
+    return pf.join(extra, how="left")
+
+
+def _base_rows(roster: pd.DataFrame, keymap: dict) -> pd.DataFrame:
+    """
+    Colonnes du roster utiles aux vues (le reste n'est pas gardé en mémoire).
+    keymap: nom -> clé normalisée, partagé entre saisons et mises à jour (chaque nom normalisé une fois).
+    """
+    if roster is None or roster.empty or ROSTER_COLS["player"] not in roster.columns:
+        return pd.DataFrame(columns=["owner", "player", "_k", "r_pos", "r_level", "salary"])
+
+    def _text(c):
+        if c not in roster.columns:
+            return pd.Series("", index=roster.index, dtype=object)
+        return roster[c].astype(object).where(roster[c].notna(), "").astype(str).str.strip()
+
+    sal = ROSTER_COLS["salary"]
+    r = pd.DataFrame({
+        "owner": _text(ROSTER_COLS["owner"]),
+        "player": _text(ROSTER_COLS["player"]),
+        "r_pos": _text(ROSTER_COLS["pos"]),
+        "r_level": _text(ROSTER_COLS["level"]).str.upper(),
+        "salary": parse_cap_hit(roster[sal].astype(object)) if sal in roster.columns else pd.NA,
+    })
+    todo = [x for x in pd.unique(r["player"]) if x not in keymap]
+    keymap.update(zip(todo, map(_norm_player_key, todo)))
+    r["_k"] = r["player"].map(keymap)
+    return r[r["owner"].ne("") & r["_k"].ne("")].reset_index(drop=True)
+
+
+def _facts(base: pd.DataFrame, attrs: pd.DataFrame) -> pd.DataFrame:
+    if base.empty:
+        return pd.DataFrame(columns=FACT_COLS)
+    j = base.join(attrs, on="_k", how="left")
+    pos = j["r_pos"].where(j["r_pos"].ne(""), j["db_pos"].fillna(""))
+    uniq = pd.unique(pos)
+    pos = pos.map({p: (eligible(p) or ("?",))[0] for p in uniq})
+    level = j["r_level"].where(j["r_level"].ne(""), j["level"].fillna(""))
+    cap = j["cap_hit"].astype("Int64").fillna(j["salary"].astype("Int64")).fillna(0)
+    return pd.DataFrame({
+        "owner": j["owner"], "player": j["player"], "_k": j["_k"], "pos": pos,
+        "country": j["country"].fillna("").replace("", "?"), "level": level,
+        "cap_hit": cap.astype(np.int64), "points": j["points"].fillna(0.0).astype(float),
+    })
+
+
+def _measures(facts: pd.DataFrame, weight) -> pd.DataFrame:
+    return pd.DataFrame({
+        "players": weight,
+        "points": facts["points"].to_numpy() * weight,
+        "cap_hit": facts["cap_hit"].to_numpy(dtype=np.int64) * weight,
+        "elc": facts["level"].eq("ELC").to_numpy(dtype=np.int64) * weight,
+    }, index=facts.index)
+
+
+class LeagueViews:
+    """
+    Faits (une ligne par joueur de roster) par saison + agrégats par vue, indexés (season, *clés).
+    Un changement ne touche que les lignes de faits ajoutées/retirées/modifiées
+    (diff multi-ensemble), puis applique leur contribution signée aux agrégats.
+    """
+
+    def __init__(self, players_db: Optional[pd.DataFrame] = None):
+        self._attrs = _db_attrs(players_db if players_db is not None else pd.DataFrame())
+        self._base: dict = {}
+        self._facts: dict = {}
+        self._keymap: dict = {}
+        self._views = {v: self._empty(keys) for v, keys in VIEWS.items()}
+        self.last_delta = 0
+
+    @staticmethod
+    def _empty(keys: list) -> pd.DataFrame:
+        idx = pd.MultiIndex.from_arrays([[] for _ in range(len(keys) + 1)], names=["season"] + keys)
+        return pd.DataFrame({m: pd.Series(dtype=np.float64 if m == "points" else np.int64) for m in MEASURES}, index=idx)
+
+    def seasons(self) -> list:
+        return sorted(self._facts)
+
+    def _apply(self, season: str, old: pd.DataFrame, new: pd.DataFrame) -> int:
+        """Diff multi-ensemble old -> new; agrégats mis à jour par les seules lignes nettes."""
+        parts = [f.assign(_w=w) for f, w in ((old, -1), (new, 1)) if len(f)]
+        if not parts:
+            return 0
+        both = pd.concat(parts, ignore_index=True)
+        net = both.groupby(FACT_COLS, sort=False, dropna=False)["_w"].sum()
+        net = net[net.ne(0)].reset_index()
+        if net.empty:
+            return 0
+        meas = _measures(net, net["_w"].to_numpy(dtype=np.int64))
+        for v, keys in VIEWS.items():
+            g = pd.concat([net[keys], meas], axis=1).groupby(keys, sort=False).sum()
+            g.index = pd.MultiIndex.from_frame(g.index.to_frame(index=False).assign(season=season)[["season"] + keys])
+            cur = self._views[v].add(g, fill_value=0)
+            cur = cur[cur["players"].ne(0)]
+            self._views[v] = cur.astype({m: (np.float64 if m == "points" else np.int64) for m in MEASURES})
+        return int(net["_w"].abs().sum())
+
+    def set_roster(self, season: str, roster: pd.DataFrame) -> dict:
+        base = _base_rows(roster, self._keymap)
+        new = _facts(base, self._attrs)
+        old = self._facts.get(season, pd.DataFrame(columns=FACT_COLS))
+        delta = self._apply(season, old, new)
+        self._base[season], self._facts[season] = base, new
+        self.last_delta = delta
+        return {"season": season, "rows": len(new), "delta": delta}
+
+    def drop_season(self, season: str) -> None:
+        old = self._facts.pop(season, None)
+        self._base.pop(season, None)
+        if old is not None:
+            self._apply(season, old, pd.DataFrame(columns=FACT_COLS))
+
+    def set_players_db(self, players_db: pd.DataFrame) -> dict:
+        """Nouvelle players DB: re-jointure vectorisée, agrégats corrigés par delta (joueurs changés seulement)."""
+        self._attrs = _db_attrs(players_db)
+        delta = 0
+        for season, base in self._base.items():
+            new = _facts(base, self._attrs)
+            delta += self._apply(season, self._facts[season], new)
+            self._facts[season] = new
+        self.last_delta = delta
+        return {"seasons": len(self._base), "delta": delta}
+
+    def view(self, name: str, season: Optional[str] = None) -> pd.DataFrame:
+        v = self._views[name]
+        if season is not None:
+            v = v[v.index.get_level_values("season") == season]
+        out = v.reset_index()
+        out["points"] = out["points"].round(1)
+        return out.sort_values(["season"] + VIEWS[name]).reset_index(drop=True)
+
+    def facts(self, season: str) -> pd.DataFrame:
+        return self._facts.get(season, pd.DataFrame(columns=FACT_COLS))
+
+    def cap_by_position(self, season: str) -> pd.DataFrame:
+        """Propriétaire × position (F/D/G) -> cap engagé."""
+        v = self.view("positions", season)
+        if v.empty:
+            return pd.DataFrame()
+        return v.pivot_table(index="owner", columns="pos", values="cap_hit", aggfunc="sum", fill_value=0)
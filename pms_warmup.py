@@ -0,0 +1,175 @@
+# pms_warmup.py
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import os
+import pickle
+import threading
+import time
+from typing import Callable, Optional
+
+# Préchargement au démarrage du serveur: les structures que la première session paierait
+# (players DB, map des joueurs, index de recherche, validation, vues...) sont construites
+# dans un thread de fond dès l'import de l'app. Les index dérivés sont persistés
+# (IndexStore, un pickle par index, étiqueté par la signature de la source et par
+# l'empreinte du code qui les construit): après un redémarrage ils sont relus au lieu
+# d'être recalculés; un redéploiement qui change ce code les invalide.
+INDEX_VERSION = 1
+# modules dont les objets persistés dépendent (classes picklées + fonctions de construction)
+CODE_MODULES = (
+    "pms_warmup", "pms_shared", "pms_schema", "pms_common", "pms_enrich", "pms_roster", "pms_contracts",
+    "pms_cap", "pms_lineup", "pms_snapshot", "pms_search", "pms_validate", "pms_views",
+)
+PENDING, RUNNING, READY, ERROR = "pending", "running", "ready", "error"
+
+
+def code_fingerprint(modules=CODE_MODULES) -> str:
+    """sha1 des sources des modules (sans les importer); module introuvable: son nom seul."""
+    h = hashlib.sha1()
+    for name in modules:
+        h.update(name.encode("utf-8") + b"\x00")
+        spec = importlib.util.find_spec(name)
+        if spec is not None and spec.origin and os.path.isfile(spec.origin):
+            with open(spec.origin, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+class IndexStore:
+    """
+    root/<nom>.pkl = {"version", "code", "sig", "obj"}. sig = signature de la source (file_signature);
+    "" pour un objet qui se revalide lui-même (ex.: DataValidator, vues de ligue).
+    code = empreinte du code (code_fingerprint() par défaut): un fichier d'une autre version est ignoré.
+    Fichiers locaux à DATA_DIR uniquement (pickle: ne jamais pointer root vers des données externes).
+    """
+
+    def __init__(self, root: str, *, code: Optional[str] = None):
+        self.root = root
+        self.code = code_fingerprint() if code is None else code
+        self._lock = threading.Lock()
+        self.stats = {"loaded": 0, "built": 0, "saved": 0, "errors": 0}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, f"{name}.pkl")
+
+    def load(self, name: str, sig: str = ""):
+        try:
+            with open(self._path(name), "rb") as f:
+                d = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self.stats["errors"] += 1
+            return None
+        if not isinstance(d, dict) or d.get("version") != INDEX_VERSION or d.get("code") != self.code \
+                or d.get("sig") != sig:
+            return None
+        self.stats["loaded"] += 1
+        return d.get("obj")
+
+    def save(self, name: str, obj, sig: str = "") -> None:
+        os.makedirs(self.root, exist_ok=True)
+        p = self._path(name)
+        tmp = f"{p}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump({"version": INDEX_VERSION, "code": self.code, "sig": sig, "obj": obj}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, p)
+            self.stats["saved"] += 1
+        except Exception:
+            self.stats["errors"] += 1
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def get_or_build(self, name: str, sig: str, build: Callable):
+        """(objet, "disk" | "built"). Construit et persiste si absent ou périmé."""
+        obj = self.load(name, sig)
+        if obj is not None:
+            return obj, "disk"
+        obj = build()
+        self.stats["built"] += 1
+        if sig:
+            self.save(name, obj, sig)
+        return obj, "built"
+
+    def usage(self) -> dict:
+        files = [f for f in os.listdir(self.root) if f.endswith(".pkl")] if os.path.isdir(self.root) else []
+        mb = sum(os.path.getsize(os.path.join(self.root, f)) for f in files) / 1e6
+        return {"indexes": len(files), "mb": round(mb, 2), **self.stats}
+
+    def clear(self) -> int:
+        n = 0
+        with self._lock:
+            if os.path.isdir(self.root):
+                for f in os.listdir(self.root):
+                    if f.endswith(".pkl"):
+                        os.remove(os.path.join(self.root, f))
+                        n += 1
+        return n
+
+
+class Warmup:
+    """
+    Tâches (nom, fonction) exécutées une fois, dans l'ordre, par un thread de fond.
+    Une fonction peut retourner un court détail (str) affiché dans le statut.
+    """
+
+    def __init__(self, tasks: list, *, clock=time.monotonic):
+        self.tasks = list(tasks)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._done = threading.Event()
+        self._status = {name: {"task": name, "state": PENDING, "ms": 0.0, "detail": ""} for name, _ in self.tasks}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def start(self, *, force: bool = False) -> bool:
+        """Lance le thread (une seule fois, sauf force=True une fois le précédent terminé)."""
+        with self._lock:
+            if self._thread is not None and (not force or self._thread.is_alive()):
+                return False
+            self._done.clear()
+            for s in self._status.values():
+                s.update(state=PENDING, ms=0.0, detail="")
+            self._thread = threading.Thread(target=self.run, name="pms-warmup", daemon=True)
+            self._thread.start()
+            return True
+
+    def run(self) -> None:
+        self.started_at, self.finished_at = self.clock(), None
+        try:
+            for name, fn in self.tasks:
+                st_ = self._status[name]
+                st_["state"] = RUNNING
+                t0 = self.clock()
+                try:
+                    detail = fn()
+                    st_.update(state=READY, detail=str(detail or ""))
+                except Exception as e:
+                    st_.update(state=ERROR, detail=f"{type(e).__name__}: {e}")
+                st_["ms"] = round((self.clock() - t0) * 1000.0, 1)
+        finally:
+            self.finished_at = self.clock()
+            self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def is_ready(self, name: str) -> bool:
+        return self._status.get(name, {}).get("state") == READY
+
+    def status(self) -> list:
+        return [dict(self._status[name]) for name, _ in self.tasks]
+
+    def summary(self) -> dict:
+        rows = self.status()
+        total_ms = None
+        if self.started_at is not None:
+            end = self.finished_at if self.finished_at is not None else self.clock()
+            total_ms = round((end - self.started_at) * 1000.0, 1)
+        return {
+            "ready": sum(r["state"] == READY for r in rows), "errors": sum(r["state"] == ERROR for r in rows),
+            "total": len(rows), "done": self._done.is_set(), "ms": total_ms,
+        }
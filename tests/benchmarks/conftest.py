@@ -0,0 +1,119 @@
+# tests/benchmarks/conftest.py
+"""
+Benchmarks des chemins chauds à l'échelle d'une ligue (pytest-benchmark).
+
+    pip install pytest-benchmark
+    python -m pytest tests/benchmarks                      # 10k lignes, résultats sauvés dans .benchmarks/
+    PMS_BENCH_FULL=1 python -m pytest tests/benchmarks     # + 100k lignes
+    python -m pytest tests/benchmarks --benchmark-compare --benchmark-compare-fail=mean:25%
+
+Chaque run est sauvegardé (autosave) avec le commit courant: --benchmark-compare
+compare au dernier run enregistré.
+"""
+import os
+import random
+
+import pandas as pd
+import pytest
+
+from pms_roster import ROSTER_COLS
+from pms_tx import TX_COLS
+
+pytest.importorskip("pytest_benchmark")
+
+SIZES = [10_000, 100_000]
+TEAMS = ["ANA", "BOS", "BUF", "CAR", "CBJ", "CGY", "CHI", "COL", "DAL", "DET", "EDM", "FLA", "LAK", "MIN", "MTL",
+         "NJD", "NSH", "NYI", "NYR", "OTT", "PHI", "PIT", "SEA", "SJS", "STL", "TBL", "TOR", "UTA", "VAN", "VGK", "WPG", "WSH"]
+COUNTRIES = [("CAN", "CA"), ("USA", "US"), ("SWE", "SE"), ("FIN", "FI"), ("RUS", "RU"), ("CZE", "CZ"), ("CHE", "CH")]
+FIRST = ["Connor", "Jason", "Mats", "Artyom", "Mitch", "Daniel", "Alex", "Sidney", "Nathan", "Cale", "Quinn", "Jack"]
+LAST = ["McDavid", "Zucker", "Zuccarello", "Zub", "Marner", "Vladar", "Ovechkin", "Crosby", "MacKinnon", "Makar"]
+SLOTS = ["Actif"] * 6 + ["Banc", "IR", "Mineur", "AHL", "Blessé", ""]
+
+
+def pytest_configure(config):
+    if hasattr(config.option, "benchmark_autosave"):
+        config.option.benchmark_autosave = True
+
+
+def sizes():
+    full = os.environ.get("PMS_BENCH_FULL", "").strip() in ("1", "true", "yes")
+    return [pytest.param(n, marks=() if (n <= 10_000 or full) else pytest.mark.skip(reason="PMS_BENCH_FULL=1")) for n in SIZES]
+
+
+def _first_last(i: int) -> str:
+    return f"{FIRST[i % len(FIRST)]} {LAST[(i // len(FIRST)) % len(LAST)]}{i}"
+
+
+def _name(i: int) -> str:
+    """Graphie players DB: une ligne sur cinq en "Last, First"."""
+    first, last = _first_last(i).split(" ", 1)
+    return f"{last}, {first}" if i % 5 == 0 else f"{first} {last}"
+
+
+def make_players_db(n: int, *, filled: float = 0.2, seed: int = 7) -> pd.DataFrame:
+    """Même forme que hockey.players.csv (70 colonnes), ~filled des lignes avec contrat/pays."""
+    rnd = random.Random(seed)
+    header = pd.read_csv(os.path.join(os.path.dirname(__file__), "..", "..", "data", "hockey.players.csv"), nrows=0).columns
+    rows = []
+    for i in range(n):
+        has = rnd.random() < filled
+        c3, c2 = COUNTRIES[i % len(COUNTRIES)]
+        rows.append({
+            "Player": _name(i), "Team": TEAMS[i % len(TEAMS)], "Position": "FDG"[i % 3], "Jersey#": i % 99,
+            "W(lbs)": 170 + i % 60, "Age": 19 + i % 20, "Country": c3 if has else None,
+            "Flag": f"https://flagcdn.com/w40/{c2.lower()}.png" if has else None, "FlagISO2": c2 if has else None,
+            "Draft Year": 2005 + i % 20, "Status": f"Yr {1 + i % 3} of 3", "UFA Year": 2026 + i % 8,
+            "Cap Hit": f"{775_000 + (i % 400) * 25_000:,} $".replace(",", " ") if has else None,
+            "NHL GP": i % 900, "NHL G": i % 300, "NHL A": i % 400, "NHL P": i % 700,
+            "Length": 1 + i % 8, "Level": ("ELC" if i % 4 == 0 else "STD") if has else None,
+            "Start Year": "2024-25" if has else None, "Expiry Year": f"{2025 + i % 6}-{26 + i % 6}" if has else None,
+            "_source": "Hockey_Players",
+        })
+    df = pd.DataFrame(rows)
+    for c in header:
+        if c not in df.columns:
+            df[c] = None
+    return df[list(header)]
+
+
+def make_roster(n: int, *, owners: int = 12) -> pd.DataFrame:
+    return pd.DataFrame({
+        ROSTER_COLS["owner"]: [f"Owner {i % owners}" for i in range(n)],
+        ROSTER_COLS["player"]: [_first_last(i) for i in range(n)],
+        ROSTER_COLS["pos"]: ["FDG"[i % 3] for i in range(n)],
+        ROSTER_COLS["team"]: [TEAMS[i % len(TEAMS)] for i in range(n)],
+        ROSTER_COLS["salary"]: [775_000 + (i % 400) * 25_000 for i in range(n)],
+        ROSTER_COLS["level"]: ["" for _ in range(n)],
+        ROSTER_COLS["status"]: ["" for _ in range(n)],
+        ROSTER_COLS["slot"]: [SLOTS[i % len(SLOTS)] for i in range(n)],
+        ROSTER_COLS["ir_date"]: ["" for _ in range(n)],
+    })
+
+
+def make_transactions(n: int) -> pd.DataFrame:
+    return pd.DataFrame([
+        {"trade_id": f"TR-20250101-{i:06X}", "timestamp": f"2025-01-{1 + i % 28:02d} 12:00:00", "season": "2025-2026",
+         "owner_a": f"Owner {i % 12}", "owner_b": f"Owner {(i + 5) % 12}", "a_players": _name(i), "b_players": _name(i + 1),
+         "a_picks": "2026-1", "b_picks": "", "a_cash": "", "b_cash": "", "status": "PROPOSED", "notes": ""}
+        for i in range(n)
+    ], columns=TX_COLS)
+
+
+@pytest.fixture(scope="session")
+def bench_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("bench")
+
+
+@pytest.fixture(scope="session")
+def players_csv(bench_dir):
+    """n -> chemin d'un hockey.players.csv synthétique (généré une fois par taille)."""
+    made = {}
+
+    def _get(n: int) -> str:
+        if n not in made:
+            p = bench_dir / f"hockey.players.{n}.csv"
+            make_players_db(n).to_csv(p, index=False)
+            made[n] = str(p)
+        return made[n]
+
+    return _get
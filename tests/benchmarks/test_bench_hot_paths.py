@@ -0,0 +1,203 @@
+# tests/benchmarks/test_bench_hot_paths.py
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import pms_nhl
+from conftest import make_players_db, make_roster, make_transactions, sizes
+from pms_backup import zip_backup
+from pms_cap import build_cap_ledger
+from pms_country import update_players_db
+from pms_dedup import dedup_frame
+from pms_enrich import enrich_level_from_players_db
+from pms_lineup import optimize_lineups
+from pms_progress import ProgressReporter
+from pms_roster import ROSTER_COLS, slot_buckets
+from pms_schema import players_db_map, read_players_db
+from pms_search import PlayerIndex
+from pms_snapshot import KIND_PLAYERS, diff_frames
+from pms_store import Store
+from pms_tx import tx_append
+from pms_validate import DataValidator
+from pms_views import LeagueViews
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_load_players_db_map(benchmark, players_csv, n):
+    path = players_csv(n)
+    m = benchmark(lambda: players_db_map(read_players_db(path)))
+    assert len(m) == n
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_enrich_level(benchmark, players_csv, n):
+    db = pd.read_csv(players_csv(n), low_memory=False)
+    roster = make_roster(n // 10)
+    out = benchmark(enrich_level_from_players_db, roster, db)
+    assert out["Level"].isin(["STD", "ELC", ""]).all()
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_update_players_db_candidates(benchmark, players_csv, bench_dir, nhl_stub, monkeypatch, n):
+    """Résolution locale + sélection des candidats; 20 appels réseau vers le stub LNH."""
+    monkeypatch.setattr(pms_nhl, "NHL_SEARCH_URL", f"{nhl_stub.base_url}/api/v1/search/player")
+    monkeypatch.setattr(pms_nhl, "NHL_WEB_BASE", f"{nhl_stub.base_url}/v1")
+    src = players_csv(n)
+    work = bench_dir / f"update.{n}"
+    work.mkdir(exist_ok=True)
+    path = str(work / "hockey.players.csv")
+
+    def _setup():
+        shutil.copyfile(src, path)
+        for f in os.listdir(work):
+            if f.endswith(".json"):
+                os.remove(work / f)
+
+    res = benchmark.pedantic(
+        lambda: update_players_db(path, max_calls=20, save_every=0, resume_only=False),
+        setup=_setup, rounds=3, iterations=1,
+    )
+    assert res["ok"] and res["processed"] == 20
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_slot_buckets(benchmark, n):
+    roster = make_roster(n)
+    out = benchmark(slot_buckets, roster[ROSTER_COLS["slot"]], roster[ROSTER_COLS["status"]])
+    assert set(out.unique()) <= {"ACTIFS", "BANC", "IR", "MINEUR"}
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_tx_append(benchmark, bench_dir, n):
+    path = str(bench_dir / f"transactions.{n}.csv")
+    make_transactions(n).to_csv(path, index=False)
+    row = make_transactions(1).iloc[0].to_dict()
+    benchmark(tx_append, path, row)
+    assert sum(1 for _ in open(path, encoding="utf-8")) > n
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_zip_backup(benchmark, players_csv, bench_dir, n):
+    data_dir = str(bench_dir)
+    roster = bench_dir / f"equipes_joueurs.{n}.csv"
+    tx = bench_dir / f"transactions_zip.{n}.csv"
+    make_roster(n).to_csv(roster, index=False)
+    make_transactions(n).to_csv(tx, index=False)
+    dest = bench_dir / f"backups.{n}"
+    dest.mkdir(exist_ok=True)
+    out = benchmark.pedantic(
+        zip_backup, args=(str(dest), [players_csv(n), str(roster), str(tx)], data_dir), rounds=3, iterations=1,
+    )
+    assert os.path.exists(out)
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_roster_owner_csv(benchmark, bench_dir, n):
+    path = bench_dir / f"equipes_joueurs.{n}.csv"
+    make_roster(n).to_csv(path, index=False)
+    col = ROSTER_COLS["owner"]
+    view = benchmark(lambda: (lambda df: df[df[col].astype(str).eq("Owner 3")])(pd.read_csv(path)))
+    assert len(view) == n // 12 + (1 if n % 12 > 3 else 0)
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_roster_owner_store(benchmark, bench_dir, n):
+    path = bench_dir / f"equipes_joueurs.store.{n}.csv"
+    make_roster(n).to_csv(path, index=False)
+    store = Store(str(bench_dir / f"pms.{n}.sqlite"))
+    store.import_roster_csv(str(path), "2025-2026")
+    view = benchmark(store.roster, "2025-2026", "Owner 3")
+    assert len(view) == n // 12 + (1 if n % 12 > 3 else 0)
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_progress_reporter(benchmark, n):
+    seen = []
+
+    def _run():
+        seen.clear()
+        rep = ProgressReporter(seen.append, min_interval=0.25)
+        for i in range(n):
+            rep({"phase": "country", "done": i + 1, "total": n, "counters": {"processed": i + 1}})
+        rep.close()
+
+    benchmark(_run)
+    assert seen[-1]["final"] and len(seen) < n
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_league_views_roster_delta(benchmark, n):
+    # un échange de 5 joueurs sur un roster de n lignes, 3 saisons d'historique
+    views = LeagueViews(make_players_db(n))
+    roster = make_roster(n)
+    for s in ("2023-2024", "2024-2025", "2025-2026"):
+        views.set_roster(s, roster)
+    moved = roster.copy()
+    moved.iloc[:5, moved.columns.get_loc(ROSTER_COLS["owner"])] = "Owner 1"
+    rosters = [moved, roster]
+
+    def _swap():
+        rosters.reverse()
+        return views.set_roster("2025-2026", rosters[0])
+
+    res = benchmark(_swap)
+    assert res["delta"] <= 10
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_validate_dir_cold(benchmark, players_csv, bench_dir, n):
+    d = bench_dir / f"validate.{n}"
+    d.mkdir(exist_ok=True)
+    shutil.copy(players_csv(n), d / "hockey.players.csv")
+    make_roster(n).to_csv(d / "equipes_joueurs_2025-2026.csv", index=False)
+    rep = benchmark(lambda: DataValidator(str(d)).report())
+    assert set(rep["file"]) <= {"hockey.players.csv", "equipes_joueurs_2025-2026.csv"}
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_dedup_players_db(benchmark, n):
+    # n lignes + 5% de doublons d'une autre source (sans équipe), noms "Last, First" mélangés
+    db = make_players_db(n)
+    dup = db.sample(n // 20, random_state=3).assign(_source="PuckPedia", Team=None)
+    both = pd.concat([db, dup], ignore_index=True)
+    out, report, _ = benchmark(lambda: dedup_frame(both))
+    assert len(out) == n and len(report) == n // 20
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_player_search_keystrokes(benchmark, n):
+    # une saisie complète, frappe par frappe (cible: < 5 ms par frappe)
+    idx = PlayerIndex(make_players_db(n))
+    keys = ["m", "mc", "mcd", "mcda", "mcdav", "mcdavid", "connor mc"]
+    res = benchmark(lambda: [idx.search(q) for q in keys])
+    assert all(len(r) for r in res)
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_cap_ledger_summary(benchmark, n):
+    # registre complet + résumé 6 saisons (cible: < 1 s à 10k lignes)
+    db, roster = make_players_db(n), make_roster(n)
+    sm = benchmark(lambda: build_cap_ledger(roster, db, "2025-2026", seasons=6).owner_summary())
+    assert sm["owner"].nunique() == 12
+
+
+def test_bench_optimize_lineups(benchmark):
+    # 12 propriétaires × 40 joueurs sous plafond (cible: ~20-40 ms par propriétaire)
+    db = make_players_db(480, filled=1.0)
+    roster = make_roster(480)
+    roster[ROSTER_COLS["player"]] = db["Player"]
+    opt = benchmark(lambda: optimize_lineups(roster, db, cap=60_000_000))
+    assert opt["suggested"].ne("").any()
+
+
+@pytest.mark.parametrize("n", sizes())
+def test_bench_snapshot_diff_wide(benchmark, n):
+    # players DB complète (70 colonnes), 1% des lignes modifiées, ordre inversé (cible: < 1 s à 10k)
+    old = make_players_db(n).astype(str)
+    new = old.copy()
+    new.loc[::100, "Team"] = "XXX"
+    new = new.iloc[::-1]
+    d = benchmark(lambda: diff_frames(old, new, KIND_PLAYERS))
+    assert d["added"].empty and len(d["cells"]) == len(old.index[::100])
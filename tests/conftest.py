@@ -0,0 +1,79 @@
+# tests/conftest.py
+import hashlib
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """
+    Rejoue des réponses enregistrées: "/skater/summary" -> "<dir>/skater_summary.json".
+    Repli générique sur les ids: "/v1/player/8478402/landing" -> "v1_player_{id}_landing.json".
+    Les réponses {"data": [...]} sont paginées selon start/limit comme l'API stats LNH.
+    ETag = hash du corps; If-None-Match identique -> 304 (compté dans not_modified).
+    """
+
+    fixtures_dir = ""
+    hits: list = []
+    not_modified: list = []
+
+    def do_GET(self):
+        u = urlparse(self.path)
+        q = {k: v[-1] for k, v in parse_qs(u.query).items()}
+        self.hits.append((u.path, q))
+        fp = os.path.join(self.fixtures_dir, u.path.strip("/").replace("/", "_") + ".json")
+        if not os.path.exists(fp):
+            generic = re.sub(r"/\d+(?=/|$)", "/{id}", u.path)
+            fp = os.path.join(self.fixtures_dir, generic.strip("/").replace("/", "_") + ".json")
+        if not os.path.exists(fp):
+            self.send_response(404)
+            self.end_headers()
+            return
+        with open(fp, "r", encoding="utf-8") as f:
+            body = json.load(f)
+        if isinstance(body, dict) and isinstance(body.get("data"), list) and "limit" in q:
+            start = int(q.get("start") or 0)
+            limit = int(q["limit"])
+            rows = body["data"]
+            body = dict(body, data=rows[start:] if limit < 0 else rows[start:start + limit], total=len(rows))
+        raw = json.dumps(body).encode("utf-8")
+        etag = '"%s"' % hashlib.sha1(raw).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self.not_modified.append(u.path)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def nhl_stub():
+    """Serveur HTTP local sur les fixtures enregistrées (tests/fixtures/nhl)."""
+    handler = type("Handler", (_StubHandler,), {"fixtures_dir": os.path.join(FIXTURES_DIR, "nhl"), "hits": [], "not_modified": []})
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    th = threading.Thread(target=srv.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    th.start()
+    try:
+        srv.base_url = f"http://127.0.0.1:{srv.server_address[1]}"
+        srv.hits = handler.hits
+        srv.not_modified = handler.not_modified
+        yield srv
+    finally:
+        srv.shutdown()
+        srv.server_close()
@@ -0,0 +1,73 @@
+import os
+import shutil
+
+import pytest
+
+import pms_assets
+from pms_assets import cache_stats, fetch_flags, find_logos, flag_file, team_logo, thumbnail
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _png(path, size=(600, 400), color=(200, 30, 30, 255)):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new("RGBA", size, color).save(path)
+    return str(path)
+
+
+def test_thumbnail_is_small_and_shared_by_identical_content(tmp_path):
+    a = _png(tmp_path / "data" / "Whalers_Logo.png")
+    b = str(tmp_path / "previews" / "Whalers_Logo.png")
+    os.makedirs(os.path.dirname(b))
+    shutil.copy(a, b)
+    cache = str(tmp_path / "cache")
+
+    ta = thumbnail(a, cache, 64)
+    tb = thumbnail(b, cache, 64)
+    assert ta == tb and os.path.exists(ta)
+    with Image.open(ta) as im:
+        assert max(im.size) == 64 and im.size == (64, 43)
+    assert os.path.getsize(ta) < os.path.getsize(a)
+    assert thumbnail(str(tmp_path / "missing.png"), cache) == ""
+    assert cache_stats(cache)["thumbs"]["files"] == 1
+
+
+def test_find_logos_matches_owner_names(tmp_path):
+    d1, d2 = tmp_path / "data", tmp_path / "previews"
+    _png(d1 / "Red_Wings_Logo.png", (10, 10))
+    _png(d1 / "Predateurs_logo.png", (10, 10))
+    _png(d2 / "Red_Wings_Logo.png", (10, 10))
+    _png(d2 / "Cracheurs_Logo.png", (10, 10))
+    logos = find_logos([str(d1), str(d2)])
+    assert team_logo("Red Wings", logos) == str(d1 / "Red_Wings_Logo.png")
+    assert team_logo("Prédateurs", logos) == str(d1 / "Predateurs_logo.png")
+    assert team_logo("cracheurs", logos) == str(d2 / "Cracheurs_Logo.png")
+    assert team_logo("Canadiens", logos) is None
+
+
+def test_fetch_flags_downloads_once(tmp_path, monkeypatch):
+    calls = []
+
+    class _Resp:
+        content = b"\x89PNG fake"
+
+        def raise_for_status(self):
+            pass
+
+    def _get(url, timeout=None):
+        calls.append(url)
+        if url.endswith("/zz.png"):
+            raise OSError("404")
+        return _Resp()
+
+    monkeypatch.setattr(pms_assets.requests, "get", _get)
+    cache = str(tmp_path / "cache")
+    assert flag_file("CA", cache) == ""
+
+    r = fetch_flags(["CA", "ca", "SE", "ZZ", "", "CAN"], cache)
+    assert r == {"fetched": 2, "cached": 0, "failed": ["ZZ"]}
+    assert flag_file("ca", cache).endswith(os.path.join("flags", "ca.png"))
+
+    r = fetch_flags(["CA", "SE"], cache)
+    assert r["fetched"] == 0 and r["cached"] == 2
+    assert len(calls) == 3
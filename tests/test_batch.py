@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+
+from pms_batch import OUTPUTS, discover_seasons, roster_summary, run_batch
+
+
+def _setup(d):
+    pd.DataFrame({
+        "Player": ["Connor McDavid", "Lane Hutson", "Mitch Marner"],
+        "Position": ["C", "D", "RW"],
+        "Cap Hit": ["12 500 000 $", "950 000 $", "10 903 000 $"],
+        "Level": ["STD", "ELC", "STD"],
+        "Expiry Year": ["2025-26", "2026-27", "2024-25"],
+    }).to_csv(d / "hockey.players.csv", index=False)
+    for season, rows in {
+        "2024-2025": [("Nordiques", "Connor McDavid", "C", "", "Actif"), ("Whalers", "Mitch Marner", "RW", "", "Banc")],
+        "2025-2026": [("Nordiques", "Connor McDavid", "C", "", "Actif"), ("Nordiques", "Lane Hutson", "D", "", "IR"),
+                      ("Whalers", "Inconnu Total", "F", "1 000 000 $", "Actif")],
+    }.items():
+        pd.DataFrame(rows, columns=["Propriétaire", "Joueur", "Pos", "Salaire", "Slot"]).to_csv(d / f"equipes_joueurs_{season}.csv", index=False)
+    pd.DataFrame([{"trade_id": "t1", "season": "2025-2026", "owner_a": "Nordiques", "owner_b": "Whalers", "status": "done"}]) \
+        .to_csv(d / "transactions_2025-2026.csv", index=False)
+
+
+def test_discover_and_summary(tmp_path):
+    _setup(tmp_path)
+    found = discover_seasons(str(tmp_path))
+    assert sorted(found) == ["2024-2025", "2025-2026"]
+    assert found["2024-2025"]["transactions"] == "" and found["2025-2026"]["transactions"].endswith("transactions_2025-2026.csv")
+    r = pd.read_csv(tmp_path / "equipes_joueurs_2025-2026.csv")
+    s = roster_summary(r, pd.read_csv(tmp_path / "transactions_2025-2026.csv")).set_index("owner")
+    assert s.loc["Nordiques", "players"] == 2 and s.loc["Nordiques", "ir"] == 1
+    assert s.loc["Whalers", "salary"] == 1_000_000 and s.loc["Whalers", "transactions"] == 1
+
+
+def test_run_batch_writes_outputs_and_skips_unchanged(tmp_path):
+    _setup(tmp_path)
+    res = run_batch(str(tmp_path), workers=1)
+    assert list(res["status"]) == ["ok", "ok"]
+    out = tmp_path / "batch" / "2025-2026"
+    assert all((out / f).exists() for f in OUTPUTS) and (out / "manifest.json").exists()
+    enriched = pd.read_csv(out / "roster_enriched.csv").set_index("Joueur")
+    assert enriched.loc["Lane Hutson", "Level"] == "ELC"
+    val = pd.read_csv(out / "validation.csv")
+    assert "unmatched_player" in set(val["rule"])
+    assert not any(f.endswith(".tmp") for f in os.listdir(out))
+
+    assert list(run_batch(str(tmp_path), workers=1)["status"]) == ["skipped", "skipped"]
+    pd.read_csv(tmp_path / "equipes_joueurs_2024-2025.csv").iloc[:1].to_csv(tmp_path / "equipes_joueurs_2024-2025.csv", index=False)
+    res = run_batch(str(tmp_path), workers=1).set_index("season")
+    assert res.loc["2024-2025", "status"] == "ok" and res.loc["2025-2026", "status"] == "skipped"
+
+
+def test_run_batch_process_pool(tmp_path):
+    _setup(tmp_path)
+    events = []
+    res = run_batch(str(tmp_path), workers=2, force=True, progress_cb=events.append)
+    assert list(res["status"]) == ["ok", "ok"] and res["players"].tolist() == [2, 3]
+    assert events[-1]["done"] == 2 and events[-1]["counters"]["ok"] == 2
+
+
+def test_run_batch_blank_player_in_db(tmp_path):
+    pd.DataFrame({"Player": ["Connor McDavid", None], "Position": ["C", "D"]}).to_csv(tmp_path / "hockey.players.csv", index=False)
+    pd.DataFrame([("Nordiques", "Connor McDavid", "C", "", "Actif")], columns=["Propriétaire", "Joueur", "Pos", "Salaire", "Slot"]) \
+        .to_csv(tmp_path / "equipes_joueurs_2025-2026.csv", index=False)
+    res = run_batch(str(tmp_path), workers=1)
+    assert list(res["status"]) == ["ok"], res["message"].tolist()
@@ -0,0 +1,131 @@
+# tests/test_cap.py
+import pandas as pd
+
+from pms_cap import build_cap_ledger, season_labels, split_names
+from pms_roster import ROSTER_COLS
+
+
+def _db():
+    return pd.DataFrame(
+        [
+            {"Player": "Zub, Artyom", "Cap Hit": "4 600 000 $", "Expiry Year": "2028-29", "Level": "STD", "Expiry Status": "UFA"},
+            {"Player": "Mats Zuccarello", "Cap Hit": "4 125 000 $", "Expiry Year": "2025-26"},
+            {"Player": "Jason Zucker", "Cap Hit": "4 000 000 $", "Expiry Year": "2026-27", "Level": "STD", "Expiry Status": "UFA"},
+            {"Player": "Connor McDavid", "Cap Hit": "12 500 000 $", "Expiry Year": "2027-28"},
+            {"Player": "Koehn Ziemmer", "Cap Hit": "816 666 $", "Expiry Year": "2026-27", "Level": "ELC", "Expiry Status": "RFA"},
+        ]
+    )
+
+
+def _roster():
+    o, p, s = ROSTER_COLS["owner"], ROSTER_COLS["player"], ROSTER_COLS["salary"]
+    return pd.DataFrame(
+        [
+            {o: "Whalers", p: "Artyom Zub", s: 0},
+            {o: "Whalers", p: "Mats Zuccarello", s: 0},
+            {o: "Nordiques", p: "Jason Zucker", s: 0},
+            {o: "Nordiques", p: "Free Agent Guy", s: 900_000},
+        ]
+    )
+
+
+def test_labels_and_split():
+    assert season_labels("2025-2026", 3) == ["2025-2026", "2026-2027", "2027-2028"]
+    assert split_names("Artyom Zub, Mats Zuccarello;\nJason Zucker") == ["Artyom Zub", "Mats Zuccarello", "Jason Zucker"]
+
+
+def test_ledger_totals_follow_expiry():
+    led = build_cap_ledger(_roster(), _db(), "2025-2026", seasons=3)
+    t = led.totals
+    assert t.loc["Whalers"].tolist() == [8_725_000, 4_600_000, 4_600_000]
+    # salaire du roster, sans expiry: saison courante seulement
+    assert t.loc["Nordiques"].tolist() == [4_900_000, 4_000_000, 0]
+
+
+def test_evaluate_before_after_and_cap_flag():
+    led = build_cap_ledger(_roster(), _db(), "2025-2026", seasons=3)
+    res = led.evaluate("whalers", "Nordiques", "Artyom Zub", ["Jason Zucker", "Nobody"], cap={2026: 9_000_000, 2027: 8_000_000})
+    t = res["table"].set_index(["owner", "season"])
+    assert t.loc[("Whalers", "2026-2027"), "after"] == 4_000_000
+    assert t.loc[("Nordiques", "2025-2026"), "after"] == 5_500_000
+    assert t.loc[("Nordiques", "2027-2028"), "delta"] == 4_600_000
+    assert t.loc[("Whalers", "2025-2026"), "space_after"] == 9_000_000 - 8_125_000
+    assert pd.isna(t.loc[("Whalers", "2027-2028"), "cap"])
+    assert not res["ok"] and res["unresolved"]["Nordiques"] == ["Nobody"]
+
+    # joueur connu mais pas au roster du cédant: signalé, hors delta
+    res = led.evaluate("Whalers", "Nordiques", "", ["Connor McDavid", "Artyom Zub"], cap={2026: 9_000_000})
+    assert not res["ok"] and res["not_owned"]["Nordiques"] == ["Connor McDavid", "Artyom Zub"]
+    assert res["unresolved"]["Nordiques"] == [] and res["moved"]["Nordiques"] == []
+    assert res["table"]["delta"].eq(0).all() and not res["over_cap"]
+
+
+def test_apply_updates_totals_incrementally():
+    roster, db = _roster(), _db()
+    led = build_cap_ledger(roster, db, "2025-2026", seasons=3)
+    led.apply("Whalers", "Nordiques", "Artyom Zub", "Jason Zucker")
+    o = ROSTER_COLS["owner"]
+    roster.loc[0, o], roster.loc[2, o] = "Nordiques", "Whalers"
+    fresh = build_cap_ledger(roster, db, "2025-2026", seasons=3)
+    pd.testing.assert_frame_equal(led.totals.sort_index(), fresh.totals.sort_index())
+
+
+def test_projection_flags_and_summary():
+    led = build_cap_ledger(_roster(), _db(), "2025-2026", seasons=3)
+    p = led.projection("nordiques").set_index("player")
+    assert p.loc["Jason Zucker", "flag"] == "UFA" and p.loc["Jason Zucker", "expiry"] == "2026-2027"
+    assert p.loc["Jason Zucker", ["2025-2026", "2026-2027", "2027-2028"]].tolist() == [4_000_000, 4_000_000, 0]
+    # Zub expire en 2028-29: hors fenêtre de 3 saisons
+    assert led.projection("Whalers").set_index("player").loc["Artyom Zub", "flag"] == ""
+
+    o, pl = ROSTER_COLS["owner"], ROSTER_COLS["player"]
+    roster = pd.concat([_roster(), pd.DataFrame([{o: "Nordiques", pl: "Koehn Ziemmer"}])], ignore_index=True)
+    led = build_cap_ledger(roster, _db(), "2025-2026", seasons=3)
+    sm = led.owner_summary(cap={2027: 10_000_000}).set_index(["owner", "season"])
+    row = sm.loc[("Nordiques", "2026-2027")]
+    assert (row["committed"], row["players"], row["expiring_elc"], row["expiring_ufa"]) == (4_816_666, 2, 1, 1)
+    assert row["space"] == 10_000_000 - 4_816_666
+    assert pd.isna(sm.loc[("Nordiques", "2027-2028"), "cap"])
+
+
+def test_update_roster_is_incremental_and_exact():
+    o, pl = ROSTER_COLS["owner"], ROSTER_COLS["player"]
+    led = build_cap_ledger(_roster(), _db(), "2025-2026", seasons=3)
+    roster = _roster().iloc[1:]  # Zub retiré
+    roster = pd.concat([roster, pd.DataFrame([{o: "Whalers", pl: "Connor McDavid"}])], ignore_index=True)
+    assert led.update_roster(roster) == {"removed": 1, "added": 1}
+    fresh = build_cap_ledger(roster, _db(), "2025-2026", seasons=3)
+    pd.testing.assert_frame_equal(led.totals.sort_index(), fresh.totals.sort_index())
+
+
+def test_update_roster_sees_salary_changes_and_duplicates():
+    sal = ROSTER_COLS["salary"]
+    led = build_cap_ledger(_roster(), _db(), "2025-2026", seasons=3)
+    roster = _roster()
+    roster.loc[3, sal] = 1_200_000  # Free Agent Guy: salaire du roster modifié
+    assert led.update_roster(roster) == {"removed": 1, "added": 1}
+    assert led.totals.loc["Nordiques"].tolist() == [5_200_000, 4_000_000, 0]
+    # même joueur listé deux fois: compté deux fois, retiré une fois
+    roster = pd.concat([roster, roster.iloc[[3]]], ignore_index=True)
+    assert led.update_roster(roster) == {"removed": 0, "added": 1}
+    assert led.update_roster(roster.iloc[:-1]) == {"removed": 1, "added": 0}
+    fresh = build_cap_ledger(roster.iloc[:-1], _db(), "2025-2026", seasons=3)
+    pd.testing.assert_frame_equal(led.totals.sort_index(), fresh.totals.sort_index())
+
+
+def test_league_projection_totals_match_summary():
+    # temps de construction + résumé: tests/benchmarks (test_bench_cap_ledger_summary)
+    n = 10_000
+    o, pl = ROSTER_COLS["owner"], ROSTER_COLS["player"]
+    db = pd.DataFrame({
+        "Player": [f"P{i}" for i in range(n)],
+        "Cap Hit": [f"{800_000 + i * 100} $" for i in range(n)],
+        "Expiry Year": [f"{2025 + i % 8}-{26 + i % 8}" for i in range(n)],
+        "Level": ["ELC" if i % 4 == 0 else "STD" for i in range(n)],
+        "Expiry Status": ["RFA" if i % 3 == 0 else "UFA" for i in range(n)],
+    })
+    roster = pd.DataFrame({o: [f"Owner {i % 12}" for i in range(n)], pl: db["Player"]})
+    led = build_cap_ledger(roster, db, "2025-2026", seasons=6)
+    sm = led.owner_summary()
+    assert len(sm) == 12 * 6
+    assert sm["committed"].sum() == led.totals.to_numpy().sum()
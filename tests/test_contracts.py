@@ -0,0 +1,105 @@
+# tests/test_contracts.py
+import pandas as pd
+
+from pms_contracts import (
+    apply_contracts,
+    build_contracts_join,
+    contracts_map,
+    enrich_roster_from_contracts,
+    join_contracts,
+    load_puckpedia_contracts,
+    season_short,
+)
+
+CSV = """first_name,last_name,position,birthdate,city,team_name,short_code,active,shoots,contract_type,contract_end,contract_level
+Connor,McDavid,Center,1/13/97,Edmonton,Oilers,EDM,1,left,current,2025-2026,standard_level
+John,Smith,Defense,5/1/03,Nashville,Predators,NAS,0,left,current,2026-2027,entry_level
+John,Smith,Defense,7/2/99,Chicago,Blackhawks,CHI,1,right,current,2027-2028,standard_level
+Alex,Twin,Center,1/1/00,Boston,Bruins,BOS,1,left,current,2025-2026,standard_level
+Alex,Twin,Center,1/1/00,Boston,Bruins,BOS,1,left,current,2026-2027,entry_level
+"""
+
+
+def _contracts(tmp_path):
+    p = tmp_path / "puckpedia.contracts.csv"
+    p.write_text(CSV, encoding="utf-8")
+    return p
+
+
+def _db():
+    return pd.DataFrame(
+        [
+            {"Player": "McDavid, Connor", "Team": "EDM", "Age": 28, "Level": "", "Expiry Year": ""},
+            {"Player": "John Smith", "Team": "NSH", "Age": 22, "Level": "", "Expiry Year": ""},
+            {"Player": "Alex Twin", "Team": "BOS", "Age": 25, "Level": "", "Expiry Year": ""},
+            {"Player": "Nobody Here", "Team": "BUF", "Age": 30, "Level": "", "Expiry Year": ""},
+        ]
+    )
+
+
+def test_season_short():
+    assert season_short("2025-2026") == "2025-26"
+    assert season_short("2025-26") == "2025-26"
+    assert season_short(2026) == "2025-26"
+    assert season_short("") == ""
+
+
+def test_load_normalizes_file(tmp_path):
+    c = load_puckpedia_contracts(str(_contracts(tmp_path)))
+    first = c.iloc[0]
+    assert (first["_k"], first["team"], first["Level"], first["Expiry Year"]) == ("connor mcdavid", "EDM", "STD", "2025-26")
+    assert first["birthdate"] == pd.Timestamp("1997-01-13")
+    assert c.iloc[1]["team"] == "NSH"  # NAS -> NSH
+    assert c.iloc[1]["Level"] == "ELC"
+
+
+def test_join_disambiguates_by_team_and_reports_ties(tmp_path):
+    c = load_puckpedia_contracts(str(_contracts(tmp_path)))
+    joined, ambiguous = join_contracts(_db(), c, ref_year=2025)
+    j = joined.set_index("_row")
+    assert j.loc[0, "Level"] == "STD"
+    assert j.loc[0, "match"] == "name+team"
+    assert (j.loc[1, "Level"], j.loc[1, "Expiry Year"]) == ("ELC", "2026-27")
+    assert 2 not in j.index
+    assert ambiguous["Player"].tolist() == ["Alex Twin"]
+
+
+def test_exact_dob_mismatch_rejects_pair(tmp_path):
+    c = load_puckpedia_contracts(str(_contracts(tmp_path)))
+    db = _db().head(1).assign(sr_dob="1990-01-01")
+    joined, _ = join_contracts(db, c)
+    assert joined.empty
+
+
+def test_apply_keeps_valid_values(tmp_path):
+    c = load_puckpedia_contracts(str(_contracts(tmp_path)))
+    db = _db()
+    db.loc[0, "Level"] = "ELC"
+    joined, _ = join_contracts(db, c, ref_year=2025)
+    out = apply_contracts(db, joined)
+    assert out.loc[0, "Level"] == "ELC"
+    assert out.loc[0, "Expiry Year"] == "2025-26"
+    assert out.loc[1, "Level"] == "ELC"
+
+
+def test_join_is_cached_until_inputs_change(tmp_path):
+    cp = _contracts(tmp_path)
+    pp = tmp_path / "hockey.players.csv"
+    _db().to_csv(pp, index=False)
+    cache = str(tmp_path / "contracts_join_cache.csv")
+
+    r1 = build_contracts_join(str(pp), str(cp), cache)
+    r2 = build_contracts_join(str(pp), str(cp), cache)
+    assert (r1["cached"], r2["cached"]) == (False, True)
+    assert contracts_map(r2["joined"]) == contracts_map(r1["joined"])
+
+    _db().head(2).to_csv(pp, index=False)
+    assert build_contracts_join(str(pp), str(cp), cache)["cached"] is False
+
+
+def test_enrich_roster_from_map():
+    cmap = {"connor mcdavid": {"level": "STD", "expiry": "2025-26"}}
+    df = pd.DataFrame([{"Joueur": "Connor McDavid"}, {"Joueur": "Unknown"}])
+    out = enrich_roster_from_contracts(df, cmap)
+    assert out.loc[0, "Level"] == "STD"
+    assert out.loc[1, "Level"] == ""
@@ -0,0 +1,80 @@
+# tests/test_country.py
+import pandas as pd
+
+import pms_country
+from pms_country import resolve_countries_local, update_players_db
+
+
+def _df():
+    return pd.DataFrame(
+        [
+            {"Player": "Zub, Artyom", "Team": "OTT", "Country": "RUS", "FlagISO2": "RU"},
+            {"Player": "Flag Only", "Team": "BUF", "Country": "", "FlagISO2": "SE"},
+            {"Player": "Sr Code", "Team": "BUF", "sr_country_code3": "FIN"},
+            {"Player": "Sr Nat", "Team": "BUF", "sr_nationality": "Czechia"},
+            {"Player": "Artyom Zub", "Team": "OTT"},
+            {"Player": "Junior Guy", "Team": "BUF", "League": "OHL"},
+            {"Player": "Club Guy", "Team": "BUF", "Current Team": "Frolunda HC"},
+            {"Player": "Nobody", "Team": "BUF"},
+        ]
+    )
+
+
+def test_local_tiers_and_provenance():
+    out = resolve_countries_local(_df())
+    assert out["country"].tolist() == ["RU", "SE", "FI", "CZ", "RU", "CA", "SE", ""]
+    assert out["source"].tolist() == [
+        "existing", "flag_iso2", "sr_country_code3", "sr_nationality", "db_sibling", "league", "club", "",
+    ]
+
+
+def test_cache_tier_uses_ok_verdicts_only():
+    df = pd.DataFrame([{"Player": "A B", "playerId": 8478402.0}, {"Player": "C D"}, {"Player": "E F"}])
+    cache = {
+        "8478402": {"ok": True, "country": "CA"},
+        "NAME::c d": {"ok": True, "country": "US"},
+        "NAME::e f": {"ok": False, "reason": "no_pid"},
+    }
+    out = resolve_countries_local(df, cache=cache)
+    assert out["country"].tolist() == ["CA", "US", ""]
+    assert out["source"].tolist() == ["cache", "cache", ""]
+
+
+def test_nhl_team_codes_are_not_clubs():
+    df = pd.DataFrame([{"Player": "X", "Team": "BUF"}])
+    out = resolve_countries_local(df, club_cache={"BUF": "US"})
+    assert out.loc[0, "country"] == ""
+
+
+def test_puckpedia_tier_when_contracts_carry_country():
+    df = pd.DataFrame([{"Player": "Smith, John"}])
+    contracts = pd.DataFrame([{"_k": "john smith", "country": "DK"}])
+    out = resolve_countries_local(df, contracts=contracts)
+    assert (out.loc[0, "country"], out.loc[0, "source"]) == ("DK", "puckpedia")
+
+
+def test_update_only_queries_remote_residue(tmp_path, monkeypatch):
+    path = tmp_path / "hockey.players.csv"
+    _df().to_csv(path, index=False)
+
+    searched = []
+    monkeypatch.setattr(pms_country.pms_nhl, "search_playerid", lambda nm: searched.append(nm) or 42)
+    monkeypatch.setattr(pms_country.pms_nhl, "landing_country", lambda pid: "NO")
+
+    res = update_players_db(str(path), resume_only=False)
+    assert res["ok"] is True
+    assert res["local"] == 6
+    assert searched == ["Nobody"]
+
+    out = pd.read_csv(path, keep_default_na=False)
+    assert out["Country"].tolist() == ["RUS", "SE", "FI", "CZ", "RU", "CA", "SE", "NO"]
+    assert out["Country Source"].tolist()[0] == "existing"
+    assert out["Country Source"].tolist()[-1] == "nhl_api"
+    assert (tmp_path / "nhl_country_cache.json").exists()
+
+
+def test_landing_country_never_guesses_unknown_iso3(monkeypatch):
+    payloads = {1: {"birthCountry": "MEX"}, 2: {"birthCountry": "XYZ", "nationality": "CAN"}, 3: {"birthCountry": "XYZ"}}
+    monkeypatch.setattr(pms_country.pms_nhl, "landing", lambda pid: payloads[pid])
+    got = [pms_country.pms_nhl.landing_country(pid) for pid in (1, 2, 3)]
+    assert got == ["MX", "CA", ""]
@@ -0,0 +1,65 @@
+import pandas as pd
+
+from pms_dedup import clusters, dedup_frame, dedup_players_csv, find_duplicates, merge_sources
+
+
+def _db():
+    return pd.DataFrame({
+        "Player": ["Sebastian Aho", "Sebastian Aho", "Mitch Marner", "Mitchell Marner", "Connor McDavid", "McDavid, Connor", "Elias Pettersson", "Elias Pettersson"],
+        "Team": ["CAR", "NYI", "TOR", "TOR", "EDM", None, "VAN", "VAN"],
+        "Position": ["C", "D", "RW", "RW", "C", "C", "C", "G"],
+        "_source": ["Hockey_Players"] * 5 + ["PuckPedia", "Hockey_Players", "Hockey_Players"],
+        "Cap Hit": [None, None, "10 903 000 $", None, "1 $", "12 500 000 $", None, None],
+        "nhl_id": ["8478427", "8480222", "8478483", None, "8478402", None, None, None],
+        "sr_dob": ["1997-07-26", None, "1997-05-05", "1997-05-05", None, None, None, None],
+        "nhl_pts": [None, None, None, None, "100", "120", None, None],
+        "nhl_last_stats_sync": [None, None, None, None, "2025-01-01", "2025-03-01", None, None],
+    })
+
+
+def test_scoring_separates_namesakes_from_duplicates():
+    pairs = find_duplicates(_db())
+    got = {(r.i, r.j) for r in pairs.itertuples() if r.score >= 0.6}
+    assert got == {(2, 3), (4, 5)}
+    # homonymes: ids différents / gardien vs patineur -> sous le seuil
+    lab = clusters(8, pairs)
+    assert lab[0] == -1 and lab[6] == -1 and lab[2] == lab[3] != -1
+
+
+def test_merge_precedence_per_column():
+    out, report, _ = dedup_frame(_db())
+    assert len(out) == 6 and len(report) == 2
+    mc = out[out["Player"].eq("Connor McDavid")].iloc[0]
+    assert mc["Team"] == "EDM" and mc["nhl_id"] == "8478402"       # ligne la plus remplie
+    assert mc["Cap Hit"] == "12 500 000 $"                          # contrat: PuckPedia d'abord
+    assert mc["nhl_pts"] == "120"                                   # stats: synchro la plus récente
+    assert set(report["kept"]) == {4, 6}
+
+
+def test_unsynced_row_never_wins_latest_rule():
+    df = pd.DataFrame({
+        "Player": ["Jason Zucker", "Zucker, Jason"], "Team": ["BUF", "BUF"], "Position": ["LW", "LW"],
+        "nhl_pts": ["10", "55"], "nhl_last_stats_sync": [None, "2025-10-01"],
+        "sr_dob": ["1992-01-16", "1992-01-16"], "sr_last_sync": ["2025-09-01", ""],
+    })
+    out, report, _ = dedup_frame(df)
+    assert len(out) == 1 and len(report) == 1
+    row = out.iloc[0]
+    assert row["nhl_pts"] == "55" and row["nhl_last_stats_sync"] == "2025-10-01"
+    assert row["sr_last_sync"] == "2025-09-01"
+
+
+def test_merge_sources_and_csv_roundtrip(tmp_path):
+    base = _db().iloc[:5]
+    ext = pd.DataFrame({"Player": ["Marner, Mitch", "Quinn Hughes"], "Team": ["TOR", "VAN"], "Cap Hit": ["10 903 000 $", "7 850 000 $"]})
+    out, report, _ = merge_sources(base, ext, "PuckPedia")
+    assert len(out) == 5 and "Quinn Hughes" in set(out["Player"])  # 3 Marner -> 1
+    assert out.loc[out["Player"].eq("Quinn Hughes"), "_source"].item() == "PuckPedia"
+
+    p = tmp_path / "hockey.players.csv"
+    _db().to_csv(p, index=False)
+    res = dedup_players_csv(str(p))
+    assert res["ok"] and res["rows"] == 8 and res["rows_after"] == 6
+    back = pd.read_csv(p, dtype=str)
+    assert back.loc[back["Player"].eq("Sebastian Aho"), "nhl_id"].tolist() == ["8478427", "8480222"]
+    assert dedup_players_csv(str(p))["clusters"] == 0
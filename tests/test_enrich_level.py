@@ -57,6 +57,13 @@ def test_when_player_not_found_outputs_blank_fields():
     assert str(out.loc[0, "Expiry Year"]).strip().lower() in ("", "nan")
 
 
+def test_nan_level_in_db_stays_blank():
+    db = pd.DataFrame([{"Player": "No Level", "Level": float("nan"), "Expiry Year": 2030}])
+    out = enrich_level_from_players_db(pd.DataFrame([{"Joueur": "No Level"}]), db)
+    assert out.loc[0, "Level"] == ""
+    assert out.loc[0, "Expiry Year"] == "2030"
+
+
 def test_strict_all_rows_have_level_std_or_elc_when_matchable():
     """
     Test strict (utile en prod): si la DB contient une entrée matchable,
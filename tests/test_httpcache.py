@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+import pms_nhl
+from pms_httpcache import HttpCache, cache_key, ttl_for
+
+
+class _Clock:
+    def __init__(self, t=1_000_000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture
+def cached_nhl(tmp_path, nhl_stub, monkeypatch):
+    clk = _Clock()
+    cache = HttpCache(str(tmp_path / "http_cache"), clock=clk)
+    monkeypatch.setattr(pms_nhl, "NHL_WEB_BASE", f"{nhl_stub.base_url}/v1")
+    monkeypatch.setattr(pms_nhl, "NHL_SEARCH_URL", f"{nhl_stub.base_url}/api/v1/search/player")
+    pms_nhl.set_response_cache(cache)
+    yield cache, clk, nhl_stub
+    pms_nhl.set_response_cache(None)
+
+
+def test_key_and_ttl_by_endpoint():
+    assert cache_key("https://x/a", {"q": "b", "limit": 10}) == cache_key("https://x/a", {"limit": "10", "q": "b"})
+    assert cache_key("https://x/a", {"q": "b"}) != cache_key("https://x/a", {"q": "c"})
+    assert ttl_for("https://api-web.nhle.com/v1/player/8478402/landing") > ttl_for("https://api.nhle.com/stats/rest/en/skater/summary")
+
+
+def test_fresh_entry_skips_network_and_keeps_full_payload(cached_nhl):
+    cache, clk, stub = cached_nhl
+    assert pms_nhl.landing_country(8478402) == "CA"
+    assert pms_nhl.landing_country(8478402) == "CA"
+    assert len(stub.hits) == 1 and cache.stats["hits"] == 1
+
+    # une passe d'enrichissement ultérieure relit le payload complet sans réseau
+    payload = pms_nhl.landing(8478402, offline=True)
+    assert payload["birthDate"] == "1997-01-13" and payload["heightInInches"] == 73
+    assert pms_nhl.landing(8478999, offline=True) is None
+    assert len(stub.hits) == 1
+
+
+def test_expired_entry_is_revalidated_with_etag(cached_nhl):
+    cache, clk, stub = cached_nhl
+    assert pms_nhl.search_playerid("Connor McDavid") == 8478402
+    clk.t += ttl_for(pms_nhl.NHL_SEARCH_URL) + 1
+    assert pms_nhl.search_playerid("Connor McDavid") == 8478402
+    assert len(stub.hits) == 2 and stub.not_modified == ["/api/v1/search/player"]
+    assert cache.stats["revalidated"] == 1
+    # revalidée: de nouveau fraîche
+    assert pms_nhl.search_playerid("Connor McDavid") == 8478402
+    assert len(stub.hits) == 2
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path):
+    clk = _Clock()
+    cache = HttpCache(str(tmp_path / "c"), max_mb=0.01, clock=clk)
+    body = {"pad": "x" * 2000}
+    for i in range(10):
+        cache.put(f"https://h/player/{i}/landing", None, body)
+        p = cache._path(cache_key(f"https://h/player/{i}/landing"))
+        os.utime(p, (clk.t + i, clk.t + i))
+    u = cache.usage()
+    assert u["mb"] * 1e6 <= 10_000 and u["evicted"] >= 5
+    assert cache.get("https://h/player/9/landing") is not None
+    assert cache.get("https://h/player/0/landing") is None
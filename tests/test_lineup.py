@@ -0,0 +1,94 @@
+# tests/test_lineup.py
+import math
+import random
+from itertools import product
+
+import pandas as pd
+
+from pms_lineup import CAP_UNIT, POSITIONS, eligible, lineup_summary, optimize_lineups, solve_lineup
+from pms_roster import ROSTER_COLS
+
+
+def _brute_force(points, cap_hits, positions, *, quotas, cap):
+    best = 0.0
+    for combo in product(*[("",) + tuple(e) for e in positions]):
+        if any(sum(c == p for c in combo) > quotas.get(p, 0) for p in POSITIONS):
+            continue
+        if sum(math.ceil(cap_hits[i] / CAP_UNIT) for i, c in enumerate(combo) if c) > cap // CAP_UNIT:
+            continue
+        best = max(best, sum(points[i] for i, c in enumerate(combo) if c))
+    return best
+
+
+def test_eligible():
+    assert eligible("F,D") == ("F", "D")
+    assert eligible("LW") == ("F",)
+    assert eligible("") == ()
+
+
+def test_dp_matches_brute_force():
+    rnd = random.Random(3)
+    quotas = {"F": 3, "D": 2, "G": 1}
+    for _ in range(15):
+        n = 9
+        pts = [rnd.randint(0, 90) for _ in range(n)]
+        hits = [rnd.choice([800_000, 1_500_000, 4_000_000, 8_250_000]) for _ in range(n)]
+        pos = [rnd.choice([("F",), ("D",), ("G",), ("F", "D")]) for _ in range(n)]
+        cap = rnd.choice([6_000_000, 12_000_000, 20_000_000])
+        res = solve_lineup(pts, hits, pos, quotas=quotas, cap=cap)
+        assert res["points"] == _brute_force(pts, hits, pos, quotas=quotas, cap=cap)
+        assert res["cap_used"] <= cap
+        assert sum(pts[i] for i, a in enumerate(res["assign"]) if a) == res["points"]
+        for p in POSITIONS:
+            assert sum(a == p for a in res["assign"]) <= quotas[p]
+        assert all(not a or a in pos[i] for i, a in enumerate(res["assign"]))
+
+
+def test_separable_matches_joint_dp():
+    rnd = random.Random(11)
+    for _ in range(10):
+        n = 30
+        pts = [rnd.randint(0, 90) for _ in range(n)]
+        hits = [rnd.randint(8, 110) * 100_000 for _ in range(n)]
+        pos = [rnd.choice([("F",), ("F",), ("D",), ("G",), ("F", "D")]) for _ in range(n)]
+        fast = solve_lineup(pts, hits, pos, cap=40_000_000)
+        joint = solve_lineup(pts, hits, pos, cap=40_000_000, max_multi=0)
+        assert fast["points"] == joint["points"]
+        assert fast["cap_used"] <= 40_000_000
+
+
+def _league(owners=12, per=40):
+    o, p, ps, s, sl = ROSTER_COLS["owner"], ROSTER_COLS["player"], ROSTER_COLS["pos"], ROSTER_COLS["salary"], ROSTER_COLS["slot"]
+    rnd = random.Random(5)
+    rows, db = [], []
+    for k in range(owners):
+        for i in range(per):
+            name = f"Player {k}-{i}"
+            pos = "FFFFDDDG"[i % 8]
+            rows.append({o: f"Owner {k}", p: name, ps: pos, s: 0, sl: "Actif" if i < 20 else "Banc"})
+            db.append({"Player": name, "Position": pos, "NHL P": rnd.randint(0, 100),
+                       "Cap Hit": f"{rnd.randint(8, 110) * 100_000} $"})
+    return pd.DataFrame(rows), pd.DataFrame(db)
+
+
+def test_batch_mode_respects_quotas_and_cap():
+    roster, db = _league()
+    roster.loc[0, ROSTER_COLS["slot"]] = "IR"
+    cap = 60_000_000
+    opt = optimize_lineups(roster, db, cap=cap)
+    act = opt[opt["suggested"].ne("")]
+    counts = act.groupby(["owner", "suggested"]).size().unstack()
+    assert (counts["F"] <= 12).all() and (counts["D"] <= 6).all() and (counts["G"] <= 2).all()
+    assert (act.groupby("owner")["cap_hit"].sum() <= cap).all()
+    assert opt.loc[0, "suggested"] == ""  # IR non alignable
+    sm = lineup_summary(opt, cap=cap)
+    assert len(sm) == 12 and sm["cap_ok"].all() and (sm["optimal_points"] > 0).all()
+
+
+def test_without_cap_takes_best_per_position():
+    roster, db = _league(owners=1, per=16)
+    opt = optimize_lineups(roster, db, owners=["Owner 0"], quotas={"F": 2, "D": 1, "G": 1})
+    act = opt[opt["suggested"].ne("")].merge(db, left_on="player", right_on="Player")
+    for p, n in (("F", 2), ("D", 1), ("G", 1)):
+        top = db[db["Position"].eq(p)]["NHL P"].nlargest(n).sum()
+        assert act[act["suggested"].eq(p)]["NHL P"].sum() == top
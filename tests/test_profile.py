@@ -0,0 +1,82 @@
+# tests/test_profile.py
+import json
+import time
+
+import pytest
+import requests
+
+import pms_nhl
+import pms_profile as prof
+
+
+@pytest.fixture
+def profiling():
+    prof.reset()
+    prof.set_enabled(True)
+    yield prof
+    prof.set_enabled(False)
+    prof.reset()
+
+
+def test_disabled_is_a_no_op():
+    prof.reset()
+    prof.set_enabled(False)
+    prof.begin_run("s1")
+    with prof.span("x"):
+        pass
+    prof.end_run("s1")
+    assert prof.stage_summary().empty
+
+
+def test_spans_summarized_slowest_first(profiling):
+    for _ in range(3):
+        prof.begin_run("s1", "tab")
+        with prof.span("fast"):
+            pass
+        with prof.span("slow"):
+            time.sleep(0.01)
+        prof.end_run("s1")
+    out = prof.stage_summary()
+    assert out["stage"].tolist()[:2] == ["(rerun total)", "slow"]
+    slow = out.set_index("stage").loc["slow"]
+    assert slow["calls"] == 3
+    assert slow["mean_ms"] >= 10
+
+
+def test_unfinished_run_is_closed_by_next_rerun(profiling):
+    prof.begin_run("s1")
+    with prof.span("before_stop"):
+        pass
+    # st.stop(): end_run jamais appelé
+    prof.begin_run("s1")
+    prof.end_run("s1")
+    runs = json.loads(prof.export_json())["runs"]
+    assert len(runs) == 2
+    assert runs[0]["spans"][0][0] == "before_stop"
+
+
+class _Resp:
+    def __init__(self, status, body=None):
+        self.status_code = status
+        self._body = body or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+    def json(self):
+        return self._body
+
+
+def test_http_retries_and_counters(profiling, monkeypatch):
+    seq = [_Resp(503), _Resp(200, {"ok": 1})]
+    monkeypatch.setattr(pms_nhl.requests, "get", lambda *a, **k: seq.pop(0))
+    monkeypatch.setattr(pms_nhl.time, "sleep", lambda s: None)
+
+    assert pms_nhl.http_get_json("https://api-web.nhle.com/v1/player/8478402/landing") == {"ok": 1}
+    monkeypatch.setattr(pms_nhl.requests, "get", lambda *a, **k: _Resp(404))
+    with pytest.raises(requests.HTTPError):
+        pms_nhl.http_get_json("https://api-web.nhle.com/v1/player/8478403/landing")
+
+    h = prof.http_summary().set_index("endpoint").loc["api-web.nhle.com/v1/player/{id}/landing"]
+    assert (h["calls"], h["errors"], h["retries"]) == (2, 1, 1)
@@ -0,0 +1,49 @@
+from pms_progress import ProgressReporter, format_event, fraction, normalize_event
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_normalize_accepts_legacy_shapes():
+    a = normalize_event({"cursor": 5, "total": 10, "updated": 3, "errors": 1})
+    assert a == {"phase": "", "done": 5, "total": 10, "counters": {"updated": 3, "errors": 1}}
+    b = normalize_event(4, 8, "contracts")
+    assert b == {"phase": "contracts", "done": 4, "total": 8, "counters": {}}
+    c = normalize_event({"phase": "country", "done": 2, "total": 9, "counters": {"cached": 1}})
+    assert c["counters"] == {"cached": 1} and c["done"] == 2
+
+
+def test_reporter_throttles_and_computes_eta():
+    clk, seen = _Clock(), []
+    rep = ProgressReporter(seen.append, min_interval=0.25, clock=clk)
+    # reprise sur checkpoint: 100 lignes déjà faites, 1000 lignes à 1 ms chacune
+    for i in range(101, 1101):
+        clk.t += 0.001
+        rep({"phase": "country", "done": i, "total": 1100, "counters": {"processed": i - 100}})
+    assert rep.received == 1000
+    # 1 s de travail: premier événement + ~4 par seconde + fin
+    assert 4 <= len(seen) <= 7
+    mid = seen[2]
+    assert abs(mid["rate"] - 1000.0) < 1.0
+    assert abs(mid["eta"] - (1100 - mid["done"]) / 1000.0) < 0.05
+    assert seen[-1]["done"] == 1100 and seen[-1]["eta"] == 0.0
+
+    last = rep.close()
+    assert last["final"] and seen[-1] is last
+    assert "terminé" in format_event(last) and "processed=1000" in format_event(last)
+    assert fraction(last) == 1.0
+
+
+def test_phase_change_is_always_emitted():
+    clk, seen = _Clock(), []
+    rep = ProgressReporter(seen.append, min_interval=10.0, clock=clk)
+    rep(1, 3, "summary")
+    rep(2, 3, "summary")
+    rep(1, 3, "skater_realtime")
+    assert [e["phase"] for e in seen] == ["summary", "skater_realtime"]
+    assert seen[0]["eta"] is None
@@ -0,0 +1,44 @@
+# tests/test_roster_tx.py
+import zipfile
+
+import pandas as pd
+
+from pms_backup import zip_backup
+from pms_roster import slot_bucket, slot_buckets
+from pms_tx import TX_COLS, tx_append, tx_read
+
+
+def test_slot_buckets_matches_scalar():
+    slot = pd.Series(["Actif", "Banc", "IR", "", None, "AHL", "Mineur", "x"])
+    statut = pd.Series(["", "", "", "Blessé", "mineur", "", None, "banc"])
+    expected = [slot_bucket(a, b) for a, b in zip(slot.fillna(""), statut.fillna(""))]
+    assert slot_buckets(slot, statut).tolist() == expected
+    assert slot_buckets(slot).tolist()[:3] == ["ACTIFS", "BANC", "IR"]
+
+
+def test_tx_append_appends_and_repairs_header(tmp_path):
+    p = tmp_path / "transactions.csv"
+    tx_append(str(p), {"trade_id": "TR-1", "owner_a": "A"})
+    with open(p, "ab") as f:
+        f.write(b"TR-2,,,B,,,,,,,,,")  # pas de saut de ligne final
+    tx_append(str(p), {"trade_id": "TR-3", "notes": "ok"})
+    assert tx_read(str(p))["trade_id"].tolist() == ["TR-1", "TR-2", "TR-3"]
+
+    legacy = tmp_path / "legacy.csv"
+    pd.DataFrame([{"trade_id": "TR-0", "status": "DONE"}]).to_csv(legacy, index=False)
+    tx_append(str(legacy), {"trade_id": "TR-9"})
+    out = pd.read_csv(legacy)
+    assert out.columns.tolist() == TX_COLS
+    assert out["trade_id"].tolist() == ["TR-0", "TR-9"]
+
+
+def test_zip_backup_arcnames(tmp_path):
+    data = tmp_path / "data"
+    (data / "sub").mkdir(parents=True)
+    (data / "a.csv").write_text("x\n")
+    (data / "sub" / "b.csv").write_text("y\n")
+    other = tmp_path / "other.csv"
+    other.write_text("z\n")
+    out = zip_backup(str(tmp_path), [str(data / "a.csv"), str(data / "sub" / "b.csv"), str(other), ""], str(data))
+    with zipfile.ZipFile(out) as z:
+        assert sorted(z.namelist()) == ["a.csv", "other.csv", "sub/b.csv"]
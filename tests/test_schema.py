@@ -0,0 +1,65 @@
+# tests/test_schema.py
+import pandas as pd
+
+from pms_schema import apply_players_schema, memory_mb, parse_cap_hit, players_db_map, read_players_db
+
+
+def _raw(n=2000):
+    teams = ["BUF", "MIN", "LAK", "NYR", "WPG", "OTT"]
+    countries = ["CAN", "USA", "SWE", "FIN", ""]
+    return pd.DataFrame(
+        {
+            "Player": [f"Player {i}" for i in range(n)],
+            "Team": [teams[i % len(teams)] for i in range(n)],
+            "Position": [["F", "D", "G", "F,D"][i % 4] for i in range(n)],
+            "Country": [countries[i % len(countries)] for i in range(n)],
+            "Level": [["STD", "ELC"][i % 2] for i in range(n)],
+            "Status": [f"Yr 1 of {1 + i % 8}" for i in range(n)],
+            "Cap Hit": [f"{800_000 + (i % 50) * 10_000:,} $".replace(",", " ") for i in range(n)],
+            "Age": [str(20 + i % 18) for i in range(n)],
+            "NHL GP": [str(i % 900) for i in range(n)],
+            "nhl_gp": [float("nan")] * n,
+            "nhl_last_stats_sync": [float("nan")] * n,
+        }
+    )
+
+
+def test_parse_cap_hit_variants():
+    s = pd.Series(["4 750 000 $", "816,666", "", None, "1 000 000 $"])
+    assert parse_cap_hit(s).tolist() == [4750000, 816666, pd.NA, pd.NA, 1000000]
+    assert parse_cap_hit(pd.Series([4750000.0])).tolist() == [4750000]
+
+
+def test_schema_dtypes():
+    out = apply_players_schema(_raw(10))
+    assert out["Team"].dtype == "category"
+    assert out["Country"].dtype == "category"
+    assert str(out["Cap Hit"].dtype) == "Int32"
+    assert str(out["Age"].dtype) == "Int16"
+    assert str(out["nhl_gp"].dtype) == "Int16"
+    assert out["Country"].isna().sum() == 2  # "" -> <NA>
+    assert out.loc[0, "Cap Hit"] == 800000
+
+
+def test_memory_drops_several_fold():
+    raw = _raw()
+    assert memory_mb(raw) / memory_mb(apply_players_schema(raw)) > 3
+
+
+def test_read_players_db_missing_file(tmp_path):
+    assert read_players_db(str(tmp_path / "nope.csv")).empty
+
+
+def test_players_db_map_prefers_iso2_and_first_row(tmp_path):
+    p = tmp_path / "hockey.players.csv"
+    pd.DataFrame(
+        [
+            {"Player": "Zub, Artyom", "Position": "D", "Country": "RUS", "FlagISO2": "RU", "Cap Hit": "4 600 000 $"},
+            {"Player": "Mats Zuccarello", "Position": "F", "Country": "NOR", "FlagISO2": "", "Cap Hit": ""},
+            {"Player": "Zub, Artyom", "Position": "F", "Country": "CAN", "FlagISO2": "CA", "Cap Hit": ""},
+        ]
+    ).to_csv(p, index=False)
+    m = players_db_map(read_players_db(str(p)))
+    assert m["zub artyom"] == {"country": "RU", "pos": "D", "salary": 4600000}
+    assert m["mats zuccarello"]["country"] == "NO"
+    assert m["mats zuccarello"]["salary"] == ""
@@ -0,0 +1,49 @@
+# tests/test_search.py
+import pandas as pd
+
+from pms_search import PlayerIndex, first_last
+
+
+def _db():
+    return pd.DataFrame(
+        [
+            {"Player": "Zub, Artyom", "Team": "OTT", "Position": "D", "NHL GP": 300},
+            {"Player": "Mats Zuccarello", "Team": "MIN", "Position": "F", "NHL GP": 900},
+            {"Player": "Jason Zucker", "Team": "BUF", "Position": "F", "NHL GP": 700},
+            {"Player": "James van Riemsdyk", "Team": "DET", "Position": "F", "NHL GP": 1000},
+            {"Player": "Zucker, Jason", "Team": "XXX", "Position": "F", "NHL GP": 1},
+            {"Player": "Artyom Zubov", "Team": "", "Position": "", "NHL GP": None},
+        ]
+    )
+
+
+def test_first_last():
+    assert first_last("Zub, Artyom") == "Artyom Zub"
+    assert first_last("Mats Zuccarello") == "Mats Zuccarello"
+
+
+def test_prefix_ranking_and_variants():
+    idx = PlayerIndex(_db())
+    assert len(idx) == 5  # "Zucker, Jason" = même clé que "Jason Zucker"
+    # nom de famille: matchs LNH décroissants
+    assert idx.search("zu")["name"].tolist() == ["Mats Zuccarello", "Jason Zucker", "Artyom Zub", "Artyom Zubov"]
+    assert idx.search("Zub")["name"].tolist() == ["Artyom Zub", "Artyom Zubov"]
+    # nom complet avant suffixe; "Last, First" et accents normalisés
+    assert idx.search("artyom")["name"].tolist()[0] == "Artyom Zub"
+    assert idx.search("Zub, Art")["name"].tolist() == ["Artyom Zub"]
+    assert idx.search("riems")["name"].tolist() == ["James van Riemsdyk"]
+    assert idx.search("van r")["name"].tolist() == ["James van Riemsdyk"]
+    assert idx.search("Mäts")["team"].tolist() == ["MIN"]
+    assert idx.search("").empty and idx.search("qqq").empty
+    assert idx.suggest("zubov") == [("Artyom Zubov", "Artyom Zubov")]
+    assert idx.suggest("zub", 1) == [("Artyom Zub (OTT · D)", "Artyom Zub")]
+
+
+def test_prefix_search_on_large_index():
+    n = 20_000
+    db = pd.DataFrame({"Player": [f"First{i % 97} Last{i}" for i in range(n)], "NHL GP": range(n)})
+    idx = PlayerIndex(db)
+    # temps par frappe: tests/benchmarks (test_bench_player_search_keystrokes)
+    assert idx.search("l")["name"].tolist()[:2] == ["First17 Last19999", "First16 Last19998"]
+    assert idx.search("last123")["name"].tolist()[:2] == ["First26 Last123", "First80 Last12399"]
+    assert len(idx.search("first5 last", limit=50)) == 50
@@ -0,0 +1,82 @@
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+import pms_shared
+from pms_schema import players_db_map, read_players_db
+from pms_shared import arrow_cache_path, registry_stats, shared_players_db
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture(autouse=True)
+def _clear_registry():
+    pms_shared.clear()
+    yield
+    pms_shared.clear()
+
+
+def _write(path, names, cap="1 000 000 $"):
+    pd.DataFrame({
+        "Player": names, "Team": ["EDM"] * len(names), "Position": ["C"] * len(names),
+        "FlagISO2": ["CA"] * len(names), "Cap Hit": [cap] * len(names), "NHL GP": [10] * len(names),
+    }).to_csv(path, index=False)
+
+
+def test_snapshot_matches_csv_schema_and_is_shared(tmp_path):
+    p = str(tmp_path / "hockey.players.csv")
+    _write(p, ["Connor McDavid", "Artyom Zub"])
+    s1 = shared_players_db(p)
+    assert len(s1.players_map()) == 2  # map avant frame: la conversion se fait au passage
+    assert s1.source == "csv" and os.path.exists(arrow_cache_path(p))
+
+    ref = read_players_db(p)
+    got = s1.frame()
+    pd.testing.assert_frame_equal(got, ref, check_categorical=False, check_dtype=False)
+    assert list(got.dtypes.astype(str)) == list(ref.dtypes.astype(str))
+    assert s1.players_map() == players_db_map(ref)
+
+    # même version: même objet, aucune reconversion
+    s2 = shared_players_db(p)
+    assert s2 is s1 and s2.frame() is got and s2.players_map() is s1.players_map()
+
+
+def test_new_process_maps_arrow_file_and_file_change_swaps(tmp_path):
+    p = str(tmp_path / "hockey.players.csv")
+    _write(p, ["Connor McDavid"])
+    old = shared_players_db(p)
+
+    pms_shared.clear()  # nouveau process: relecture du fichier .arrow, pas du CSV
+    again = shared_players_db(p)
+    assert again.source == "arrow" and again.sig == old.sig
+
+    _write(p, ["Connor McDavid", "Leon Draisaitl", "Zach Hyman"])
+    os.utime(p, ns=(os.stat(p).st_atime_ns, os.stat(p).st_mtime_ns + 10**9))
+    new = shared_players_db(p)
+    assert new is not again and new.source == "csv" and len(new.frame()) == 3
+    # l'ancienne version reste lisible par les sessions qui la tiennent encore
+    assert len(again.frame()) == 1
+    assert [s["rows"] for s in registry_stats()] == [3]
+
+
+def test_concurrent_sessions_build_once(tmp_path, monkeypatch):
+    p = str(tmp_path / "hockey.players.csv")
+    _write(p, ["Connor McDavid"])
+    calls = []
+    real = pms_shared._build
+    monkeypatch.setattr(pms_shared, "_build", lambda *a: calls.append(1) or real(*a))
+
+    out = []
+    ts = [threading.Thread(target=lambda: out.append(shared_players_db(p))) for _ in range(8)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    assert len(calls) == 1 and len({id(s) for s in out}) == 1
+
+
+def test_missing_file_gives_empty_snapshot(tmp_path):
+    s = shared_players_db(str(tmp_path / "nope.csv"))
+    assert s.players_map() == {} and s.frame().empty
@@ -0,0 +1,60 @@
+# tests/test_snapshot.py
+import pandas as pd
+
+from pms_roster import ROSTER_COLS
+from pms_snapshot import (
+    KIND_PLAYERS, KIND_ROSTER, diff_frames, diff_summary, list_snapshots, load_snapshot, read_current, take_snapshot,
+)
+
+
+def test_snapshots_are_content_addressed(tmp_path):
+    p = tmp_path / "hockey.players.csv"
+    snaps = str(tmp_path / "snapshots")
+    pd.DataFrame([{"Player": "Zub, Artyom", "Country": ""}]).to_csv(p, index=False)
+    e1 = take_snapshot(str(p), snaps, KIND_PLAYERS, label="avant")
+    assert take_snapshot(str(p), snaps, KIND_PLAYERS)["hash"] == e1["hash"]  # inchangé: pas de nouvelle version
+    pd.DataFrame([{"Player": "Zub, Artyom", "Country": "RUS"}]).to_csv(p, index=False)
+    e2 = take_snapshot(str(p), snaps, KIND_PLAYERS, label="après")
+    assert [s["label"] for s in list_snapshots(snaps, KIND_PLAYERS)] == ["après", "avant"]
+    assert len(list((tmp_path / "snapshots" / KIND_PLAYERS).glob("*.csv.gz"))) == 2
+
+    d = diff_frames(load_snapshot(snaps, KIND_PLAYERS, e1["hash"]), load_snapshot(snaps, KIND_PLAYERS, e2["hash"]), KIND_PLAYERS)
+    assert d["cells"].to_dict("records") == [{"key": "artyom zub", "column": "Country", "old": "", "new": "RUS"}]
+    assert take_snapshot(str(tmp_path / "nope.csv"), snaps, KIND_PLAYERS) is None
+
+
+def test_roster_diff_rows_cells_and_columns(tmp_path):
+    o, p, s = ROSTER_COLS["owner"], ROSTER_COLS["player"], ROSTER_COLS["slot"]
+    old = pd.DataFrame([
+        {o: "Whalers", p: "Artyom Zub", s: "Actif"},
+        {o: "Whalers", p: "Mats Zuccarello", s: "Banc"},
+        {o: "Nordiques", p: "Jason Zucker", s: "IR"},
+    ]).astype(str)
+    new = pd.DataFrame([
+        {o: "Nordiques", p: "Jason Zucker", s: "Actif", "Level": "STD"},
+        {o: "Whalers", p: "Artyom Zub", s: "Actif", "Level": "STD"},
+        {o: "Nordiques", p: "Mats Zuccarello", s: "Banc", "Level": ""},
+    ]).astype(str)
+    d = diff_frames(old, new, KIND_ROSTER)
+    assert d["added"]["key"].tolist() == ["Nordiques / mats zuccarello"]
+    assert d["removed"]["key"].tolist() == ["Whalers / mats zuccarello"]
+    assert d["cells"][["key", "column", "new"]].values.tolist() == [["Nordiques / jason zucker", s, "Actif"]]
+    sm = diff_summary(d)
+    assert (sm["added"], sm["removed"], sm["changed_rows"], sm["columns_added"]) == (1, 1, 1, ["Level"])
+
+
+def test_homonyms_and_wide_diff(tmp_path):
+    # temps sur 10k × 70 colonnes: tests/benchmarks (test_bench_snapshot_diff_wide)
+    n, ncols = 10_000, 70
+    old = pd.DataFrame({f"c{j}": [f"v{i}_{j}" for i in range(n)] for j in range(ncols)})
+    old.insert(0, "Player", [f"Player {i % 9000}" for i in range(n)])  # 1000 homonymes
+    new = old.copy()
+    new.loc[::100, "c5"] = "changed"
+    new = pd.concat([new.iloc[:9000].iloc[::-1], new.iloc[9000:]])  # ordre différent, mêmes identités
+    d = diff_frames(old, new, KIND_PLAYERS)
+    assert diff_summary(d)["changed_cells"] == 100
+    assert d["added"].empty and d["removed"].empty
+
+
+def test_read_current_missing(tmp_path):
+    assert read_current(str(tmp_path / "x.csv")).empty
@@ -0,0 +1,112 @@
+# tests/test_stats_sync.py
+from datetime import datetime
+
+import pandas as pd
+
+from pms_stats import season_id, sync_nhl_stats
+
+NOW = datetime(2025, 1, 15, 12, 0, 0)
+
+
+def _write_db(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def _db_rows():
+    return [
+        {"Player": "McDavid, Connor", "Team": "EDM", "nhl_gp": "", "nhl_last_stats_sync": ""},
+        {"Player": "Jason Zucker", "Team": "BUF", "nhl_gp": "", "nhl_last_stats_sync": ""},
+        {"Player": "John Smith", "Team": "BOS", "nhl_gp": "", "nhl_last_stats_sync": ""},
+        {"Player": "Daniel Vladar", "Team": "PHI", "nhl_gp": "", "nhl_last_stats_sync": ""},
+        {"Player": "Junior Nobody", "Team": "BUF", "nhl_gp": "", "nhl_last_stats_sync": ""},
+    ]
+
+
+def test_season_id():
+    assert season_id("2024-2025") == "20242025"
+    assert season_id("2024-25") == "20242025"
+    assert season_id("") == ""
+
+
+def test_bulk_sync_fills_nhl_columns(tmp_path, nhl_stub):
+    path = tmp_path / "hockey.players.csv"
+    _write_db(path, _db_rows())
+
+    res = sync_nhl_stats(str(path), "2024-2025", base_url=nhl_stub.base_url, now=NOW)
+    assert res["ok"] is True
+    assert res["matched"] == 4
+    assert res["unmatched"] == 1
+    # 3 tables pour toute la ligue, aucun appel par joueur
+    assert sorted({p for p, _ in nhl_stub.hits}) == ["/goalie/summary", "/skater/realtime", "/skater/summary"]
+
+    out = pd.read_csv(path)
+    mcd = out.iloc[0]
+    assert (mcd["nhl_id"], mcd["nhl_gp"], mcd["nhl_pts"], mcd["nhl_hits"]) == (8478402, 67, 126, 34)
+    assert mcd["nhl_toi_avg"] == 21.47
+    # deux "John Smith": départagé par l'équipe courante (dernière de "TOR,BOS")
+    assert out.iloc[2]["nhl_id"] == 8481000
+    # gardien matché par nom seul (équipe différente dans la DB)
+    assert (out.iloc[3]["nhl_w"], out.iloc[3]["nhl_sv_pct"]) == (12, 0.8965)
+    assert out["nhl_last_stats_sync"].eq("2025-01-15 12:00:00").all()
+    assert pd.isna(out.iloc[4]["nhl_gp"])
+
+
+def test_incremental_refresh_skips_fresh_rows(tmp_path, nhl_stub):
+    path = tmp_path / "hockey.players.csv"
+    rows = _db_rows()
+    for r in rows:
+        r["nhl_last_stats_sync"] = "2025-01-15 08:00:00"
+    rows[1]["nhl_last_stats_sync"] = "2025-01-13 08:00:00"
+    rows[1]["nhl_gp"] = 1
+    _write_db(path, rows)
+
+    res = sync_nhl_stats(str(path), "2024-2025", base_url=nhl_stub.base_url, max_age_hours=24, now=NOW)
+    assert (res["stale"], res["matched"]) == (1, 1)
+    out = pd.read_csv(path)
+    assert out.iloc[1]["nhl_gp"] == 68
+    assert pd.isna(out.iloc[0]["nhl_gp"])
+
+
+def test_nothing_stale_means_no_network(tmp_path, nhl_stub):
+    path = tmp_path / "hockey.players.csv"
+    rows = _db_rows()
+    for r in rows:
+        r["nhl_last_stats_sync"] = "2025-01-15 11:00:00"
+    _write_db(path, rows)
+
+    res = sync_nhl_stats(str(path), "2024-2025", base_url=nhl_stub.base_url, now=NOW)
+    assert (res["stale"], res["endpoints"]) == (0, 0)
+    assert nhl_stub.hits == []
+
+
+def test_pagination_follows_start_limit(tmp_path, nhl_stub, monkeypatch):
+    import pms_stats
+
+    path = tmp_path / "hockey.players.csv"
+    _write_db(path, _db_rows())
+    real = pms_stats.fetch_stats_table
+    monkeypatch.setattr(pms_stats, "fetch_stats_table", lambda e, s, base_url=None, ttl=None: real(e, s, base_url=base_url, page_size=2, ttl=ttl))
+
+    res = sync_nhl_stats(str(path), "2024-2025", base_url=nhl_stub.base_url, now=NOW)
+    assert res["matched"] == 4
+    starts = [q["start"] for p, q in nhl_stub.hits if p == "/skater/summary"]
+    assert starts == ["0", "2", "4"]
+
+
+def test_force_bypasses_fresh_http_cache(tmp_path, nhl_stub):
+    import pms_nhl
+    from pms_httpcache import HttpCache
+
+    path = tmp_path / "hockey.players.csv"
+    _write_db(path, _db_rows())
+    pms_nhl.set_response_cache(HttpCache(str(tmp_path / "http_cache")))
+    try:
+        sync_nhl_stats(str(path), "2024-2025", base_url=nhl_stub.base_url, now=NOW)
+        n = len(nhl_stub.hits)
+        # lignes périmées, réponses encore fraîches: relues du cache
+        sync_nhl_stats(str(path), "2024-2025", base_url=nhl_stub.base_url, now=datetime(2025, 1, 17))
+        assert len(nhl_stub.hits) == n
+        res = sync_nhl_stats(str(path), "2024-2025", base_url=nhl_stub.base_url, now=NOW, force=True)
+        assert res["matched"] == 4 and len(nhl_stub.hits) == 2 * n
+    finally:
+        pms_nhl.set_response_cache(None)
@@ -0,0 +1,73 @@
+# tests/test_store.py
+import pandas as pd
+
+from pms_roster import ROSTER_COLS
+from pms_store import PLAYERS, ROSTERS, TRANSACTIONS, Store
+from pms_tx import TX_COLS, tx_append, tx_read
+
+
+def _players(p):
+    pd.DataFrame(
+        [
+            {"Player": "Zub, Artyom", "Team": "OTT", "Cap Hit": "4 600 000 $", "nhl_id": "8478402"},
+            {"Player": "Mats Zuccarello", "Team": "MIN", "Cap Hit": "", "nhl_id": ""},
+        ]
+    ).to_csv(p, index=False)
+
+
+def _roster(p):
+    pd.DataFrame(
+        [
+            {ROSTER_COLS["owner"]: "Whalers", ROSTER_COLS["player"]: "Artyom Zub", ROSTER_COLS["slot"]: "Actif"},
+            {ROSTER_COLS["owner"]: "Nordiques", ROSTER_COLS["player"]: "Mats Zuccarello", ROSTER_COLS["slot"]: "Banc"},
+            {ROSTER_COLS["owner"]: "Whalers", ROSTER_COLS["player"]: "Jason Zucker", ROSTER_COLS["slot"]: "IR"},
+        ]
+    ).to_csv(p, index=False)
+
+
+def test_wal_and_player_lookups(tmp_path):
+    _players(tmp_path / "hockey.players.csv")
+    s = Store(str(tmp_path / "pms.sqlite"))
+    assert s.import_players_csv(str(tmp_path / "hockey.players.csv")) == 2
+    assert s.stats()["journal_mode"] == "wal"
+    assert s.player("Artyom Zub")["Team"] == "OTT"
+    assert s.player_by_nhl_id(8478402)["Player"] == "Zub, Artyom"
+    assert s.player("Nobody") is None
+    assert s.players(["Zub, Artyom", "Mats Zuccarello", ""])["Team"].tolist() == ["OTT", "MIN"]
+    # signature inchangée -> pas de réimport
+    assert s.import_players_csv(str(tmp_path / "hockey.players.csv")) == -1
+
+
+def test_roster_owner_query_uses_index(tmp_path):
+    _roster(tmp_path / "r.csv")
+    s = Store(str(tmp_path / "pms.sqlite"))
+    assert s.sync(roster_path=str(tmp_path / "r.csv"), season="2025-2026") == {ROSTERS: 3}
+    assert s.owners("2025-2026") == ["Nordiques", "Whalers"]
+    view = s.roster("2025-2026", "Whalers")
+    assert view[ROSTER_COLS["player"]].tolist() == ["Artyom Zub", "Jason Zucker"]
+    assert "_season" not in view.columns
+    assert s.roster("2024-2025").empty
+    plan = s._conn().execute(
+        f'EXPLAIN QUERY PLAN SELECT * FROM {ROSTERS} WHERE _season=? AND "{ROSTER_COLS["owner"]}"=?', ("a", "b")
+    ).fetchall()
+    assert "ix_rosters_season_owner" in str(plan)
+
+
+def test_transactions_append_sort_and_export(tmp_path):
+    csv_path = str(tmp_path / "transactions_2025-2026.csv")
+    s = Store(str(tmp_path / "pms.sqlite"))
+    rows = [{"trade_id": f"TR-{i}", "timestamp": f"2025-01-0{i} 12:00:00", "season": "2025-2026"} for i in (1, 3, 2)]
+    tx_append(csv_path, rows[0])
+    assert s.import_transactions_csv(csv_path, "2025-2026") == 1
+    for r in rows[1:]:
+        tx_append(csv_path, r)
+        s.add_transaction("2025-2026", r, csv_path=csv_path)
+    assert s.import_transactions_csv(csv_path, "2025-2026") == -1
+    assert s.transactions("2025-2026")["trade_id"].tolist() == ["TR-3", "TR-2", "TR-1"]
+
+    out = tmp_path / "export.csv"
+    assert s.export_csv(TRANSACTIONS, str(out), season="2025-2026") == 3
+    back = tx_read(str(out))
+    assert back.columns.tolist() == TX_COLS
+    assert back["trade_id"].tolist() == ["TR-1", "TR-3", "TR-2"]
+    assert s.stats()[PLAYERS] == 0
@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+from pms_sync import STORAGES, LocalDirStorage, Storage, collect_files, register_storage, storage_from_url, sync
+
+
+def _files(tmp_path):
+    b = tmp_path / "backups"
+    b.mkdir()
+    (b / "backup_1.zip").write_bytes(os.urandom(10_000))
+    (b / "roster.csv").write_text("Propriétaire,Joueur\nNordiques,Connor McDavid\n", encoding="utf-8")
+    cur = tmp_path / "hockey.players.csv"
+    cur.write_text("Player\nConnor McDavid\n", encoding="utf-8")
+    return collect_files(str(b), {"players": str(cur)})
+
+
+def test_sync_uploads_once_then_only_changes(tmp_path):
+    files = _files(tmp_path)
+    assert sorted(files) == ["backups/backup_1.zip", "backups/roster.csv", "current/hockey.players.csv"]
+    remote = LocalDirStorage(str(tmp_path / "remote"))
+    man = str(tmp_path / "sync_manifest.json")
+
+    s1 = sync(files, remote, man, chunk_size=1024, workers=3)
+    assert s1["uploaded"] == 3 and s1["chunks"] == 10 + 1 + 1 and not s1["errors"]
+    assert (tmp_path / "remote" / "backups" / "backup_1.zip").read_bytes() == (tmp_path / "backups" / "backup_1.zip").read_bytes()
+
+    s2 = sync(files, remote, man, chunk_size=1024)
+    assert s2["uploaded"] == 0 and s2["skipped"] == 3 and s2["bytes"] == 0
+
+    # même contenu réécrit (mtime change): rien n'est renvoyé; contenu modifié: ce fichier seulement
+    p = tmp_path / "backups" / "roster.csv"
+    p.write_text(p.read_text(encoding="utf-8"), encoding="utf-8")
+    os.utime(p, ns=(1, 1))
+    assert sync(files, remote, man, chunk_size=1024)["uploaded"] == 0
+    (tmp_path / "hockey.players.csv").write_text("Player\nConnor McDavid\nLane Hutson\n", encoding="utf-8")
+    s3 = sync(files, remote, man, chunk_size=1024)
+    assert s3["uploaded"] == 1 and "Lane Hutson" in (tmp_path / "remote" / "current" / "hockey.players.csv").read_text(encoding="utf-8")
+
+    # objet distant supprimé: renvoyé
+    os.remove(tmp_path / "remote" / "backups" / "roster.csv")
+    assert sync(files, remote, man, chunk_size=1024)["uploaded"] == 1
+
+
+class _Flaky(LocalDirStorage):
+    """Coupe la connexion après `budget` morceaux."""
+
+    def __init__(self, root, budget):
+        super().__init__(root)
+        self.budget = budget
+
+    def put_chunk(self, session, index, data):
+        if self.budget <= 0:
+            raise ConnectionError("coupure")
+        self.budget -= 1
+        super().put_chunk(session, index, data)
+
+
+def test_interrupted_upload_resumes_from_received_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr("pms_sync.time.sleep", lambda s: None)
+    files = _files(tmp_path)
+    man = str(tmp_path / "m.json")
+    s1 = sync(files, _Flaky(str(tmp_path / "remote"), 6), man, chunk_size=1024, workers=1)
+    assert s1["errors"] and s1["uploaded"] < 3
+    assert not (tmp_path / "remote" / "backups" / "backup_1.zip").exists()
+
+    s2 = sync(files, LocalDirStorage(str(tmp_path / "remote")), man, chunk_size=1024, workers=2)
+    assert not s2["errors"] and s2["uploaded"] == 3 - s1["uploaded"]
+    assert s2["chunks_resumed"] > 0 and s1["chunks"] + s2["chunks"] == 12
+    assert (tmp_path / "remote" / "backups" / "backup_1.zip").read_bytes() == (tmp_path / "backups" / "backup_1.zip").read_bytes()
+    assert os.listdir(tmp_path / "remote" / ".uploads") == []
+
+
+def test_resume_with_other_chunk_size_starts_a_new_session(tmp_path, monkeypatch):
+    monkeypatch.setattr("pms_sync.time.sleep", lambda s: None)
+    files = _files(tmp_path)
+    man = str(tmp_path / "m.json")
+    sync(files, _Flaky(str(tmp_path / "remote"), 4), man, chunk_size=1024, workers=1)
+    s2 = sync(files, LocalDirStorage(str(tmp_path / "remote")), man, chunk_size=4096, workers=2)
+    assert not s2["errors"] and s2["chunks_resumed"] == 0
+    assert (tmp_path / "remote" / "backups" / "backup_1.zip").read_bytes() == (tmp_path / "backups" / "backup_1.zip").read_bytes()
+
+
+class _NoSession(LocalDirStorage):
+    def begin(self, key, size, sha, chunk_size):
+        if key.endswith(".zip"):
+            raise ConnectionError("session refusée")
+        return super().begin(key, size, sha, chunk_size)
+
+
+def test_session_failure_is_counted_in_progress(tmp_path):
+    events = []
+    s = sync(_files(tmp_path), _NoSession(str(tmp_path / "remote")), str(tmp_path / "m.json"),
+             chunk_size=1024, progress_cb=events.append)
+    assert s["uploaded"] == 2 and len(s["errors"]) == 1
+    assert events[-1]["counters"]["errors"] == 1
+
+
+def test_storage_is_abstract():
+    with pytest.raises(TypeError):
+        Storage()
+
+
+def test_storage_registry(tmp_path, monkeypatch):
+    assert isinstance(storage_from_url(f"local:{tmp_path}"), LocalDirStorage)
+    with pytest.raises(ValueError):
+        storage_from_url("drive:abc")
+    monkeypatch.setattr("pms_sync.STORAGES", dict(STORAGES))
+    register_storage("drive", lambda rest: LocalDirStorage(str(tmp_path / rest)))
+    assert storage_from_url("drive:folder").root.endswith("folder")
@@ -0,0 +1,110 @@
+import os
+
+import pandas as pd
+
+from pms_validate import DataValidator, classify, cross_rules, summary, validate_frame
+
+
+def _players(path):
+    pd.DataFrame({
+        "Player": ["Connor McDavid", "McDavid, Connor", "Artyom Zub", "Juraj Slafkovsky"],
+        "Position": ["C", "C", "D", "Q"],
+        "Cap Hit": ["12 500 000 $", "12 500 000 $", "4,6M", "950 000 $"],
+        "FlagISO2": ["CA", "CA", "RUS", ""],
+        "Level": ["STD", "STD", "STD", "ELC"],
+        "Expiry Year": ["2025-26", "2025-26", "2026-27", "soon"],
+        "NHL GP": ["700", "700", "x", ""],
+    }).to_csv(path, index=False)
+
+
+def _roster(path, rows):
+    pd.DataFrame(rows, columns=["Propriétaire", "Joueur", "Pos", "Salaire", "Slot"]).to_csv(path, index=False)
+
+
+def _rules(rep):
+    return {(r.file, r.rule, r.line) for r in rep.itertuples()}
+
+
+def test_classify():
+    assert classify("equipes_joueurs_2025-2026.csv") == ("roster", "2025-2026")
+    assert classify("transactions_2025-2026.csv") == ("transactions", "2025-2026")
+    assert classify("hockey.players.csv") == ("players", "")
+    assert classify("backup_history.csv") == ("", "")
+
+
+def test_schema_rules_report_every_bad_row():
+    df = pd.DataFrame({"Joueur": ["A B", "C D"], "Pos": ["F", "X"], "Salaire": ["4 750 000 $", "beaucoup"], "Slot": ["Actif", "Plage"]})
+    rep = validate_frame(df, "roster")
+    got = {(r.rule, r.column, r.line) for r in rep.itertuples()}
+    assert ("missing_column", "Propriétaire", 0) in got and ("missing_column", "Slot", 0) not in got
+    assert ("money_unparseable", "Salaire", 3) in got and ("money_unparseable", "Salaire", 2) not in got
+    assert ("position_unknown", "Pos", 3) in got and ("slot_unknown", "Slot", 3) in got
+
+
+def test_full_report_and_cross_file_rules(tmp_path):
+    d = str(tmp_path)
+    _players(os.path.join(d, "hockey.players.csv"))
+    _roster(os.path.join(d, "equipes_joueurs_2025-2026.csv"), [
+        ["Whalers", "Connor McDavid", "F", "12500000", "Actif"],
+        ["Nordiques", "Connor McDavid", "F", "12500000", "Actif"],
+        ["Nordiques", "Inconnu Total", "F", "500000", "Banc"],
+    ])
+    pd.DataFrame({
+        "trade_id": ["t1", "t1"], "timestamp": ["2025-10-01 12:00:00", "hier"], "season": ["2025-2026"] * 2,
+        "owner_a": ["Whalers", "Whalers"], "owner_b": ["Nordiques", "Canadiens"],
+        "a_players": ["Connor McDavid", "Personne Ici"], "b_players": ["", ""],
+    }).to_csv(os.path.join(d, "transactions_2025-2026.csv"), index=False)
+
+    rep = DataValidator(d).report()
+    got = _rules(rep)
+    P, R, T = "hockey.players.csv", "equipes_joueurs_2025-2026.csv", "transactions_2025-2026.csv"
+    assert {(P, "money_unparseable", 4), (P, "iso2_format", 4), (P, "position_unknown", 5),
+            (P, "season_format", 5), (P, "int_unparseable", 4), (P, "duplicate_key", 2), (P, "duplicate_key", 3)} <= got
+    assert {(R, "multi_owner", 2), (R, "multi_owner", 3), (R, "unmatched_player", 4)} <= got
+    assert {(T, "duplicate", 2), (T, "datetime_unparseable", 3), (T, "unknown_owner", 3), (T, "unknown_player", 3)} <= got
+    assert (T, "unknown_player", 2) not in got
+    s = summary(rep)
+    assert set(s.columns) == {"file", "rule", "severity", "column", "count"}
+    assert s["count"].sum() == len(rep)
+
+
+def test_results_cached_by_file_version(tmp_path):
+    d = str(tmp_path)
+    _players(os.path.join(d, "hockey.players.csv"))
+    rp = os.path.join(d, "equipes_joueurs_2025-2026.csv")
+    _roster(rp, [["Whalers", "Connor McDavid", "F", "1", "Actif"]])
+    v = DataValidator(d)
+    first = v.report()
+    assert v.report().equals(first)
+    assert v.runs == {"files": 2, "cross": 1}
+
+    _roster(rp, [["Whalers", "Connor McDavid", "F", "1", "Actif"], ["Whalers", "Nobody Known", "F", "1", "Actif"]])
+    rep = v.report()
+    assert v.runs == {"files": 3, "cross": 2}     # seul le roster est relu
+    assert ("equipes_joueurs_2025-2026.csv", "unmatched_player", 3) in _rules(rep)
+
+    os.remove(rp)
+    assert "equipes_joueurs_2025-2026.csv" not in set(v.report()["file"])
+
+
+def test_cross_rules_accept_missing_player_names():
+    players = pd.DataFrame({"Player": pd.array(["Connor McDavid", None], dtype="string")})
+    roster = pd.DataFrame({"Propriétaire": ["Whalers"], "Joueur": ["Connor McDavid"]})
+    rep = cross_rules({"hockey.players.csv": ("players", "", players),
+                       "equipes_joueurs_2025-2026.csv": ("roster", "2025-2026", roster)})
+    assert "unmatched_player" not in set(rep["rule"])
+
+
+def test_persisted_state_keeps_only_cross_rule_columns(tmp_path):
+    from pms_warmup import IndexStore
+
+    d = str(tmp_path)
+    _players(os.path.join(d, "hockey.players.csv"))
+    _roster(os.path.join(d, "equipes_joueurs_2025-2026.csv"), [["Whalers", "Connor McDavid", "F", "12500000", "Actif"]])
+    store = IndexStore(str(tmp_path / "idx"))
+    rep = DataValidator(d, store=store).report()
+    per_file = store.load("validator")["per_file"]
+    assert list(per_file["hockey.players.csv"][3].columns) == ["Player"]
+    assert len(per_file["hockey.players.csv"][3]) == 4  # noms distincts seulement
+    assert set(per_file["equipes_joueurs_2025-2026.csv"][3].columns) == {"Joueur", "Propriétaire"}
+    assert DataValidator(d, store=store).report().equals(rep)
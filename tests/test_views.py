@@ -0,0 +1,86 @@
+import pandas as pd
+
+from pms_views import LeagueViews, roster_files
+
+
+def _db():
+    return pd.DataFrame({
+        "Player": ["Connor McDavid", "Zub, Artyom", "Juraj Slafkovsky", "Igor Shesterkin"],
+        "Position": ["C", "D", "LW", "G"],
+        "FlagISO2": ["CA", "RU", "SK", "RU"],
+        "Cap Hit": ["12 500 000 $", "4 600 000 $", "950 000 $", "5 666 667 $"],
+        "Level": ["STD", "STD", "ELC", "STD"],
+        "NHL P": [100, 20, 30, 0],
+        "nhl_w": [None, None, None, 36],
+    })
+
+
+def _roster(rows):
+    return pd.DataFrame(rows, columns=["Propriétaire", "Joueur", "Pos", "Salaire", "Slot", "Level"])
+
+
+R1 = _roster([
+    ["Whalers", "Connor McDavid", "F", "", "Actif", ""],
+    ["Whalers", "Artyom Zub", "D", "", "Actif", ""],
+    ["Nordiques", "Juraj Slafkovsky", "F", "", "Actif", ""],
+    ["Nordiques", "Igor Shesterkin", "G", "", "Actif", ""],
+    ["Nordiques", "Inconnu Prospect", "F", "500000", "Mineur", "ELC"],
+])
+
+
+def _full(db, rosters):
+    v = LeagueViews(db)
+    for s, r in rosters.items():
+        v.set_roster(s, r)
+    return v
+
+
+def _same(a, b):
+    for name in ("owners", "nationality", "positions"):
+        pd.testing.assert_frame_equal(a.view(name), b.view(name), check_dtype=False)
+
+
+def test_owner_nationality_and_position_views():
+    v = _full(_db(), {"2025-2026": R1})
+    o = v.view("owners", "2025-2026").set_index("owner")
+    assert o.loc["Whalers", "points"] == 120 and o.loc["Whalers", "cap_hit"] == 17_100_000
+    # gardien: victoires × 2; joueur absent de la DB: Salaire du roster, Level du roster
+    assert o.loc["Nordiques", "points"] == 30 + 72 and o.loc["Nordiques", "elc"] == 2
+    assert o.loc["Nordiques", "cap_hit"] == 950_000 + 5_666_667 + 500_000
+    nat = v.view("nationality", "2025-2026").set_index("country")["players"].to_dict()
+    assert nat == {"CA": 1, "RU": 2, "SK": 1, "?": 1}
+    cap = v.cap_by_position("2025-2026")
+    assert cap.loc["Whalers", "D"] == 4_600_000 and cap.loc["Nordiques", "G"] == 5_666_667
+
+
+def test_incremental_roster_change_matches_full_rebuild():
+    v = _full(_db(), {"2024-2025": R1, "2025-2026": R1})
+    r2 = R1.copy()
+    r2.loc[1, "Propriétaire"] = "Nordiques"          # échange
+    r2 = r2.drop(index=4)                             # joueur libéré
+    r2.loc[len(r2)] = ["Whalers", "Zub, Artyom", "D", "", "Banc", ""]
+    res = v.set_roster("2025-2026", r2)
+    assert res["delta"] == 4                           # 2 retirées + 2 ajoutées, le reste intact
+    _same(v, _full(_db(), {"2024-2025": R1, "2025-2026": r2}))
+    assert v.view("owners", "2024-2025").equals(_full(_db(), {"2024-2025": R1}).view("owners", "2024-2025"))
+
+
+def test_players_db_change_and_season_drop():
+    v = _full(_db(), {"2024-2025": R1, "2025-2026": R1})
+    db2 = _db()
+    db2.loc[0, "NHL P"] = 130
+    db2.loc[2, "Level"] = "STD"
+    res = v.set_players_db(db2)
+    assert res["delta"] == 2 * 2 * 2                  # 2 joueurs changés × 2 saisons, retrait + ajout
+    _same(v, _full(db2, {"2024-2025": R1, "2025-2026": R1}))
+
+    v.drop_season("2024-2025")
+    assert v.seasons() == ["2025-2026"]
+    assert set(v.view("owners")["season"]) == {"2025-2026"}
+
+
+def test_roster_files_lists_history(tmp_path):
+    for s in ("2023-2024", "2025-2026"):
+        (tmp_path / f"equipes_joueurs_{s}.csv").write_text("x\n")
+    (tmp_path / "equipes_joueurs_backup.csv").write_text("x\n")
+    assert list(roster_files(str(tmp_path))) == ["2023-2024", "2025-2026"]
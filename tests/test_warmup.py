@@ -0,0 +1,80 @@
+import pandas as pd
+
+import pms_shared
+from pms_validate import DataValidator
+from pms_warmup import ERROR, READY, IndexStore, Warmup, code_fingerprint
+
+
+def test_index_store_roundtrip_and_signature(tmp_path):
+    store = IndexStore(str(tmp_path / "idx"))
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {"a": 1}
+
+    assert store.get_or_build("m", "1:10", build) == ({"a": 1}, "built")
+    assert store.get_or_build("m", "1:10", build) == ({"a": 1}, "disk")
+    assert IndexStore(str(tmp_path / "idx")).load("m", "1:10") == {"a": 1}   # nouveau process
+    assert store.get_or_build("m", "2:10", build)[1] == "built" and len(calls) == 2
+    (tmp_path / "idx" / "m.pkl").write_bytes(b"corrompu")
+    assert store.load("m", "2:10") is None and store.stats["errors"] == 1
+    assert store.clear() == 1 and store.usage()["indexes"] == 0
+
+
+def test_index_store_ignores_indexes_from_other_code(tmp_path, monkeypatch):
+    root = str(tmp_path / "idx")
+    IndexStore(root, code="v1").save("m", {"a": 1}, "1:10")
+    assert IndexStore(root, code="v1").load("m", "1:10") == {"a": 1}
+    assert IndexStore(root, code="v2").load("m", "1:10") is None   # redéploiement
+
+    mod = tmp_path / "pms_fp_probe.py"
+    mod.write_text("X = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    before = code_fingerprint(["pms_fp_probe"])
+    assert code_fingerprint(["pms_fp_probe"]) == before
+    mod.write_text("X = 2\n")
+    assert code_fingerprint(["pms_fp_probe"]) != before
+    assert IndexStore(root).code == code_fingerprint()
+
+
+def test_warmup_runs_tasks_in_background_and_reports_status():
+    seen = []
+
+    def boom():
+        raise RuntimeError("pas de roster")
+
+    wu = Warmup([("a", lambda: seen.append("a") or "ok"), ("b", boom), ("c", lambda: seen.append("c"))])
+    assert [s["state"] for s in wu.status()] == ["pending"] * 3 and not wu.summary()["done"]
+    assert wu.start() and not wu.start()
+    assert wu.wait(5)
+    st = {s["task"]: s for s in wu.status()}
+    assert seen == ["a", "c"] and st["a"]["detail"] == "ok"
+    assert st["b"]["state"] == ERROR and "pas de roster" in st["b"]["detail"] and st["c"]["state"] == READY
+    assert wu.summary()["ready"] == 2 and wu.summary()["errors"] == 1 and wu.is_ready("a")
+    assert wu.start(force=True) and wu.wait(5) and seen == ["a", "c", "a", "c"]
+
+
+def test_persisted_players_map_and_validator(tmp_path, monkeypatch):
+    d = tmp_path / "data"
+    d.mkdir()
+    pd.DataFrame({"Player": ["Connor McDavid", "Lane Hutson"], "Position": ["C", "D"]}).to_csv(d / "hockey.players.csv", index=False)
+    pd.DataFrame({"Propriétaire": ["Nordiques"], "Joueur": ["Inconnu"], "Pos": ["F"], "Salaire": ["1 $"], "Slot": ["Actif"]}) \
+        .to_csv(d / "equipes_joueurs_2025-2026.csv", index=False)
+    store = IndexStore(str(tmp_path / "idx"))
+    monkeypatch.setattr(pms_shared, "_index_store", store)
+    pms_shared.clear()
+    m = pms_shared.shared_players_db(str(d / "hockey.players.csv")).players_map()
+    pms_shared.clear()
+    assert pms_shared.shared_players_db(str(d / "hockey.players.csv")).players_map() == m
+    assert store.stats["built"] == 1 and store.stats["loaded"] == 1
+
+    rep = DataValidator(str(d), store=store).report()
+    again = DataValidator(str(d), store=store)
+    assert again.report().equals(rep) and again.runs == {"files": 0, "cross": 0}
+    pd.DataFrame({"Propriétaire": ["Nordiques"], "Joueur": ["Lane Hutson"], "Pos": ["D"], "Salaire": ["1 $"], "Slot": ["Actif"]}) \
+        .to_csv(d / "equipes_joueurs_2025-2026.csv", index=False)
+    third = DataValidator(str(d), store=store)
+    third.report()
+    assert third.runs == {"files": 1, "cross": 1}
+    pms_shared.clear()